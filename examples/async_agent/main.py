@@ -2,7 +2,8 @@
 Async CodeAgent Example with Starlette
 
 This example demonstrates how to use a CodeAgent in an async Starlette app,
-running the agent in a background thread using anyio.to_thread.run_sync.
+either running the agent in a background thread using anyio.to_thread.run_sync,
+or awaiting its asynchronous counterpart `arun` directly in the event loop.
 """
 
 import anyio.to_thread
@@ -30,6 +31,13 @@ async def run_agent_in_thread(task: str):
     return result
 
 
+async def run_agent_in_event_loop(task: str):
+    agent = get_agent()
+    # `arun` awaits the model calls instead of blocking a thread
+    result = await agent.arun(task)
+    return result
+
+
 async def run_agent_endpoint(request: Request):
     data = await request.json()
     task = data.get("task")
@@ -42,8 +50,21 @@ async def run_agent_endpoint(request: Request):
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+async def arun_agent_endpoint(request: Request):
+    data = await request.json()
+    task = data.get("task")
+    if not task:
+        return JSONResponse({"error": 'Missing "task" in request body.'}, status_code=400)
+    try:
+        result = await run_agent_in_event_loop(task)
+        return JSONResponse({"result": result})
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
 routes = [
     Route("/run-agent", run_agent_endpoint, methods=["POST"]),
+    Route("/arun-agent", arun_agent_endpoint, methods=["POST"]),
 ]
 
 app = Starlette(debug=True, routes=routes)
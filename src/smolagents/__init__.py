@@ -25,6 +25,7 @@ from .mcp_client import *
 from .memory import *
 from .models import *
 from .monitoring import *
+from .process_pool_executor import *
 from .remote_executors import *
 from .tools import *
 from .utils import *
@@ -14,15 +14,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import importlib
+import inspect
 import json
 import os
 import re
 import tempfile
 import textwrap
+import threading
 import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from logging import getLogger
@@ -32,9 +35,7 @@ from typing import TYPE_CHECKING, Any, Literal, Type, TypeAlias, TypedDict, Unio
 import yaml
 from huggingface_hub import create_repo, metadata_update, snapshot_download, upload_folder
 from jinja2 import StrictUndefined, Template
-from rich.console import Group
-from rich.live import Live
-from rich.markdown import Markdown
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.rule import Rule
 from rich.text import Text
@@ -45,7 +46,13 @@ if TYPE_CHECKING:
 
 from .agent_types import AgentAudio, AgentImage, handle_agent_output_types
 from .default_tools import TOOL_MAPPING, FinalAnswerTool
-from .local_python_executor import BASE_BUILTIN_MODULES, LocalPythonExecutor, PythonExecutor, fix_final_answer_code
+from .local_python_executor import (
+    BASE_BUILTIN_MODULES,
+    CodeOutput,
+    LocalPythonExecutor,
+    PythonExecutor,
+    fix_final_answer_code,
+)
 from .memory import (
     ActionStep,
     AgentMemory,
@@ -66,17 +73,22 @@ from .models import (
     ChatMessageToolCall,
     MessageRole,
     Model,
-    agglomerate_stream_deltas,
+    StreamAccumulator,
     parse_json_if_needed,
+    reset_retry_budget,
+    restore_retry_budget,
 )
 from .monitoring import (
     YELLOW_HEX,
     AgentLogger,
+    LiveMarkdown,
     LogLevel,
     Monitor,
+    ToolCallTiming,
 )
+from .process_pool_executor import ProcessPoolPythonExecutor
 from .remote_executors import DockerExecutor, E2BExecutor, WasmExecutor,ScaleboxExecutor
-from .tools import BaseTool, Tool, validate_tool_arguments
+from .tools import BaseTool, Tool, ToolCallExecutor, validate_tool_arguments
 from .utils import (
     AgentError,
     AgentExecutionError,
@@ -85,9 +97,11 @@ from .utils import (
     AgentParsingError,
     AgentToolCallError,
     AgentToolExecutionError,
+    CodeBlockEndDetector,
     create_agent_gradio_app_template,
     extract_code_from_text,
     is_valid_name,
+    iterate_in_thread,
     make_init_file,
     parse_code_blobs,
     truncate_content,
@@ -123,6 +137,41 @@ class ToolOutput:
     is_final_answer: bool
     observation: str
     tool_call: ToolCall
+    timing: ToolCallTiming | None = None
+
+
+class OutputStreamDisplay:
+    """
+    Accumulates the deltas of a model output stream and displays the message they build up live, so that synchronous
+    and asynchronous steps only differ in how they iterate over the stream.
+
+    Args:
+        console (`Console`): Console to display the message in.
+        code_block_end_detector (`CodeBlockEndDetector`, *optional*): Detector of the end of the first code block, fed
+            with the streamed content.
+    """
+
+    def __init__(self, console: Console, code_block_end_detector: CodeBlockEndDetector | None = None):
+        self.accumulator = StreamAccumulator()
+        self.live = LiveMarkdown(console)
+        self.code_block_end_detector = code_block_end_detector
+
+    def __enter__(self):
+        self.live.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.live.__exit__(exc_type, exc_value, traceback)
+
+    def add(self, event: ChatMessageStreamDelta) -> bool:
+        """Adds a streamed delta, and returns whether the first code block is complete."""
+        self.accumulator.add(event)
+        self.live.update(self.accumulator.render_as_markdown)
+        detector = self.code_block_end_detector
+        return bool(detector and event.content and detector.feed(event.content))
+
+    def to_message(self) -> ChatMessage:
+        return self.accumulator.to_message()
 
 
 class PlanningPromptTemplate(TypedDict):
@@ -321,6 +370,12 @@ class MultiStepAgent(ABC):
             """The 'system_prompt' property is read-only. Use 'self.prompt_templates["system_prompt"]' instead."""
         )
 
+    def __setattr__(self, name: str, value: Any):
+        # The JSON schema of a managed agent, cached by `models.get_tool_json_schema`, is built from these attributes
+        if name in ("name", "description", "inputs"):
+            self.__dict__.pop("_json_schema", None)
+        super().__setattr__(name, value)
+
     def _validate_name(self, name: str | None) -> str | None:
         if name is not None and not is_valid_name(name):
             raise ValueError(f"Agent name '{name}' must be a valid Python identifier and not a reserved keyword.")
@@ -422,6 +477,79 @@ class MultiStepAgent(ABC):
         ```
         """
         max_steps = max_steps or self.max_steps
+        self._setup_run(task, reset=reset, images=images, additional_args=additional_args)
+        if stream:
+            # The steps are returned as they are executed through a generator to iterate on.
+            return self._with_retry_budget(self._run_stream(task=self.task, max_steps=max_steps, images=images))
+        run_start_time = time.time()
+        # Outputs are returned only at the end. We only look at the last step.
+
+        steps = list(self._with_retry_budget(self._run_stream(task=self.task, max_steps=max_steps, images=images)))
+        assert isinstance(steps[-1], FinalAnswerStep)
+        return self._make_run_output(steps[-1].output, run_start_time)
+
+    async def arun(
+        self,
+        task: str,
+        stream: bool = False,
+        reset: bool = True,
+        images: list["PIL.Image.Image"] | None = None,
+        additional_args: dict | None = None,
+        max_steps: int | None = None,
+    ):
+        """
+        Asynchronous counterpart of [`~MultiStepAgent.run`], to drive many agent runs concurrently from a single event
+        loop.
+
+        The model is called with `Model.agenerate` or `Model.agenerate_stream`, and tools with `Tool.acall`, which
+        awaits tools that have an asynchronous `forward` method. Blocking work, such as synchronous tools or code
+        execution, runs in worker threads so that it does not block the event loop. Since the memory of a run is
+        stored in the agent, concurrent runs must each use their own agent instance.
+
+        Args:
+            task (`str`): Task to perform.
+            stream (`bool`): Whether to run in streaming mode.
+                If `True`, returns an asynchronous generator that yields each step as it is executed. You must iterate
+                over it with `async for` to process the individual steps.
+                If `False`, executes all steps internally and returns only the final answer after completion.
+            reset (`bool`): Whether to reset the conversation or keep it going from previous run.
+            images (`list[PIL.Image.Image]`, *optional*): Image(s) objects.
+            additional_args (`dict`, *optional*): Any other variables that you want to pass to the agent run, for instance images or dataframes. Give them clear names!
+            max_steps (`int`, *optional*): Maximum number of steps the agent can take to solve the task. if not provided, will use the agent's default value.
+
+        Example:
+        ```py
+        import asyncio
+        from smolagents import CodeAgent, InferenceClientModel
+
+        async def main(tasks):
+            agents = [CodeAgent(tools=[], model=InferenceClientModel()) for _ in tasks]
+            return await asyncio.gather(*(agent.arun(task) for agent, task in zip(agents, tasks)))
+
+        asyncio.run(main(["What is the result of 2 power 3.7384?", "How many seconds are there in a leap year?"]))
+        ```
+        """
+        max_steps = max_steps or self.max_steps
+        self._setup_run(task, reset=reset, images=images, additional_args=additional_args)
+        if stream:
+            return self._awith_retry_budget(self._arun_stream(task=self.task, max_steps=max_steps, images=images))
+        run_start_time = time.time()
+        steps = [
+            step
+            async for step in self._awith_retry_budget(
+                self._arun_stream(task=self.task, max_steps=max_steps, images=images)
+            )
+        ]
+        assert isinstance(steps[-1], FinalAnswerStep)
+        return self._make_run_output(steps[-1].output, run_start_time)
+
+    def _setup_run(
+        self,
+        task: str,
+        reset: bool,
+        images: list["PIL.Image.Image"] | None,
+        additional_args: dict | None,
+    ):
         self.task = task
         self.interrupt_switch = False
         if additional_args:
@@ -447,16 +575,7 @@ You have been provided with these additional arguments, that you can access dire
             self.python_executor.send_variables(variables=self.state)
             self.python_executor.send_tools({**self.tools, **self.managed_agents})
 
-        if stream:
-            # The steps are returned as they are executed through a generator to iterate on.
-            return self._run_stream(task=self.task, max_steps=max_steps, images=images)
-        run_start_time = time.time()
-        # Outputs are returned only at the end. We only look at the last step.
-
-        steps = list(self._run_stream(task=self.task, max_steps=max_steps, images=images))
-        assert isinstance(steps[-1], FinalAnswerStep)
-        output = steps[-1].output
-
+    def _make_run_output(self, output: Any, run_start_time: float) -> Any:
         if self.return_full_result:
             total_input_tokens = 0
             total_output_tokens = 0
@@ -491,6 +610,144 @@ You have been provided with these additional arguments, that you can access dire
 
         return output
 
+    def run_batch(
+        self,
+        tasks: list[str | dict[str, Any]],
+        concurrency: int = 4,
+        output: str | Path | None = None,
+        max_steps: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Runs many independent tasks with the configuration of this agent, in parallel threads.
+
+        Each task is run by its own clone of this agent, created with the same init arguments, step callbacks
+        included. Clones get a fresh memory and code executor, but share the model and tools of this agent instead of
+        rebuilding them, so these must be thread-safe.
+
+        If `output` is given, the result of each task is appended to this JSONL file as soon as the task is done. Tasks
+        that already have a result in the file are not run again, except the ones that raised an error: an interrupted
+        batch is resumed by calling this method again with the same arguments.
+
+        Args:
+            tasks (`list[str | dict]`): Tasks to run. Each task is either a string, or a dictionary with:
+                - a `"task"` key holding the task,
+                - an optional `"id"` key identifying the task in the output file, which defaults to the task itself,
+                - an optional `"additional_args"` key, passed to [`~MultiStepAgent.run`],
+                - any other key, for instance the expected answer, which is copied to the result of the task.
+            concurrency (`int`, default `4`): Maximum number of tasks running at the same time.
+            output (`str` or `Path`, *optional*): JSONL file to write the results to.
+            max_steps (`int`, *optional*): Maximum number of steps of each run. Defaults to the agent's value.
+
+        Returns:
+            `list[dict]`: The results, in the order of `tasks`. Each result holds the `id` and `task` of its task,
+            the final `output`, the `state` of the run (`"success"`, `"max_steps_error"` or `"error"`), the `error`
+            message if the run raised one, the `token_usage` and the `duration` of the run in seconds.
+
+        Example:
+        ```py
+        from smolagents import CodeAgent, InferenceClientModel, LogLevel
+
+        agent = CodeAgent(tools=[], model=InferenceClientModel(), verbosity_level=LogLevel.ERROR)
+        results = agent.run_batch(
+            ["What is the result of 2 power 3.7384?", "How many seconds are there in a leap year?"],
+            concurrency=2,
+            output="answers.jsonl",
+        )
+        ```
+        """
+        batch = []
+        for task in tasks:
+            item = dict(task) if isinstance(task, dict) else {"task": task}
+            item.setdefault("id", item["task"])
+            batch.append(item)
+        task_ids = [item["id"] for item in batch]
+        if len(set(task_ids)) != len(task_ids):
+            raise ValueError("Tasks of a batch must have unique ids.")
+
+        results = {}
+        if output is not None and os.path.exists(output):
+            results_text = Path(output).read_text(encoding="utf-8")
+            for line in results_text.splitlines():
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line is truncated if a previous batch was killed while writing it
+                    continue
+                results[result["id"]] = result
+            if results_text and not results_text.endswith("\n"):
+                with open(output, "a", encoding="utf-8") as f:
+                    f.write("\n")
+        pending = [item for item in batch if results.get(item["id"], {"state": "error"})["state"] == "error"]
+
+        output_lock = threading.Lock()
+
+        def run_task(item: dict[str, Any]) -> dict[str, Any]:
+            agent = self._clone()
+            agent.return_full_result = True
+            result = {key: value for key, value in item.items() if key != "additional_args"}
+            start_time = time.time()
+            try:
+                run_result = agent.run(item["task"], additional_args=item.get("additional_args"), max_steps=max_steps)
+                result |= {
+                    "output": run_result.output,
+                    "state": run_result.state,
+                    "error": None,
+                    "token_usage": run_result.token_usage.dict() if run_result.token_usage else None,
+                }
+            except Exception as e:
+                result |= {"output": None, "state": "error", "error": f"{type(e).__name__}: {e}", "token_usage": None}
+            finally:
+                if hasattr(agent, "cleanup"):
+                    agent.cleanup()
+            result["duration"] = time.time() - start_time
+            if output is not None:
+                with output_lock, open(output, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(result, default=str) + "\n")
+            return result
+
+        batch_start_time = time.time()
+        output_tokens = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(run_task, item) for item in pending]
+            for n_done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[result["id"]] = result
+                if result["token_usage"] is not None:
+                    output_tokens += result["token_usage"]["output_tokens"]
+                elapsed = max(time.time() - batch_start_time, 1e-6)
+                self.logger.log(
+                    f"[{n_done}/{len(pending)}] Task {result['id']!r} ended with state {result['state']} in "
+                    f"{result['duration']:.1f} seconds | {n_done / elapsed:.2f} tasks/s | "
+                    f"{output_tokens / elapsed:.1f} output tokens/s",
+                    level=LogLevel.INFO,
+                )
+        if len(pending) < len(batch):
+            self.logger.log(
+                f"Skipped {len(batch) - len(pending)} tasks that already have a result in {output}.",
+                level=LogLevel.INFO,
+            )
+        return [results[task_id] for task_id in task_ids]
+
+    @staticmethod
+    def _with_retry_budget(steps: Generator) -> Generator:
+        """Runs the steps of a run with a fresh retry budget, then restores the budget of the caller, e.g. of the run
+        of a manager agent calling this agent."""
+        token = reset_retry_budget()
+        try:
+            yield from steps
+        finally:
+            restore_retry_budget(token)
+
+    @staticmethod
+    async def _awith_retry_budget(steps: AsyncGenerator) -> AsyncGenerator:
+        """Asynchronous counterpart of `_with_retry_budget`."""
+        token = reset_retry_budget()
+        try:
+            async for step in steps:
+                yield step
+        finally:
+            restore_retry_budget(token)
+
     def _run_stream(
         self, task: str, max_steps: int, images: list["PIL.Image.Image"] | None = None
     ) -> Generator[ActionStep | PlanningStep | FinalAnswerStep | ChatMessageStreamDelta]:
@@ -500,51 +757,64 @@ You have been provided with these additional arguments, that you can access dire
             if self.interrupt_switch:
                 raise AgentError("Agent interrupted.", self.logger)
 
-            # Run a planning step if scheduled
-            if self.planning_interval is not None and (
-                self.step_number == 1 or (self.step_number - 1) % self.planning_interval == 0
-            ):
-                planning_start_time = time.time()
+            if self._is_planning_step_due():
                 planning_step = None
                 for element in self._generate_planning_step(
                     task, is_first_step=len(self.memory.steps) == 1, step=self.step_number
                 ):  # Don't use the attribute step_number here, because there can be steps from previous runs
                     yield element
                     planning_step = element
-                assert isinstance(planning_step, PlanningStep)  # Last yielded element should be a PlanningStep
-                planning_end_time = time.time()
-                planning_step.timing = Timing(
-                    start_time=planning_start_time,
-                    end_time=planning_end_time,
-                )
-                self._finalize_step(planning_step)
-                self.memory.steps.append(planning_step)
-
-            # Start action step!
-            action_step_start_time = time.time()
-            action_step = ActionStep(
-                step_number=self.step_number,
-                timing=Timing(start_time=action_step_start_time),
-                observations_images=images,
-            )
-            self.logger.log_rule(f"Step {self.step_number}", level=LogLevel.INFO)
+                self._end_planning_step(planning_step)
+
+            action_step = self._start_action_step(images)
             try:
                 for output in self._step_stream(action_step):
                     # Yield all
                     yield output
+                    if self._handle_step_output(output, action_step):
+                        final_answer, returned_final_answer = output.output, True
+            except AgentGenerationError as e:
+                # Agent generation errors are not caused by a Model error but an implementation error: so we should raise them and exit.
+                raise e
+            except AgentError as e:
+                # Other AgentError types are caused by the Model, so we should log them and iterate.
+                action_step.error = e
+            finally:
+                self._end_action_step(action_step)
+                yield action_step
+                self.step_number += 1
 
-                    if isinstance(output, ActionOutput) and output.is_final_answer:
-                        final_answer = output.output
-                        self.logger.log(
-                            Text(f"Final answer: {final_answer}", style=f"bold {YELLOW_HEX}"),
-                            level=LogLevel.INFO,
-                        )
+        if not returned_final_answer and self.step_number == max_steps + 1:
+            final_answer = self._handle_max_steps_reached(task, images)
+            yield action_step
+        yield FinalAnswerStep(handle_agent_output_types(final_answer))
+
+    async def _arun_stream(
+        self, task: str, max_steps: int, images: list["PIL.Image.Image"] | None = None
+    ) -> AsyncGenerator[ActionStep | PlanningStep | FinalAnswerStep | ChatMessageStreamDelta]:
+        """Asynchronous counterpart of `_run_stream`."""
+        self.step_number = 1
+        returned_final_answer = False
+        while not returned_final_answer and self.step_number <= max_steps:
+            if self.interrupt_switch:
+                raise AgentError("Agent interrupted.", self.logger)
 
-                        if self.final_answer_checks:
-                            self._validate_final_answer(final_answer)
-                        returned_final_answer = True
-                        action_step.is_final_answer = True
+            if self._is_planning_step_due():
+                planning_step = None
+                async for element in self._agenerate_planning_step(
+                    task, is_first_step=len(self.memory.steps) == 1, step=self.step_number
+                ):  # Don't use the attribute step_number here, because there can be steps from previous runs
+                    yield element
+                    planning_step = element
+                self._end_planning_step(planning_step)
 
+            action_step = self._start_action_step(images)
+            try:
+                async for output in self._astep_stream(action_step):
+                    # Yield all
+                    yield output
+                    if self._handle_step_output(output, action_step):
+                        final_answer, returned_final_answer = output.output, True
             except AgentGenerationError as e:
                 # Agent generation errors are not caused by a Model error but an implementation error: so we should raise them and exit.
                 raise e
@@ -552,16 +822,48 @@ You have been provided with these additional arguments, that you can access dire
                 # Other AgentError types are caused by the Model, so we should log them and iterate.
                 action_step.error = e
             finally:
-                self._finalize_step(action_step)
-                self.memory.steps.append(action_step)
+                self._end_action_step(action_step)
                 yield action_step
                 self.step_number += 1
 
         if not returned_final_answer and self.step_number == max_steps + 1:
-            final_answer = self._handle_max_steps_reached(task, images)
+            final_answer = await self._ahandle_max_steps_reached(task, images)
             yield action_step
         yield FinalAnswerStep(handle_agent_output_types(final_answer))
 
+    def _is_planning_step_due(self) -> bool:
+        return self.planning_interval is not None and (
+            self.step_number == 1 or (self.step_number - 1) % self.planning_interval == 0
+        )
+
+    def _end_planning_step(self, planning_step: PlanningStep | None):
+        assert isinstance(planning_step, PlanningStep)  # Last yielded element should be a PlanningStep
+        self._finalize_step(planning_step)
+        self.memory.steps.append(planning_step)
+
+    def _start_action_step(self, images: list["PIL.Image.Image"] | None) -> ActionStep:
+        action_step = ActionStep(
+            step_number=self.step_number,
+            timing=Timing(start_time=time.time()),
+            observations_images=images,
+        )
+        self.logger.log_rule(f"Step {self.step_number}", level=LogLevel.INFO)
+        return action_step
+
+    def _handle_step_output(self, output: Any, action_step: ActionStep) -> bool:
+        """Validates and records the final answer if `output` is one, and returns whether it is."""
+        if not (isinstance(output, ActionOutput) and output.is_final_answer):
+            return False
+        self.logger.log(Text(f"Final answer: {output.output}", style=f"bold {YELLOW_HEX}"), level=LogLevel.INFO)
+        if self.final_answer_checks:
+            self._validate_final_answer(output.output)
+        action_step.is_final_answer = True
+        return True
+
+    def _end_action_step(self, action_step: ActionStep):
+        self._finalize_step(action_step)
+        self.memory.steps.append(action_step)
+
     def _validate_final_answer(self, final_answer: Any):
         for check_function in self.final_answer_checks:
             try:
@@ -576,6 +878,14 @@ You have been provided with these additional arguments, that you can access dire
     def _handle_max_steps_reached(self, task: str, images: list["PIL.Image.Image"]) -> Any:
         action_step_start_time = time.time()
         final_answer = self.provide_final_answer(task, images)
+        return self._record_max_steps_final_answer(final_answer, action_step_start_time)
+
+    async def _ahandle_max_steps_reached(self, task: str, images: list["PIL.Image.Image"]) -> Any:
+        action_step_start_time = time.time()
+        final_answer = await self.aprovide_final_answer(task, images)
+        return self._record_max_steps_final_answer(final_answer, action_step_start_time)
+
+    def _record_max_steps_final_answer(self, final_answer: ChatMessage, action_step_start_time: float) -> Any:
         final_memory_step = ActionStep(
             step_number=self.step_number,
             error=AgentMaxStepsError("Reached max steps.", self.logger),
@@ -591,8 +901,36 @@ You have been provided with these additional arguments, that you can access dire
         self, task, is_first_step: bool, step: int
     ) -> Generator[ChatMessageStreamDelta | PlanningStep]:
         start_time = time.time()
+        input_messages = self._get_planning_input_messages(task, is_first_step, step)
+        if self.stream_outputs and hasattr(self.model, "generate_stream"):
+            with OutputStreamDisplay(self.logger.console) as output_display:
+                for event in self.model.generate_stream(input_messages, stop_sequences=["<end_plan>"]):  # type: ignore
+                    output_display.add(event)
+                    yield event
+            plan_message = output_display.to_message()
+        else:
+            plan_message = self.model.generate(input_messages, stop_sequences=["<end_plan>"])
+        yield self._make_planning_step(task, is_first_step, input_messages, plan_message, start_time)
+
+    async def _agenerate_planning_step(
+        self, task, is_first_step: bool, step: int
+    ) -> AsyncGenerator[ChatMessageStreamDelta | PlanningStep]:
+        """Asynchronous counterpart of `_generate_planning_step`."""
+        start_time = time.time()
+        input_messages = self._get_planning_input_messages(task, is_first_step, step)
+        if self.stream_outputs and hasattr(self.model, "generate_stream"):
+            with OutputStreamDisplay(self.logger.console) as output_display:
+                async for event in self.model.agenerate_stream(input_messages, stop_sequences=["<end_plan>"]):
+                    output_display.add(event)
+                    yield event
+            plan_message = output_display.to_message()
+        else:
+            plan_message = await self.model.agenerate(input_messages, stop_sequences=["<end_plan>"])
+        yield self._make_planning_step(task, is_first_step, input_messages, plan_message, start_time)
+
+    def _get_planning_input_messages(self, task, is_first_step: bool, step: int) -> list[ChatMessage]:
         if is_first_step:
-            input_messages = [
+            return [
                 ChatMessage(
                     role=MessageRole.USER,
                     content=[
@@ -606,99 +944,63 @@ You have been provided with these additional arguments, that you can access dire
                     ],
                 )
             ]
-            if self.stream_outputs and hasattr(self.model, "generate_stream"):
-                plan_message_content = ""
-                output_stream = self.model.generate_stream(input_messages, stop_sequences=["<end_plan>"])  # type: ignore
-                input_tokens, output_tokens = 0, 0
-                with Live("", console=self.logger.console, vertical_overflow="visible") as live:
-                    for event in output_stream:
-                        if event.content is not None:
-                            plan_message_content += event.content
-                            live.update(Markdown(plan_message_content))
-                            if event.token_usage:
-                                output_tokens += event.token_usage.output_tokens
-                                input_tokens = event.token_usage.input_tokens
-                        yield event
-            else:
-                plan_message = self.model.generate(input_messages, stop_sequences=["<end_plan>"])
-                plan_message_content = plan_message.content
-                input_tokens, output_tokens = (
-                    (
-                        plan_message.token_usage.input_tokens,
-                        plan_message.token_usage.output_tokens,
-                    )
-                    if plan_message.token_usage
-                    else (None, None)
-                )
+        # Summary mode removes the system prompt and previous planning messages output by the model.
+        # Removing previous planning messages avoids influencing too much the new plan.
+        memory_messages = self.write_memory_to_messages(summary_mode=True)
+        plan_update_pre = ChatMessage(
+            role=MessageRole.SYSTEM,
+            content=[
+                {
+                    "type": "text",
+                    "text": populate_template(
+                        self.prompt_templates["planning"]["update_plan_pre_messages"], variables={"task": task}
+                    ),
+                }
+            ],
+        )
+        plan_update_post = ChatMessage(
+            role=MessageRole.USER,
+            content=[
+                {
+                    "type": "text",
+                    "text": populate_template(
+                        self.prompt_templates["planning"]["update_plan_post_messages"],
+                        variables={
+                            "task": task,
+                            "tools": self.tools,
+                            "managed_agents": self.managed_agents,
+                            "remaining_steps": (self.max_steps - step),
+                        },
+                    ),
+                }
+            ],
+        )
+        return [plan_update_pre] + memory_messages + [plan_update_post]
+
+    def _make_planning_step(
+        self,
+        task,
+        is_first_step: bool,
+        input_messages: list[ChatMessage],
+        plan_message: ChatMessage,
+        start_time: float,
+    ) -> PlanningStep:
+        plan_message_content = plan_message.content
+        if is_first_step:
             plan = textwrap.dedent(
                 f"""Here are the facts I know and the plan of action that I will follow to solve the task:\n```\n{plan_message_content}\n```"""
             )
         else:
-            # Summary mode removes the system prompt and previous planning messages output by the model.
-            # Removing previous planning messages avoids influencing too much the new plan.
-            memory_messages = self.write_memory_to_messages(summary_mode=True)
-            plan_update_pre = ChatMessage(
-                role=MessageRole.SYSTEM,
-                content=[
-                    {
-                        "type": "text",
-                        "text": populate_template(
-                            self.prompt_templates["planning"]["update_plan_pre_messages"], variables={"task": task}
-                        ),
-                    }
-                ],
-            )
-            plan_update_post = ChatMessage(
-                role=MessageRole.USER,
-                content=[
-                    {
-                        "type": "text",
-                        "text": populate_template(
-                            self.prompt_templates["planning"]["update_plan_post_messages"],
-                            variables={
-                                "task": task,
-                                "tools": self.tools,
-                                "managed_agents": self.managed_agents,
-                                "remaining_steps": (self.max_steps - step),
-                            },
-                        ),
-                    }
-                ],
-            )
-            input_messages = [plan_update_pre] + memory_messages + [plan_update_post]
-            if self.stream_outputs and hasattr(self.model, "generate_stream"):
-                plan_message_content = ""
-                input_tokens, output_tokens = 0, 0
-                with Live("", console=self.logger.console, vertical_overflow="visible") as live:
-                    for event in self.model.generate_stream(
-                        input_messages,
-                        stop_sequences=["<end_plan>"],
-                    ):  # type: ignore
-                        if event.content is not None:
-                            plan_message_content += event.content
-                            live.update(Markdown(plan_message_content))
-                            if event.token_usage:
-                                output_tokens += event.token_usage.output_tokens
-                                input_tokens = event.token_usage.input_tokens
-                        yield event
-            else:
-                plan_message = self.model.generate(input_messages, stop_sequences=["<end_plan>"])
-                plan_message_content = plan_message.content
-                if plan_message.token_usage is not None:
-                    input_tokens, output_tokens = (
-                        plan_message.token_usage.input_tokens,
-                        plan_message.token_usage.output_tokens,
-                    )
             plan = textwrap.dedent(
                 f"""I still need to solve the task I was given:\n```\n{self.task}\n```\n\nHere are the facts I know and my new/updated plan of action to solve the task:\n```\n{plan_message_content}\n```"""
             )
         log_headline = "Initial plan" if is_first_step else "Updated plan"
         self.logger.log(Rule(f"[bold]{log_headline}", style="orange"), Text(plan), level=LogLevel.INFO)
-        yield PlanningStep(
+        return PlanningStep(
             model_input_messages=input_messages,
             plan=plan,
             model_output_message=ChatMessage(role=MessageRole.ASSISTANT, content=plan_message_content),
-            token_usage=TokenUsage(input_tokens=input_tokens, output_tokens=output_tokens),
+            token_usage=plan_message.token_usage or TokenUsage(input_tokens=None, output_tokens=None),
             timing=Timing(start_time=start_time, end_time=time.time()),
         )
 
@@ -719,11 +1021,16 @@ You have been provided with these additional arguments, that you can access dire
         Reads past llm_outputs, actions, and observations or errors from the memory into a series of messages
         that can be used as input to the LLM. Adds a number of keywords (such as PLAN, error, etc) to help
         the LLM.
+
+        The messages of each step are cached in memory, so that only the steps added or modified since the previous
+        call are rendered again, see `AgentMemory.to_messages`.
         """
-        messages = self.memory.system_prompt.to_messages(summary_mode=summary_mode)
-        for memory_step in self.memory.steps:
-            messages.extend(memory_step.to_messages(summary_mode=summary_mode))
-        return messages
+        return self.memory.to_messages(summary_mode=summary_mode)
+
+    def _get_step_input_messages(self, memory_step: ActionStep) -> list[ChatMessage]:
+        input_messages = self.write_memory_to_messages().copy()
+        memory_step.model_input_messages = self.memory.snapshot_messages(input_messages)
+        return input_messages
 
     def _step_stream(
         self, memory_step: ActionStep
@@ -735,6 +1042,17 @@ You have been provided with these additional arguments, that you can access dire
         """
         raise NotImplementedError("This method should be implemented in child classes")
 
+    async def _astep_stream(
+        self, memory_step: ActionStep
+    ) -> AsyncGenerator[ChatMessageStreamDelta | ToolCall | ToolOutput | ActionOutput]:
+        """
+        Asynchronous counterpart of `_step_stream`, used by `arun`.
+        The default implementation runs `_step_stream` in a worker thread: child classes override it to await their
+        model and tool calls in the event loop.
+        """
+        async for output in iterate_in_thread(self._step_stream(memory_step)):
+            yield output
+
     def step(self, memory_step: ActionStep) -> Any:
         """
         Perform one step in the ReAct framework: the agent thinks, acts, and observes the result.
@@ -774,6 +1092,29 @@ You have been provided with these additional arguments, that you can access dire
         Returns:
             `str`: Final answer to the task.
         """
+        messages = self._get_final_answer_messages(task, images)
+        try:
+            chat_message: ChatMessage = self.model.generate(messages)
+            return chat_message
+        except Exception as e:
+            return ChatMessage(
+                role=MessageRole.ASSISTANT,
+                content=[{"type": "text", "text": f"Error in generating final LLM output: {e}"}],
+            )
+
+    async def aprovide_final_answer(self, task: str, images: list["PIL.Image.Image"] | None = None) -> ChatMessage:
+        """Asynchronous counterpart of [`~MultiStepAgent.provide_final_answer`]."""
+        messages = self._get_final_answer_messages(task, images)
+        try:
+            chat_message: ChatMessage = await self.model.agenerate(messages)
+            return chat_message
+        except Exception as e:
+            return ChatMessage(
+                role=MessageRole.ASSISTANT,
+                content=[{"type": "text", "text": f"Error in generating final LLM output: {e}"}],
+            )
+
+    def _get_final_answer_messages(self, task: str, images: list["PIL.Image.Image"] | None) -> list[ChatMessage]:
         messages = [
             ChatMessage(
                 role=MessageRole.SYSTEM,
@@ -801,14 +1142,7 @@ You have been provided with these additional arguments, that you can access dire
                 ],
             )
         )
-        try:
-            chat_message: ChatMessage = self.model.generate(messages)
-            return chat_message
-        except Exception as e:
-            return ChatMessage(
-                role=MessageRole.ASSISTANT,
-                content=[{"type": "text", "text": f"Error in generating final LLM output: {e}"}],
-            )
+        return messages
 
     def visualize(self):
         """Creates a rich tree visualization of the agent's structure."""
@@ -827,11 +1161,21 @@ You have been provided with these additional arguments, that you can access dire
         """Adds additional prompting for the managed agent, runs it, and wraps the output.
         This method is called only by a managed agent.
         """
-        full_task = populate_template(
+        result = self.run(self._get_managed_agent_task(task), **kwargs)
+        return self._make_managed_agent_report(result)
+
+    async def acall(self, task: str, **kwargs):
+        """Asynchronous counterpart of `__call__`, used when the managing agent is run with `arun`."""
+        result = await self.arun(self._get_managed_agent_task(task), **kwargs)
+        return self._make_managed_agent_report(result)
+
+    def _get_managed_agent_task(self, task: str) -> str:
+        return populate_template(
             self.prompt_templates["managed_agent"]["task"],
             variables=dict(name=self.name, task=task),
         )
-        result = self.run(full_task, **kwargs)
+
+    def _make_managed_agent_report(self, result: Any) -> str:
         if isinstance(result, RunResult):
             report = result.output
         else:
@@ -876,7 +1220,8 @@ You have been provided with these additional arguments, that you can access dire
         class_name = self.__class__.__name__
 
         # Save tools to different .py files
-        for tool in self.tools.values():
+        tools = self._get_serializable_tools()
+        for tool in tools.values():
             make_init_file(os.path.join(output_dir, "tools"))
             tool.save(os.path.join(output_dir, "tools"), tool_file_name=tool.name, make_gradio_app=False)
 
@@ -896,7 +1241,7 @@ You have been provided with these additional arguments, that you can access dire
 
         # Save agent dictionary to json
         agent_dict = self.to_dict()
-        agent_dict["tools"] = [tool.name for tool in self.tools.values()]
+        agent_dict["tools"] = list(tools)
         agent_dict["managed_agents"] = {agent.name: agent.__class__.__name__ for agent in self.managed_agents.values()}
         with open(os.path.join(output_dir, "agent.json"), "w", encoding="utf-8") as f:
             json.dump(agent_dict, f, indent=4)
@@ -916,7 +1261,7 @@ You have been provided with these additional arguments, that you can access dire
                 "agent_name": agent_name,
                 "class_name": class_name,
                 "agent_dict": agent_dict,
-                "tools": self.tools,
+                "tools": tools,
                 "managed_agents": self.managed_agents,
                 "managed_agent_relative_path": managed_agent_relative_path,
             }
@@ -935,9 +1280,12 @@ You have been provided with these additional arguments, that you can access dire
         for attr in ["final_answer_checks", "step_callbacks"]:
             if getattr(self, attr, None):
                 self.logger.log(f"This agent has {attr}: they will be ignored by this method.", LogLevel.INFO)
+        tools = self._get_serializable_tools()
+        for tool_name in self.tools.keys() - tools.keys():
+            self.logger.log(f"This agent has a {tool_name} tool: it will be ignored by this method.", LogLevel.INFO)
 
-        tool_dicts = [tool.to_dict() for tool in self.tools.values()]
-        tool_requirements = {req for tool in self.tools.values() for req in tool.to_dict()["requirements"]}
+        tool_dicts = [tool.to_dict() for tool in tools.values()]
+        tool_requirements = {req for tool_dict in tool_dicts for req in tool_dict["requirements"]}
         managed_agents_requirements = {
             req for managed_agent in self.managed_agents.values() for req in managed_agent.to_dict()["requirements"]
         }
@@ -965,6 +1313,10 @@ You have been provided with these additional arguments, that you can access dire
         }
         return agent_dict
 
+    def _get_serializable_tools(self) -> dict[str, Tool]:
+        """Returns the tools serialized with the agent: a [`DelegateTasksTool`] holds live agents, and is left out."""
+        return {name: tool for name, tool in self.tools.items() if not isinstance(tool, DelegateTasksTool)}
+
     @classmethod
     def from_dict(cls, agent_dict: dict[str, Any], **kwargs) -> "MultiStepAgent":
         """Create agent from a dictionary representation.
@@ -976,20 +1328,22 @@ You have been provided with these additional arguments, that you can access dire
         Returns:
             `MultiStepAgent`: Instance of the agent class.
         """
-        # Load model
-        model_info = agent_dict["model"]
-        model_class = getattr(importlib.import_module("smolagents.models"), model_info["class"])
-        model = model_class.from_dict(model_info["data"])
-        # Load tools
+        # Load model, tools and managed agents, unless they are overridden by kwargs
+        model = None
+        if "model" not in kwargs:
+            model_info = agent_dict["model"]
+            model_class = getattr(importlib.import_module("smolagents.models"), model_info["class"])
+            model = model_class.from_dict(model_info["data"])
         tools = []
-        for tool_info in agent_dict["tools"]:
-            tools.append(Tool.from_code(tool_info["code"]))
-        # Load managed agents
+        if "tools" not in kwargs:
+            for tool_info in agent_dict["tools"]:
+                tools.append(Tool.from_code(tool_info["code"]))
         managed_agents = []
-        for managed_agent_dict in agent_dict["managed_agents"]:
-            agent_class = getattr(importlib.import_module("smolagents.agents"), managed_agent_dict["class"])
-            managed_agent = agent_class.from_dict(managed_agent_dict, **kwargs)
-            managed_agents.append(managed_agent)
+        if "managed_agents" not in kwargs:
+            for managed_agent_dict in agent_dict["managed_agents"]:
+                agent_class = getattr(importlib.import_module("smolagents.agents"), managed_agent_dict["class"])
+                managed_agent = agent_class.from_dict(managed_agent_dict, **kwargs)
+                managed_agents.append(managed_agent)
         # Extract base agent parameters
         agent_args = {
             "model": model,
@@ -1009,6 +1363,38 @@ You have been provided with these additional arguments, that you can access dire
         # Create agent instance
         return cls(**agent_args)
 
+    def _clone(self) -> "MultiStepAgent":
+        """Creates an agent with the configuration of this one and a fresh memory. The model and tools are shared with
+        this agent instead of being serialized and rebuilt, and managed agents are cloned in turn."""
+        return type(self)(
+            model=self.model,
+            tools=list(self.tools.values()),
+            managed_agents=[managed_agent._clone() for managed_agent in self.managed_agents.values()],
+            **self._get_clone_kwargs(),
+        )
+
+    def _get_clone_kwargs(self) -> dict[str, Any]:
+        """Returns the init arguments of clones of this agent, except its model, tools and managed agents."""
+        step_callbacks = {}
+        for step_cls, callbacks in self.step_callbacks._callbacks.items():
+            # Clones register the metrics update of their own monitor
+            callbacks = [callback for callback in callbacks if callback != self.monitor.update_metrics]
+            if callbacks:
+                step_callbacks[step_cls] = callbacks
+        return {
+            "prompt_templates": self.prompt_templates,
+            "instructions": self.instructions,
+            "max_steps": self.max_steps,
+            "verbosity_level": self.logger.level,
+            "step_callbacks": step_callbacks,
+            "planning_interval": self.planning_interval,
+            "name": self.name,
+            "description": self.description,
+            "provide_run_summary": self.provide_run_summary,
+            "final_answer_checks": self.final_answer_checks,
+            "return_full_result": self.return_full_result,
+        }
+
     @classmethod
     def from_hub(
         cls,
@@ -1163,6 +1549,9 @@ class ToolCallingAgent(MultiStepAgent):
         max_tool_threads (`int`, *optional*): Maximum number of threads for parallel tool calls.
             Higher values increase concurrency but resource usage as well.
             Defaults to `ThreadPoolExecutor`'s default.
+        tool_executor ([`ToolCallExecutor`], *optional*): Executor running the tool calls, which can be shared by
+            several agents. If not provided, the agent creates its own executor with `max_tool_threads` threads when
+            it first needs it, and shuts it down in `cleanup()`, which is called when exiting the agent's context manager.
         **kwargs: Additional keyword arguments.
     """
 
@@ -1174,6 +1563,7 @@ class ToolCallingAgent(MultiStepAgent):
         planning_interval: int | None = None,
         stream_outputs: bool = False,
         max_tool_threads: int | None = None,
+        tool_executor: ToolCallExecutor | None = None,
         **kwargs,
     ):
         prompt_templates = prompt_templates or yaml.safe_load(
@@ -1194,6 +1584,35 @@ class ToolCallingAgent(MultiStepAgent):
             )
         # Tool calling setup
         self.max_tool_threads = max_tool_threads
+        self._tool_executor = tool_executor
+        self._owns_tool_executor = tool_executor is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+
+    def cleanup(self):
+        """Clean up resources used by the agent, such as the threads of its tool call executor."""
+        if self._owns_tool_executor and self._tool_executor is not None:
+            self._tool_executor.shutdown()
+            self._tool_executor = None
+
+    @property
+    def tool_executor(self) -> ToolCallExecutor:
+        """Executor running the tool calls of the agent."""
+        if self._tool_executor is None:
+            self._tool_executor = ToolCallExecutor(self.max_tool_threads)
+        return self._tool_executor
+
+    def _get_clone_kwargs(self) -> dict[str, Any]:
+        # Clones share the tool call executor of this agent
+        return super()._get_clone_kwargs() | {
+            "stream_outputs": self.stream_outputs,
+            "max_tool_threads": self.max_tool_threads,
+            "tool_executor": self.tool_executor,
+        }
 
     @property
     def tools_and_managed_agents(self):
@@ -1219,54 +1638,80 @@ class ToolCallingAgent(MultiStepAgent):
         Yields ChatMessageStreamDelta during the run if streaming is enabled.
         At the end, yields either None if the step is not final, or the final answer.
         """
-        memory_messages = self.write_memory_to_messages()
-
-        input_messages = memory_messages.copy()
+        input_messages = self._get_step_input_messages(memory_step)
+        try:
+            generation_kwargs = self._get_generation_kwargs()
+            if self.stream_outputs and hasattr(self.model, "generate_stream"):
+                with OutputStreamDisplay(self.logger.console) as output_display:
+                    for event in self.model.generate_stream(input_messages, **generation_kwargs):
+                        output_display.add(event)
+                        yield event
+                chat_message = output_display.to_message()
+            else:
+                chat_message = self.model.generate(input_messages, **generation_kwargs)
+                self._log_model_output(chat_message)
+            self._record_model_output(chat_message, memory_step)
+        except Exception as e:
+            raise AgentGenerationError(f"Error while generating output:\n{e}", self.logger) from e
 
-        # Add new step in logs
-        memory_step.model_input_messages = input_messages
+        chat_message = self._parse_model_tool_calls(chat_message)
+        final_answers = []
+        for output in self.process_tool_calls(chat_message, memory_step):
+            yield output
+            self._collect_final_answer(output, chat_message, final_answers)
+        yield ActionOutput(output=final_answers[0] if final_answers else None, is_final_answer=bool(final_answers))
 
+    async def _astep_stream(
+        self, memory_step: ActionStep
+    ) -> AsyncGenerator[ChatMessageStreamDelta | ToolCall | ToolOutput | ActionOutput]:
+        """Asynchronous counterpart of `_step_stream`: the model is awaited and the tool calls run as event loop tasks."""
+        input_messages = self._get_step_input_messages(memory_step)
         try:
+            generation_kwargs = self._get_generation_kwargs()
             if self.stream_outputs and hasattr(self.model, "generate_stream"):
-                output_stream = self.model.generate_stream(
-                    input_messages,
-                    stop_sequences=["Observation:", "Calling tools:"],
-                    tools_to_call_from=self.tools_and_managed_agents,
-                )
-
-                chat_message_stream_deltas: list[ChatMessageStreamDelta] = []
-                with Live("", console=self.logger.console, vertical_overflow="visible") as live:
-                    for event in output_stream:
-                        chat_message_stream_deltas.append(event)
-                        live.update(
-                            Markdown(agglomerate_stream_deltas(chat_message_stream_deltas).render_as_markdown())
-                        )
+                with OutputStreamDisplay(self.logger.console) as output_display:
+                    async for event in self.model.agenerate_stream(input_messages, **generation_kwargs):
+                        output_display.add(event)
                         yield event
-                chat_message = agglomerate_stream_deltas(chat_message_stream_deltas)
+                chat_message = output_display.to_message()
             else:
-                chat_message: ChatMessage = self.model.generate(
-                    input_messages,
-                    stop_sequences=["Observation:", "Calling tools:"],
-                    tools_to_call_from=self.tools_and_managed_agents,
-                )
-                if chat_message.content is None and chat_message.raw is not None:
-                    log_content = str(chat_message.raw)
-                else:
-                    log_content = str(chat_message.content) or ""
-
-                self.logger.log_markdown(
-                    content=log_content,
-                    title="Output message of the LLM:",
-                    level=LogLevel.DEBUG,
-                )
-
-            # Record model output
-            memory_step.model_output_message = chat_message
-            memory_step.model_output = chat_message.content
-            memory_step.token_usage = chat_message.token_usage
+                chat_message = await self.model.agenerate(input_messages, **generation_kwargs)
+                self._log_model_output(chat_message)
+            self._record_model_output(chat_message, memory_step)
         except Exception as e:
             raise AgentGenerationError(f"Error while generating output:\n{e}", self.logger) from e
 
+        chat_message = self._parse_model_tool_calls(chat_message)
+        final_answers = []
+        async for output in self.aprocess_tool_calls(chat_message, memory_step):
+            yield output
+            self._collect_final_answer(output, chat_message, final_answers)
+        yield ActionOutput(output=final_answers[0] if final_answers else None, is_final_answer=bool(final_answers))
+
+    def _get_generation_kwargs(self) -> dict[str, Any]:
+        return {
+            "stop_sequences": ["Observation:", "Calling tools:"],
+            "tools_to_call_from": self.tools_and_managed_agents,
+        }
+
+    def _record_model_output(self, chat_message: ChatMessage, memory_step: ActionStep):
+        memory_step.model_output_message = chat_message
+        memory_step.model_output = chat_message.content
+        memory_step.token_usage = chat_message.token_usage
+
+    def _log_model_output(self, chat_message: ChatMessage):
+        if chat_message.content is None and chat_message.raw is not None:
+            log_content = str(chat_message.raw)
+        else:
+            log_content = str(chat_message.content) or ""
+
+        self.logger.log_markdown(
+            content=log_content,
+            title="Output message of the LLM:",
+            level=LogLevel.DEBUG,
+        )
+
+    def _parse_model_tool_calls(self, chat_message: ChatMessage) -> ChatMessage:
         if chat_message.tool_calls is None or len(chat_message.tool_calls) == 0:
             try:
                 chat_message = self.model.parse_tool_calls(chat_message)
@@ -1275,31 +1720,29 @@ class ToolCallingAgent(MultiStepAgent):
         else:
             for tool_call in chat_message.tool_calls:
                 tool_call.function.arguments = parse_json_if_needed(tool_call.function.arguments)
-        final_answer, got_final_answer = None, False
-        for output in self.process_tool_calls(chat_message, memory_step):
-            yield output
-            if isinstance(output, ToolOutput):
-                if output.is_final_answer:
-                    if len(chat_message.tool_calls) > 1:
-                        raise AgentExecutionError(
-                            "If you want to return an answer, please do not perform any other tool calls than the final answer tool call!",
-                            self.logger,
-                        )
-                    if got_final_answer:
-                        raise AgentToolExecutionError(
-                            "You returned multiple final answers. Please return only one single final answer!",
-                            self.logger,
-                        )
-                    final_answer = output.output
-                    got_final_answer = True
-
-                    # Manage state variables
-                    if isinstance(final_answer, str) and final_answer in self.state.keys():
-                        final_answer = self.state[final_answer]
-        yield ActionOutput(
-            output=final_answer,
-            is_final_answer=got_final_answer,
-        )
+        return chat_message
+
+    def _get_final_answer(self, tool_output: ToolOutput, chat_message: ChatMessage, got_final_answer: bool) -> Any:
+        if len(chat_message.tool_calls) > 1:
+            raise AgentExecutionError(
+                "If you want to return an answer, please do not perform any other tool calls than the final answer tool call!",
+                self.logger,
+            )
+        if got_final_answer:
+            raise AgentToolExecutionError(
+                "You returned multiple final answers. Please return only one single final answer!",
+                self.logger,
+            )
+        final_answer = tool_output.output
+
+        # Manage state variables
+        if isinstance(final_answer, str) and final_answer in self.state.keys():
+            final_answer = self.state[final_answer]
+        return final_answer
+
+    def _collect_final_answer(self, output: Any, chat_message: ChatMessage, final_answers: list[Any]):
+        if isinstance(output, ToolOutput) and output.is_final_answer:
+            final_answers.append(self._get_final_answer(output, chat_message, got_final_answer=bool(final_answers)))
 
     def process_tool_calls(
         self, chat_message: ChatMessage, memory_step: ActionStep
@@ -1313,68 +1756,136 @@ class ToolCallingAgent(MultiStepAgent):
         Yields:
             `ToolCall | ToolOutput`: The tool call or tool output.
         """
-        parallel_calls: dict[str, ToolCall] = {}
-        assert chat_message.tool_calls is not None
-        for chat_tool_call in chat_message.tool_calls:
-            tool_call = ToolCall(
-                name=chat_tool_call.function.name, arguments=chat_tool_call.function.arguments, id=chat_tool_call.id
-            )
+        tool_calls = self._make_tool_calls(chat_message)
+        for tool_call in tool_calls:
             yield tool_call
-            parallel_calls[tool_call.id] = tool_call
+        parallel_calls = {tool_call.id: tool_call for tool_call in tool_calls}
 
         # Helper function to process a single tool call
-        def process_single_tool_call(tool_call: ToolCall) -> ToolOutput:
-            tool_name = tool_call.name
-            tool_arguments = tool_call.arguments or {}
-            self.logger.log(
-                Panel(Text(f"Calling tool: '{tool_name}' with arguments: {tool_arguments}")),
-                level=LogLevel.INFO,
-            )
-            tool_call_result = self.execute_tool_call(tool_name, tool_arguments)
-            tool_call_result_type = type(tool_call_result)
-            if tool_call_result_type in [AgentImage, AgentAudio]:
-                if tool_call_result_type == AgentImage:
-                    observation_name = "image.png"
-                elif tool_call_result_type == AgentAudio:
-                    observation_name = "audio.mp3"
-                # TODO: tool_call_result naming could allow for different names of same type
-                self.state[observation_name] = tool_call_result
-                observation = f"Stored '{observation_name}' in memory."
-            else:
-                observation = str(tool_call_result).strip()
-            self.logger.log(
-                f"Observations: {observation.replace('[', '|')}",  # escape potential rich-tag-like components
-                level=LogLevel.INFO,
-            )
-            is_final_answer = tool_name == "final_answer"
-
-            return ToolOutput(
-                id=tool_call.id,
-                output=tool_call_result,
-                is_final_answer=is_final_answer,
-                observation=observation,
-                tool_call=tool_call,
-            )
+        def process_single_tool_call(tool_call: ToolCall, queued_time: float) -> ToolOutput:
+            timing = self._start_tool_call(tool_call, queued_time)
+            tool_call_result = self.execute_tool_call(tool_call.name, tool_call.arguments or {})
+            return self._make_tool_output(tool_call, tool_call_result, timing)
 
         # Process tool calls in parallel
         outputs = {}
         if len(parallel_calls) == 1:
             # If there's only one call, process it directly
             tool_call = list(parallel_calls.values())[0]
-            tool_output = process_single_tool_call(tool_call)
+            tool_output = process_single_tool_call(tool_call, time.time())
             outputs[tool_output.id] = tool_output
             yield tool_output
         else:
             # If multiple tool calls, process them in parallel
-            with ThreadPoolExecutor(self.max_tool_threads) as executor:
-                futures = [
-                    executor.submit(process_single_tool_call, tool_call) for tool_call in parallel_calls.values()
-                ]
+            futures = [
+                self.tool_executor.submit(process_single_tool_call, tool_call, time.time())
+                for tool_call in parallel_calls.values()
+            ]
+            try:
                 for future in as_completed(futures):
                     tool_output = future.result()
                     outputs[tool_output.id] = tool_output
                     yield tool_output
+            finally:
+                # Do not start the remaining calls if one of them failed
+                for future in futures:
+                    future.cancel()
+
+        self._record_tool_outputs(memory_step, parallel_calls, outputs)
+
+    async def aprocess_tool_calls(
+        self, chat_message: ChatMessage, memory_step: ActionStep
+    ) -> AsyncGenerator[ToolCall | ToolOutput]:
+        """Asynchronous counterpart of [`~ToolCallingAgent.process_tool_calls`].
+
+        The tool calls run concurrently as tasks of the event loop, at most `max_tool_threads` at a time, and the
+        remaining ones are cancelled if one fails.
 
+        Args:
+            chat_message (`ChatMessage`): Chat message containing tool calls from the model.
+            memory_step (`ActionStep)`: Memory ActionStep to update with results.
+
+        Yields:
+            `ToolCall | ToolOutput`: The tool call or tool output.
+        """
+        tool_calls = self._make_tool_calls(chat_message)
+        for tool_call in tool_calls:
+            yield tool_call
+        parallel_calls = {tool_call.id: tool_call for tool_call in tool_calls}
+
+        # Same bound as the thread pool of synchronous tool calls, whose default size is that of `ThreadPoolExecutor`
+        semaphore = asyncio.Semaphore(self.max_tool_threads or min(32, (os.cpu_count() or 1) + 4))
+
+        async def process_single_tool_call(tool_call: ToolCall, queued_time: float) -> ToolOutput:
+            async with semaphore:
+                timing = self._start_tool_call(tool_call, queued_time)
+                tool_call_result = await self.aexecute_tool_call(tool_call.name, tool_call.arguments or {})
+                return self._make_tool_output(tool_call, tool_call_result, timing)
+
+        outputs = {}
+        tasks = [
+            asyncio.ensure_future(process_single_tool_call(tool_call, time.time()))
+            for tool_call in parallel_calls.values()
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                tool_output = await future
+                outputs[tool_output.id] = tool_output
+                yield tool_output
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self._record_tool_outputs(memory_step, parallel_calls, outputs)
+
+    def _make_tool_calls(self, chat_message: ChatMessage) -> list[ToolCall]:
+        assert chat_message.tool_calls is not None
+        return [
+            ToolCall(
+                name=chat_tool_call.function.name, arguments=chat_tool_call.function.arguments, id=chat_tool_call.id
+            )
+            for chat_tool_call in chat_message.tool_calls
+        ]
+
+    def _start_tool_call(self, tool_call: ToolCall, queued_time: float) -> ToolCallTiming:
+        timing = ToolCallTiming(start_time=time.time(), queued_time=queued_time)
+        self.logger.log(
+            Panel(Text(f"Calling tool: '{tool_call.name}' with arguments: {tool_call.arguments or {}}")),
+            level=LogLevel.INFO,
+        )
+        return timing
+
+    def _make_tool_output(self, tool_call: ToolCall, tool_call_result: Any, timing: ToolCallTiming) -> ToolOutput:
+        timing.end_time = time.time()
+        tool_call_result_type = type(tool_call_result)
+        if tool_call_result_type in [AgentImage, AgentAudio]:
+            if tool_call_result_type == AgentImage:
+                observation_name = "image.png"
+            elif tool_call_result_type == AgentAudio:
+                observation_name = "audio.mp3"
+            # TODO: tool_call_result naming could allow for different names of same type
+            self.state[observation_name] = tool_call_result
+            observation = f"Stored '{observation_name}' in memory."
+        else:
+            observation = str(tool_call_result).strip()
+        self.logger.log(
+            f"Observations: {observation.replace('[', '|')}",  # escape potential rich-tag-like components
+            level=LogLevel.INFO,
+        )
+        is_final_answer = tool_call.name == "final_answer"
+
+        return ToolOutput(
+            id=tool_call.id,
+            output=tool_call_result,
+            is_final_answer=is_final_answer,
+            observation=observation,
+            tool_call=tool_call,
+            timing=timing,
+        )
+
+    def _record_tool_outputs(
+        self, memory_step: ActionStep, parallel_calls: dict[str, ToolCall], outputs: dict[str, ToolOutput]
+    ):
         memory_step.tool_calls = [parallel_calls[k] for k in sorted(parallel_calls.keys())]
         memory_step.observations = memory_step.observations or ""
         for tool_output in [outputs[k] for k in sorted(outputs.keys())]:
@@ -1402,6 +1913,49 @@ class ToolCallingAgent(MultiStepAgent):
             tool_name (`str`): Name of the tool or managed agent to execute.
             arguments (dict[str, str] | str): Arguments passed to the tool call.
         """
+        tool, arguments, is_managed_agent = self._prepare_tool_call(tool_name, arguments)
+        try:
+            if not is_managed_agent and inspect.iscoroutinefunction(getattr(tool, "forward", None)):
+                # Tools with an asynchronous `forward` method run on the event loop of the tool call executor
+                if isinstance(arguments, dict):
+                    return self.tool_executor.run_coroutine(tool.acall(**arguments, sanitize_inputs_outputs=True))
+                return self.tool_executor.run_coroutine(tool.acall(arguments, sanitize_inputs_outputs=True))
+            # Call tool with appropriate arguments
+            if isinstance(arguments, dict):
+                return tool(**arguments) if is_managed_agent else tool(**arguments, sanitize_inputs_outputs=True)
+            else:
+                return tool(arguments) if is_managed_agent else tool(arguments, sanitize_inputs_outputs=True)
+
+        except Exception as e:
+            raise self._make_tool_execution_error(tool_name, arguments, is_managed_agent, e) from e
+
+    async def aexecute_tool_call(self, tool_name: str, arguments: dict[str, str] | str) -> Any:
+        """
+        Asynchronous counterpart of [`~ToolCallingAgent.execute_tool_call`]: tools and managed agents are called with
+        their `acall` method.
+
+        Args:
+            tool_name (`str`): Name of the tool or managed agent to execute.
+            arguments (dict[str, str] | str): Arguments passed to the tool call.
+        """
+        tool, arguments, is_managed_agent = self._prepare_tool_call(tool_name, arguments)
+        try:
+            # Call tool with appropriate arguments
+            if isinstance(arguments, dict):
+                if is_managed_agent:
+                    return await tool.acall(**arguments)
+                return await tool.acall(**arguments, sanitize_inputs_outputs=True)
+            else:
+                if is_managed_agent:
+                    return await tool.acall(arguments)
+                return await tool.acall(arguments, sanitize_inputs_outputs=True)
+
+        except Exception as e:
+            raise self._make_tool_execution_error(tool_name, arguments, is_managed_agent, e) from e
+
+    def _prepare_tool_call(
+        self, tool_name: str, arguments: dict[str, str] | str
+    ) -> tuple[Tool | MultiStepAgent, dict[str, Any] | str, bool]:
         # Check if the tool exists
         available_tools = {**self.tools, **self.managed_agents}
         if tool_name not in available_tools:
@@ -1421,27 +1975,23 @@ class ToolCallingAgent(MultiStepAgent):
         except Exception as e:
             error_msg = f"Error executing tool '{tool_name}' with arguments {str(arguments)}: {type(e).__name__}: {e}"
             raise AgentToolExecutionError(error_msg, self.logger) from e
-
-        try:
-            # Call tool with appropriate arguments
-            if isinstance(arguments, dict):
-                return tool(**arguments) if is_managed_agent else tool(**arguments, sanitize_inputs_outputs=True)
-            else:
-                return tool(arguments) if is_managed_agent else tool(arguments, sanitize_inputs_outputs=True)
-
-        except Exception as e:
-            # Handle execution errors
-            if is_managed_agent:
-                error_msg = (
-                    f"Error executing request to team member '{tool_name}' with arguments {str(arguments)}: {e}\n"
-                    "Please try again or request to another team member"
-                )
-            else:
-                error_msg = (
-                    f"Error executing tool '{tool_name}' with arguments {str(arguments)}: {type(e).__name__}: {e}\n"
-                    "Please try again or use another tool"
-                )
-            raise AgentToolExecutionError(error_msg, self.logger) from e
+        return tool, arguments, is_managed_agent
+
+    def _make_tool_execution_error(
+        self, tool_name: str, arguments: dict[str, Any] | str, is_managed_agent: bool, error: Exception
+    ) -> AgentToolExecutionError:
+        # Handle execution errors
+        if is_managed_agent:
+            error_msg = (
+                f"Error executing request to team member '{tool_name}' with arguments {str(arguments)}: {error}\n"
+                "Please try again or request to another team member"
+            )
+        else:
+            error_msg = (
+                f"Error executing tool '{tool_name}' with arguments {str(arguments)}: {type(error).__name__}: {error}\n"
+                "Please try again or use another tool"
+            )
+        return AgentToolExecutionError(error_msg, self.logger)
 
 
 class CodeAgent(MultiStepAgent):
@@ -1454,7 +2004,8 @@ class CodeAgent(MultiStepAgent):
         prompt_templates ([`~agents.PromptTemplates`], *optional*): Prompt templates.
         additional_authorized_imports (`list[str]`, *optional*): Additional authorized imports for the agent.
         planning_interval (`int`, *optional*): Interval at which the agent will run a planning step.
-        executor_type (`Literal["local", "e2b", "docker", "wasm"]`, default `"local"`): Type of code executor.
+        executor_type (`Literal["local", "process", "e2b", "docker", "wasm"]`, default `"local"`): Type of code executor.
+            `"process"` runs the code in a worker process from a pool of pre-started processes.
         executor_kwargs (`dict`, *optional*): Additional arguments to pass to initialize the executor.
         max_print_outputs_length (`int`, *optional*): Maximum length of the print outputs.
         stream_outputs (`bool`, *optional*, default `False`): Whether to stream outputs during execution.
@@ -1462,6 +2013,8 @@ class CodeAgent(MultiStepAgent):
 
             <Added version="1.17.0"/>
         code_block_tags (`tuple[str, str]` | `Literal["markdown"]`, *optional*): Opening and closing tags for code blocks (regex strings). Pass a custom tuple, or pass 'markdown' to use ("```(?:python|py)", "\\n```"), leave empty to use ("<code>", "</code>").
+        stop_streaming_at_code_end (`bool`, default `False`): When streaming outputs, whether to stop the generation as soon as the first code block is complete, and execute it at once.
+            This saves the time and tokens spent generating text after the code, which is discarded anyway, but models that report token usage at the end of the stream then report none.
         **kwargs: Additional keyword arguments.
     """
 
@@ -1472,12 +2025,13 @@ class CodeAgent(MultiStepAgent):
         prompt_templates: PromptTemplates | None = None,
         additional_authorized_imports: list[str] | None = None,
         planning_interval: int | None = None,
-        executor_type: Literal["local", "e2b", "docker", "wasm"] = "local",
+        executor_type: Literal["local", "process", "e2b", "docker", "wasm"] = "local",
         executor_kwargs: dict[str, Any] | None = None,
         max_print_outputs_length: int | None = None,
         stream_outputs: bool = False,
         use_structured_outputs_internally: bool = False,
         code_block_tags: str | tuple[str, str] | None = None,
+        stop_streaming_at_code_end: bool = False,
         **kwargs,
     ):
         self.additional_authorized_imports = additional_authorized_imports if additional_authorized_imports else []
@@ -1515,12 +2069,13 @@ class CodeAgent(MultiStepAgent):
             raise ValueError(
                 "`stream_outputs` is set to True, but the model class implements no `generate_stream` method."
             )
+        self.stop_streaming_at_code_end = stop_streaming_at_code_end
         if "*" in self.additional_authorized_imports:
             self.logger.log(
                 "Caution: you set an authorization for all imports, meaning your agent can decide to import any package it deems necessary. This might raise issues if the package is not installed in your environment.",
                 level=LogLevel.INFO,
             )
-        if executor_type not in {"local", "e2b", "docker", "wasm","scalebox"}:
+        if executor_type not in {"local", "process", "e2b", "docker", "wasm","scalebox"}:
             raise ValueError(f"Unsupported executor type: {executor_type}")
         self.executor_type = executor_type
         self.executor_kwargs: dict[str, Any] = executor_kwargs or {}
@@ -1543,6 +2098,13 @@ class CodeAgent(MultiStepAgent):
                 self.additional_authorized_imports,
                 **{"max_print_outputs_length": self.max_print_outputs_length} | self.executor_kwargs,
             )
+        elif self.executor_type == "process":
+            if self.managed_agents:
+                raise Exception("Managed agents are not yet supported with process pool code execution.")
+            return ProcessPoolPythonExecutor(
+                self.additional_authorized_imports,
+                **{"max_print_outputs_length": self.max_print_outputs_length} | self.executor_kwargs,
+            )
         else:
             if self.managed_agents:
                 raise Exception("Managed agents are not yet supported with remote code execution.")
@@ -1582,63 +2144,109 @@ class CodeAgent(MultiStepAgent):
         Yields ChatMessageStreamDelta during the run if streaming is enabled.
         At the end, yields either None if the step is not final, or the final answer.
         """
-        memory_messages = self.write_memory_to_messages()
-
-        input_messages = memory_messages.copy()
         ### Generate model output ###
-        memory_step.model_input_messages = input_messages
-        stop_sequences = ["Observation:", "Calling tools:"]
-        if self.code_block_tags[1] not in self.code_block_tags[0]:
-            # If the closing tag is contained in the opening tag, adding it as a stop sequence would cut short any code generation
-            stop_sequences.append(self.code_block_tags[1])
+        input_messages = self._get_step_input_messages(memory_step)
         try:
-            additional_args: dict[str, Any] = {}
-            if self._use_structured_outputs_internally:
-                additional_args["response_format"] = CODEAGENT_RESPONSE_FORMAT
+            generation_kwargs = self._get_generation_kwargs()
             if self.stream_outputs:
-                output_stream = self.model.generate_stream(
-                    input_messages,
-                    stop_sequences=stop_sequences,
-                    **additional_args,
-                )
-                chat_message_stream_deltas: list[ChatMessageStreamDelta] = []
-                with Live("", console=self.logger.console, vertical_overflow="visible") as live:
+                output_stream = self.model.generate_stream(input_messages, **generation_kwargs)
+                with OutputStreamDisplay(self.logger.console, self._get_code_block_end_detector()) as output_display:
                     for event in output_stream:
-                        chat_message_stream_deltas.append(event)
-                        live.update(
-                            Markdown(agglomerate_stream_deltas(chat_message_stream_deltas).render_as_markdown())
-                        )
+                        code_block_ended = output_display.add(event)
                         yield event
-                chat_message = agglomerate_stream_deltas(chat_message_stream_deltas)
-                memory_step.model_output_message = chat_message
-                output_text = chat_message.content
+                        if code_block_ended:
+                            # The code is complete: cancel the rest of the generation to execute it at once
+                            output_stream.close()
+                            break
+                chat_message = output_display.to_message()
             else:
-                chat_message: ChatMessage = self.model.generate(
-                    input_messages,
-                    stop_sequences=stop_sequences,
-                    **additional_args,
-                )
-                memory_step.model_output_message = chat_message
-                output_text = chat_message.content
-                self.logger.log_markdown(
-                    content=output_text,
-                    title="Output message of the LLM:",
-                    level=LogLevel.DEBUG,
-                )
+                chat_message = self.model.generate(input_messages, **generation_kwargs)
+            output_text = self._record_model_output(chat_message, memory_step)
+        except Exception as e:
+            raise AgentGenerationError(f"Error in generating model output:\n{e}", self.logger) from e
 
-            if not self._use_structured_outputs_internally:
-                # This adds the end code sequence (i.e. the closing code block tag) to the history.
-                # This will nudge subsequent LLM calls to finish with this end code sequence, thus efficiently stopping generation.
-                if output_text and not output_text.strip().endswith(self.code_block_tags[1]):
-                    output_text += self.code_block_tags[1]
-                    memory_step.model_output_message.content = output_text
+        tool_call = self._make_code_tool_call(output_text, memory_step)
+        yield tool_call
+
+        ### Execute action ###
+        try:
+            code_output = self.python_executor(tool_call.arguments)
+        except Exception as e:
+            raise self._make_execution_error(e, memory_step)
+        yield self._record_code_output(code_output, memory_step)
 
-            memory_step.token_usage = chat_message.token_usage
-            memory_step.model_output = output_text
+    async def _astep_stream(
+        self, memory_step: ActionStep
+    ) -> AsyncGenerator[ChatMessageStreamDelta | ToolCall | ToolOutput | ActionOutput]:
+        """Asynchronous counterpart of `_step_stream`: the model is awaited and the code runs in a worker thread."""
+        ### Generate model output ###
+        input_messages = self._get_step_input_messages(memory_step)
+        try:
+            generation_kwargs = self._get_generation_kwargs()
+            if self.stream_outputs:
+                output_stream = self.model.agenerate_stream(input_messages, **generation_kwargs)
+                with OutputStreamDisplay(self.logger.console, self._get_code_block_end_detector()) as output_display:
+                    async for event in output_stream:
+                        code_block_ended = output_display.add(event)
+                        yield event
+                        if code_block_ended:
+                            # The code is complete: cancel the rest of the generation to execute it at once
+                            await output_stream.aclose()
+                            break
+                chat_message = output_display.to_message()
+            else:
+                chat_message = await self.model.agenerate(input_messages, **generation_kwargs)
+            output_text = self._record_model_output(chat_message, memory_step)
         except Exception as e:
             raise AgentGenerationError(f"Error in generating model output:\n{e}", self.logger) from e
 
-        ### Parse output ###
+        tool_call = self._make_code_tool_call(output_text, memory_step)
+        yield tool_call
+
+        ### Execute action ###
+        try:
+            code_output = await asyncio.to_thread(self.python_executor, tool_call.arguments)
+        except Exception as e:
+            raise self._make_execution_error(e, memory_step)
+        yield self._record_code_output(code_output, memory_step)
+
+    def _get_generation_kwargs(self) -> dict[str, Any]:
+        stop_sequences = ["Observation:", "Calling tools:"]
+        if self.code_block_tags[1] not in self.code_block_tags[0]:
+            # If the closing tag is contained in the opening tag, adding it as a stop sequence would cut short any code generation
+            stop_sequences.append(self.code_block_tags[1])
+        generation_kwargs: dict[str, Any] = {"stop_sequences": stop_sequences}
+        if self._use_structured_outputs_internally:
+            generation_kwargs["response_format"] = CODEAGENT_RESPONSE_FORMAT
+        return generation_kwargs
+
+    def _get_code_block_end_detector(self) -> CodeBlockEndDetector | None:
+        if self.stop_streaming_at_code_end and not self._use_structured_outputs_internally:
+            return CodeBlockEndDetector(self.code_block_tags)
+        return None
+
+    def _record_model_output(self, chat_message: ChatMessage, memory_step: ActionStep) -> str:
+        memory_step.model_output_message = chat_message
+        output_text = chat_message.content
+        if not self.stream_outputs:
+            self.logger.log_markdown(
+                content=output_text,
+                title="Output message of the LLM:",
+                level=LogLevel.DEBUG,
+            )
+
+        if not self._use_structured_outputs_internally:
+            # This adds the end code sequence (i.e. the closing code block tag) to the history.
+            # This will nudge subsequent LLM calls to finish with this end code sequence, thus efficiently stopping generation.
+            if output_text and not output_text.strip().endswith(self.code_block_tags[1]):
+                output_text += self.code_block_tags[1]
+                memory_step.model_output_message.content = output_text
+
+        memory_step.token_usage = chat_message.token_usage
+        memory_step.model_output = output_text
+        return output_text
+
+    def _parse_code_action(self, output_text: str, memory_step: ActionStep) -> str:
         try:
             if self._use_structured_outputs_internally:
                 code_action = json.loads(output_text)["code"]
@@ -1650,43 +2258,47 @@ class CodeAgent(MultiStepAgent):
         except Exception as e:
             error_msg = f"Error in code parsing:\n{e}\nMake sure to provide correct code blobs."
             raise AgentParsingError(error_msg, self.logger)
+        return code_action
 
+    def _make_code_tool_call(self, output_text: str, memory_step: ActionStep) -> ToolCall:
+        code_action = self._parse_code_action(output_text, memory_step)
         tool_call = ToolCall(
             name="python_interpreter",
             arguments=code_action,
             id=f"call_{len(self.memory.steps)}",
         )
-        yield tool_call
         memory_step.tool_calls = [tool_call]
-
-        ### Execute action ###
         self.logger.log_code(title="Executing parsed code:", content=code_action, level=LogLevel.INFO)
-        try:
-            code_output = self.python_executor(code_action)
-            execution_outputs_console = []
-            if len(code_output.logs) > 0:
-                execution_outputs_console += [
+        return tool_call
+
+    def _make_execution_error(self, error: Exception, memory_step: ActionStep) -> AgentExecutionError:
+        memory_step.profile = getattr(self.python_executor, "last_profile", None)
+        if hasattr(self.python_executor, "state") and "_print_outputs" in self.python_executor.state:
+            execution_logs = str(self.python_executor.state["_print_outputs"])
+            if len(execution_logs) > 0:
+                execution_outputs_console = [
                     Text("Execution logs:", style="bold"),
-                    Text(code_output.logs),
+                    Text(execution_logs),
                 ]
-            observation = "Execution logs:\n" + code_output.logs
-        except Exception as e:
-            if hasattr(self.python_executor, "state") and "_print_outputs" in self.python_executor.state:
-                execution_logs = str(self.python_executor.state["_print_outputs"])
-                if len(execution_logs) > 0:
-                    execution_outputs_console = [
-                        Text("Execution logs:", style="bold"),
-                        Text(execution_logs),
-                    ]
-                    memory_step.observations = "Execution logs:\n" + execution_logs
-                    self.logger.log(Group(*execution_outputs_console), level=LogLevel.INFO)
-            error_msg = str(e)
-            if "Import of " in error_msg and " is not allowed" in error_msg:
-                self.logger.log(
-                    "[bold red]Warning to user: Code execution failed due to an unauthorized import - Consider passing said import under `additional_authorized_imports` when initializing your CodeAgent.",
-                    level=LogLevel.INFO,
-                )
-            raise AgentExecutionError(error_msg, self.logger)
+                memory_step.observations = "Execution logs:\n" + execution_logs
+                self.logger.log(Group(*execution_outputs_console), level=LogLevel.INFO)
+        error_msg = str(error)
+        if "Import of " in error_msg and " is not allowed" in error_msg:
+            self.logger.log(
+                "[bold red]Warning to user: Code execution failed due to an unauthorized import - Consider passing said import under `additional_authorized_imports` when initializing your CodeAgent.",
+                level=LogLevel.INFO,
+            )
+        return AgentExecutionError(error_msg, self.logger)
+
+    def _record_code_output(self, code_output: CodeOutput, memory_step: ActionStep) -> ActionOutput:
+        memory_step.profile = code_output.profile
+        execution_outputs_console = []
+        if len(code_output.logs) > 0:
+            execution_outputs_console += [
+                Text("Execution logs:", style="bold"),
+                Text(code_output.logs),
+            ]
+        observation = "Execution logs:\n" + code_output.logs
 
         truncated_output = truncate_content(str(code_output.output))
         observation += "Last output from code snippet:\n" + truncated_output
@@ -1700,7 +2312,7 @@ class CodeAgent(MultiStepAgent):
             ]
         self.logger.log(Group(*execution_outputs_console), level=LogLevel.INFO)
         memory_step.action_output = code_output.output
-        yield ActionOutput(output=code_output.output, is_final_answer=code_output.is_final_answer)
+        return ActionOutput(output=code_output.output, is_final_answer=code_output.is_final_answer)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert the agent to a dictionary representation.
@@ -1715,6 +2327,18 @@ class CodeAgent(MultiStepAgent):
         agent_dict["max_print_outputs_length"] = self.max_print_outputs_length
         return agent_dict
 
+    def _get_clone_kwargs(self) -> dict[str, Any]:
+        return super()._get_clone_kwargs() | {
+            "additional_authorized_imports": self.additional_authorized_imports,
+            "executor_type": self.executor_type,
+            "executor_kwargs": self.executor_kwargs,
+            "max_print_outputs_length": self.max_print_outputs_length,
+            "stream_outputs": self.stream_outputs,
+            "use_structured_outputs_internally": self._use_structured_outputs_internally,
+            "code_block_tags": self.code_block_tags,
+            "stop_streaming_at_code_end": self.stop_streaming_at_code_end,
+        }
+
     @classmethod
     def from_dict(cls, agent_dict: dict[str, Any], **kwargs) -> "CodeAgent":
         """Create CodeAgent from a dictionary representation.
@@ -1740,3 +2364,83 @@ class CodeAgent(MultiStepAgent):
         code_agent_kwargs.update(kwargs)
         # Call the parent class's from_dict method
         return super().from_dict(agent_dict, **code_agent_kwargs)
+
+
+class DelegateTasksTool(Tool):
+    """
+    Tool delegating several tasks to managed agents at the same time, and returning their reports.
+
+    Each task runs in a fresh clone of its agent, created with the same init arguments: clones have their own memory,
+    monitor and logger, so that independent tasks, including several tasks for the same agent, do not interfere. A
+    fan-out to several agents thus takes as long as the slowest of them, instead of the sum of their durations.
+
+    The tool holds live agents, so it is left out by [`~MultiStepAgent.to_dict`] and [`~MultiStepAgent.save`] of the
+    agent using it: add it again after loading that agent.
+
+    Args:
+        agents (`list[MultiStepAgent]`): Agents that tasks can be delegated to. They need both a name and a description.
+        max_workers (`int`, *optional*): Maximum number of agents running at the same time. Defaults to the number of
+            tasks.
+
+    Example:
+    ```py
+    researcher = ToolCallingAgent(tools=[WebSearchTool()], model=model, name="researcher", description="Searches the web.")
+    manager = CodeAgent(tools=[DelegateTasksTool([researcher])], model=model)
+    manager.run("Compare the populations of the 5 largest cities in Europe.")
+    ```
+    """
+
+    name = "delegate_tasks"
+    inputs = {
+        "tasks": {
+            "type": "array",
+            "description": (
+                "Tasks to run at the same time, as a list of dictionaries with keys 'agent', the name of the team "
+                "member to delegate the task to, and 'task', a long detailed description of the task."
+            ),
+        }
+    }
+    output_type = "array"
+
+    def __init__(self, agents: list[MultiStepAgent], max_workers: int | None = None):
+        assert all(agent.name and agent.description for agent in agents), (
+            "All agents need both a name and a description!"
+        )
+        self.agents = {agent.name: agent for agent in agents}
+        self.max_workers = max_workers
+        self.description = (
+            "Delegates independent tasks to team members that work on them at the same time, and returns the list of "
+            "their reports, in the order of the tasks. Available team members:\n"
+            + "\n".join(f"- {agent.name}: {agent.description}" for agent in agents)
+        )
+        super().__init__()
+
+    def forward(self, tasks: list[dict[str, str]]) -> list[str]:
+        if not isinstance(tasks, list) or not all(isinstance(task, dict) for task in tasks):
+            raise ValueError(
+                "'tasks' must be a list of dictionaries with keys 'agent' and 'task', for instance "
+                f"[{{'agent': {next(iter(self.agents))!r}, 'task': '...'}}], got {tasks!r}."
+            )
+        for task in tasks:
+            if not isinstance(task.get("task"), str):
+                raise ValueError(f"Task {task!r} needs a key 'task' holding the description of the task.")
+            if task.get("agent") not in self.agents:
+                raise ValueError(
+                    f"Unknown team member {task.get('agent')!r}: choose among {list(self.agents)} for the key 'agent'."
+                )
+        if not tasks:
+            return []
+        with ThreadPoolExecutor(self.max_workers or len(tasks)) as executor:
+            return list(executor.map(self._run_task, tasks))
+
+    def _run_task(self, task: dict[str, str]) -> str:
+        agent = self.agents[task["agent"]]
+        clone = agent._clone()
+        try:
+            return clone(task["task"])
+        except Exception as e:
+            # Report the failure instead of raising, so that the reports of the other agents are not lost
+            return f"Team member '{agent.name}' failed: {type(e).__name__}: {e}"
+        finally:
+            if hasattr(clone, "cleanup"):
+                clone.cleanup()
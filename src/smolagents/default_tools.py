@@ -15,7 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from .local_python_executor import (
     BASE_BUILTIN_MODULES,
@@ -25,6 +25,10 @@ from .local_python_executor import (
 from .tools import PipelineTool, Tool
 
 
+if TYPE_CHECKING:
+    from .utils import RateLimiter
+
+
 @dataclass
 class PreTool:
     name: str
@@ -104,6 +108,8 @@ class DuckDuckGoSearchTool(Tool):
     Args:
         max_results (`int`, default `10`): Maximum number of search results to return.
         rate_limit (`float`, default `1.0`): Maximum queries per second. Set to `None` to disable rate limiting.
+        rate_limiter (`RateLimiter | str`, *optional*): Rate limiter to use instead of the one built from `rate_limit`,
+            e.g. to share a quota between several tools. If a string is given, the limiter shared under this name is used.
         **kwargs: Additional keyword arguments for the `DDGS` client.
 
     Examples:
@@ -120,12 +126,19 @@ class DuckDuckGoSearchTool(Tool):
     inputs = {"query": {"type": "string", "description": "The search query to perform."}}
     output_type = "string"
 
-    def __init__(self, max_results: int = 10, rate_limit: float | None = 1.0, **kwargs):
+    def __init__(
+        self,
+        max_results: int = 10,
+        rate_limit: float | None = 1.0,
+        rate_limiter: "RateLimiter | str | None" = None,
+        **kwargs,
+    ):
+        from smolagents.utils import RateLimiter
+
         super().__init__()
         self.max_results = max_results
         self.rate_limit = rate_limit
-        self._min_interval = 1.0 / rate_limit if rate_limit else 0.0
-        self._last_request_time = 0.0
+        self.rate_limiter = RateLimiter.resolve(rate_limiter, rate_limit * 60 if rate_limit else None)
         try:
             from ddgs import DDGS
         except ImportError as e:
@@ -135,26 +148,13 @@ class DuckDuckGoSearchTool(Tool):
         self.ddgs = DDGS(**kwargs)
 
     def forward(self, query: str) -> str:
-        self._enforce_rate_limit()
-        results = self.ddgs.text(query, max_results=self.max_results)
+        with self.rate_limiter.limit():
+            results = self.ddgs.text(query, max_results=self.max_results)
         if len(results) == 0:
             raise Exception("No results found! Try a less restrictive/shorter query.")
         postprocessed_results = [f"[{result['title']}]({result['href']})\n{result['body']}" for result in results]
         return "## Search Results\n\n" + "\n\n".join(postprocessed_results)
 
-    def _enforce_rate_limit(self) -> None:
-        import time
-
-        # No rate limit enforced
-        if not self.rate_limit:
-            return
-
-        now = time.time()
-        elapsed = now - self._last_request_time
-        if elapsed < self._min_interval:
-            time.sleep(self._min_interval - elapsed)
-        self._last_request_time = time.time()
-
 
 class GoogleSearchTool(Tool):
     name = "web_search"
@@ -257,6 +257,8 @@ class ApiWebSearchTool(Tool):
         headers (`dict`, *optional*): Headers for API requests.
         params (`dict`, *optional*): Parameters for API requests.
         rate_limit (`float`, default `1.0`): Maximum queries per second. Set to `None` to disable rate limiting.
+        rate_limiter (`RateLimiter | str`, *optional*): Rate limiter to use instead of the one built from `rate_limit`,
+            e.g. to share a quota between several tools. If a string is given, the limiter shared under this name is used.
 
     Examples:
         ```python
@@ -280,9 +282,12 @@ class ApiWebSearchTool(Tool):
         headers: dict = None,
         params: dict = None,
         rate_limit: float | None = 1.0,
+        rate_limiter: "RateLimiter | str | None" = None,
     ):
         import os
 
+        from smolagents.utils import RateLimiter
+
         super().__init__()
         self.endpoint = endpoint or "https://api.search.brave.com/res/v1/web/search"
         self.api_key_name = api_key_name or "BRAVE_API_KEY"
@@ -290,28 +295,14 @@ class ApiWebSearchTool(Tool):
         self.headers = headers or {"X-Subscription-Token": self.api_key}
         self.params = params or {"count": 10}
         self.rate_limit = rate_limit
-        self._min_interval = 1.0 / rate_limit if rate_limit else 0.0
-        self._last_request_time = 0.0
-
-    def _enforce_rate_limit(self) -> None:
-        import time
-
-        # No rate limit enforced
-        if not self.rate_limit:
-            return
-
-        now = time.time()
-        elapsed = now - self._last_request_time
-        if elapsed < self._min_interval:
-            time.sleep(self._min_interval - elapsed)
-        self._last_request_time = time.time()
+        self.rate_limiter = RateLimiter.resolve(rate_limiter, rate_limit * 60 if rate_limit else None)
 
     def forward(self, query: str) -> str:
         import requests
 
-        self._enforce_rate_limit()
         params = {**self.params, "q": query}
-        response = requests.get(self.endpoint, headers=self.headers, params=params)
+        with self.rate_limiter.limit():
+            response = requests.get(self.endpoint, headers=self.headers, params=params)
         response.raise_for_status()
         data = response.json()
         results = self.extract_results(data)
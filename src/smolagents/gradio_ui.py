@@ -16,13 +16,14 @@
 import os
 import re
 import shutil
+import time
 from pathlib import Path
 from typing import Generator
 
 from smolagents.agent_types import AgentAudio, AgentImage, AgentText
 from smolagents.agents import MultiStepAgent, PlanningStep
 from smolagents.memory import ActionStep, FinalAnswerStep
-from smolagents.models import ChatMessageStreamDelta, MessageRole, agglomerate_stream_deltas
+from smolagents.models import ChatMessageStreamDelta, MessageRole, StreamAccumulator
 from smolagents.utils import _is_package_available
 
 
@@ -251,29 +252,43 @@ def stream_to_gradio(
     task_images: list | None = None,
     reset_agent_memory: bool = False,
     additional_args: dict | None = None,
+    update_interval: float = 0.1,
 ) -> Generator:
-    """Runs an agent with the given task and streams the messages from the agent as gradio ChatMessages."""
+    """Runs an agent with the given task and streams the messages from the agent as gradio ChatMessages.
+
+    Streamed model outputs are yielded as the text generated so far, at most once every `update_interval` seconds.
+    """
 
     if not _is_package_available("gradio"):
         raise ModuleNotFoundError(
             "Please install 'gradio' extra to use the GradioUI: `pip install 'smolagents[gradio]'`"
         )
-    accumulated_events: list[ChatMessageStreamDelta] = []
+    stream_accumulator = StreamAccumulator()
+    has_pending_text = False
+    last_update_time = float("-inf")
     for event in agent.run(
         task, images=task_images, stream=True, reset=reset_agent_memory, additional_args=additional_args
     ):
         if isinstance(event, ActionStep | PlanningStep | FinalAnswerStep):
+            if has_pending_text:
+                yield stream_accumulator.render_as_markdown()
             for message in pull_messages_from_step(
                 event,
                 # If we're streaming model outputs, no need to display them twice
                 skip_model_outputs=getattr(agent, "stream_outputs", False),
             ):
                 yield message
-            accumulated_events = []
+            stream_accumulator = StreamAccumulator()
+            has_pending_text = False
         elif isinstance(event, ChatMessageStreamDelta):
-            accumulated_events.append(event)
-            text = agglomerate_stream_deltas(accumulated_events).render_as_markdown()
-            yield text
+            stream_accumulator.add(event)
+            has_pending_text = True
+            if time.monotonic() - last_update_time >= update_interval:
+                yield stream_accumulator.render_as_markdown()
+                has_pending_text = False
+                last_update_time = time.monotonic()
+    if has_pending_text:
+        yield stream_accumulator.render_as_markdown()
 
 
 class GradioUI:
@@ -1,4 +1,6 @@
 import inspect
+import operator
+from collections.abc import Sequence
 from dataclasses import asdict, dataclass
 from logging import getLogger
 from typing import TYPE_CHECKING, Any, Callable, Type
@@ -11,11 +13,12 @@ from smolagents.utils import AgentError, make_json_serializable
 if TYPE_CHECKING:
     import PIL.Image
 
+    from smolagents.local_python_executor import ExecutionProfile
     from smolagents.models import ChatMessage
     from smolagents.monitoring import AgentLogger
 
 
-__all__ = ["AgentMemory"]
+__all__ = ["AgentMemory", "MessagesSnapshot"]
 
 
 logger = getLogger(__name__)
@@ -38,20 +41,110 @@ class ToolCall:
         }
 
 
+class MessagesSnapshot(Sequence):
+    """
+    Compact read-only list of the messages given as input to a model call.
+
+    The inputs of successive model calls mostly share the same messages: a snapshot only stores the messages that
+    differ from a previous snapshot, and references the first `prefix_length` messages of that previous snapshot.
+    The full list of messages is rebuilt on demand, so a run stores its inputs in linear rather than quadratic space.
+    Indexing a single message walks the chain of snapshots instead of rebuilding the list.
+
+    Copies, deep copies and pickles of a snapshot are flattened into a standalone snapshot holding the full list of
+    messages: the chain of snapshots, which grows with the number of steps, is not recursed through, but copying the
+    inputs of every step of a run (e.g. with `copy.deepcopy(agent.memory)`) takes quadratic space again.
+
+    Args:
+        messages (`list[ChatMessage]`): Messages following the shared prefix.
+        parent (`MessagesSnapshot`, *optional*): Snapshot whose first messages are shared.
+        prefix_length (`int`, default `0`): Number of messages of `parent` that are shared.
+    """
+
+    __slots__ = ("_parent", "_prefix_length", "_messages", "_length")
+
+    def __init__(self, messages: list[ChatMessage], parent: "MessagesSnapshot | None" = None, prefix_length: int = 0):
+        if parent is None:
+            prefix_length = 0
+        self._parent = parent if prefix_length > 0 else None
+        self._prefix_length = prefix_length
+        self._messages = list(messages)
+        self._length = prefix_length + len(self._messages)
+
+    def to_list(self) -> list[ChatMessage]:
+        """Rebuilds the full list of messages."""
+        chunks = []
+        snapshot, length = self, self._length
+        while snapshot is not None and length > 0:
+            if length > snapshot._prefix_length:
+                chunks.append(snapshot._messages[: length - snapshot._prefix_length])
+                length = snapshot._prefix_length
+            snapshot = snapshot._parent
+        return [message for chunk in reversed(chunks) for message in chunk]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        index = operator.index(index)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MessagesSnapshot index out of range")
+        snapshot = self
+        while index < snapshot._prefix_length:
+            snapshot = snapshot._parent
+        return snapshot._messages[index - snapshot._prefix_length]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+    def __reduce__(self):
+        # Copies are flattened, to avoid recursing through the chain of snapshots
+        return (MessagesSnapshot, (self.to_list(),))
+
+
 @dataclass
 class MemoryStep:
+    def __setattr__(self, name: str, value: Any):
+        # Assigning an attribute, e.g. from a step callback, invalidates the messages rendered from the step
+        self.__dict__.pop("_rendered_messages", None)
+        super().__setattr__(name, value)
+
     def dict(self):
         return asdict(self)
 
     def to_messages(self, summary_mode: bool = False) -> list[ChatMessage]:
         raise NotImplementedError
 
+    def render_messages(self, summary_mode: bool = False) -> list[ChatMessage]:
+        """
+        Returns the messages of `to_messages`, cached until an attribute of the step is assigned.
+
+        The returned list and messages are shared between calls and must not be modified.
+        """
+        rendered_messages = self.__dict__.setdefault("_rendered_messages", {})
+        if summary_mode not in rendered_messages:
+            rendered_messages[summary_mode] = self.to_messages(summary_mode=summary_mode)
+        return rendered_messages[summary_mode]
+
 
 @dataclass
 class ActionStep(MemoryStep):
     step_number: int
     timing: Timing
-    model_input_messages: list[ChatMessage] | None = None
+    model_input_messages: list[ChatMessage] | MessagesSnapshot | None = None
     tool_calls: list[ToolCall] | None = None
     error: AgentError | None = None
     model_output_message: ChatMessage | None = None
@@ -62,13 +155,14 @@ class ActionStep(MemoryStep):
     action_output: Any = None
     token_usage: TokenUsage | None = None
     is_final_answer: bool = False
+    profile: "ExecutionProfile | None" = None
 
     def dict(self):
         # We overwrite the method to parse the tool_calls and action_output manually
         return {
             "step_number": self.step_number,
             "timing": self.timing.dict(),
-            "model_input_messages": self.model_input_messages,
+            "model_input_messages": list(self.model_input_messages) if self.model_input_messages is not None else None,
             "tool_calls": [tc.dict() for tc in self.tool_calls] if self.tool_calls else [],
             "error": self.error.dict() if self.error else None,
             "model_output_message": self.model_output_message.dict() if self.model_output_message else None,
@@ -81,6 +175,7 @@ class ActionStep(MemoryStep):
             "action_output": make_json_serializable(self.action_output),
             "token_usage": asdict(self.token_usage) if self.token_usage else None,
             "is_final_answer": self.is_final_answer,
+            "profile": self.profile.dict() if self.profile else None,
         }
 
     def to_messages(self, summary_mode: bool = False) -> list[ChatMessage]:
@@ -209,10 +304,56 @@ class AgentMemory:
     def __init__(self, system_prompt: str):
         self.system_prompt: SystemPromptStep = SystemPromptStep(system_prompt=system_prompt)
         self.steps: list[TaskStep | ActionStep | PlanningStep] = []
+        # Last snapshot of model input messages, with its full list of messages
+        self._last_snapshot: tuple[MessagesSnapshot, list[ChatMessage]] | None = None
 
     def reset(self):
         """Reset the agent's memory, clearing all steps and keeping the system prompt."""
         self.steps = []
+        self._last_snapshot = None
+
+    def snapshot_messages(self, messages: list[ChatMessage]) -> MessagesSnapshot:
+        """
+        Return a compact snapshot of the input messages of a model call, sharing the messages in common with the
+        previous snapshot.
+
+        Messages are shared when they are the same objects, which is the case for the messages rendered from steps
+        that did not change between two calls, see `to_messages`.
+
+        Args:
+            messages (`list[ChatMessage]`): Input messages of the model call.
+        """
+        messages = list(messages)
+        if self._last_snapshot is None:
+            snapshot = MessagesSnapshot(messages)
+        else:
+            previous_snapshot, previous_messages = self._last_snapshot
+            prefix_length = 0
+            for message, previous_message in zip(messages, previous_messages):
+                if message is not previous_message:
+                    break
+                prefix_length += 1
+            snapshot = MessagesSnapshot(
+                messages[prefix_length:], parent=previous_snapshot, prefix_length=prefix_length
+            )
+        self._last_snapshot = (snapshot, messages)
+        return snapshot
+
+    def to_messages(self, summary_mode: bool = False) -> list[ChatMessage]:
+        """
+        Return the messages of the system prompt and of all steps, as input for the model.
+
+        The messages of each step are rendered once and cached on the step, so that only new or modified steps are
+        rendered again. Steps modified in place, e.g. by appending to one of their lists, must have the modified
+        attribute assigned again to be rendered anew.
+
+        Args:
+            summary_mode (`bool`, default `False`): Whether to render the steps in summary mode.
+        """
+        messages = list(self.system_prompt.render_messages(summary_mode=summary_mode))
+        for step in self.steps:
+            messages.extend(step.render_messages(summary_mode=summary_mode))
+        return messages
 
     def get_succinct_steps(self) -> list[dict]:
         """Return a succinct representation of the agent's steps, excluding model input messages."""
@@ -11,22 +11,41 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import email.utils
+import hashlib
 import json
 import logging
 import os
+import random
 import re
+import sqlite3
+import time
 import uuid
 import warnings
-from collections.abc import Generator
+from collections import OrderedDict, deque
+from collections.abc import AsyncGenerator, Awaitable, Callable, Generator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar, Token
 from copy import deepcopy
 from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from enum import Enum
-from threading import Thread
+from functools import lru_cache
+from pathlib import Path
+from threading import Event, Lock, Thread
 from typing import TYPE_CHECKING, Any
 
 from .monitoring import TokenUsage
 from .tools import Tool
-from .utils import RateLimiter, _is_package_available, encode_image_base64, make_image_url, parse_json_blob
+from .utils import (
+    RateLimiter,
+    _is_package_available,
+    encode_image_base64,
+    iterate_in_thread,
+    make_image_url,
+    parse_json_blob,
+)
 
 
 if TYPE_CHECKING:
@@ -172,66 +191,105 @@ class ChatMessageStreamDelta:
     token_usage: TokenUsage | None = None
 
 
+class StreamAccumulator:
+    """
+    Folds stream deltas one at a time into the message they build up, as `agglomerate_stream_deltas` does for a list of
+    deltas.
+
+    Adding a delta only appends its content and tool call arguments to lists of chunks, in constant time: chunks are
+    joined when the accumulated text is read, so that the whole stream is aggregated in linear time.
+
+    Args:
+        role (`MessageRole`, default `MessageRole.ASSISTANT`): Role of the accumulated message.
+
+    Example:
+    ```py
+    accumulator = StreamAccumulator()
+    for delta in model.generate_stream(messages):
+        accumulator.add(delta)
+    chat_message = accumulator.to_message()
+    ```
+    """
+
+    def __init__(self, role: MessageRole = MessageRole.ASSISTANT):
+        self.role = role
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._content_chunks: list[str] = []
+        # Tool calls by index, as dictionaries with keys "id", "type", "name" and "argument_chunks"
+        self._tool_calls: dict[int, dict[str, Any]] = {}
+
+    def add(self, stream_delta: ChatMessageStreamDelta):
+        """Folds a stream delta into the accumulated message."""
+        if stream_delta.token_usage:
+            self.input_tokens += stream_delta.token_usage.input_tokens
+            self.output_tokens += stream_delta.token_usage.output_tokens
+        if stream_delta.content:
+            self._content_chunks.append(stream_delta.content)
+        for tool_call_delta in stream_delta.tool_calls or []:  # Normally there should be only one call at a time
+            if tool_call_delta.index is None:
+                raise ValueError(f"Tool call index is not provided in tool delta: {tool_call_delta}")
+            tool_call = self._tool_calls.setdefault(
+                tool_call_delta.index,
+                {"id": tool_call_delta.id, "type": tool_call_delta.type, "name": "", "argument_chunks": []},
+            )
+            if tool_call_delta.id:
+                tool_call["id"] = tool_call_delta.id
+            if tool_call_delta.type:
+                tool_call["type"] = tool_call_delta.type
+            if tool_call_delta.function:
+                if tool_call_delta.function.name:
+                    tool_call["name"] = tool_call_delta.function.name
+                if tool_call_delta.function.arguments:
+                    tool_call["argument_chunks"].append(tool_call_delta.function.arguments)
+
+    @property
+    def content(self) -> str:
+        """The content accumulated so far."""
+        if len(self._content_chunks) > 1:
+            self._content_chunks = ["".join(self._content_chunks)]
+        return self._content_chunks[0] if self._content_chunks else ""
+
+    def _get_tool_calls(self) -> list[ChatMessageToolCall]:
+        tool_calls = []
+        for tool_call in self._tool_calls.values():
+            if len(tool_call["argument_chunks"]) > 1:
+                tool_call["argument_chunks"] = ["".join(tool_call["argument_chunks"])]
+            tool_calls.append(
+                ChatMessageToolCall(
+                    function=ChatMessageToolCallFunction(
+                        name=tool_call["name"], arguments="".join(tool_call["argument_chunks"])
+                    ),
+                    id=tool_call["id"] or "",
+                    type="function",
+                )
+            )
+        return tool_calls
+
+    def to_message(self) -> ChatMessage:
+        """Returns the message accumulated so far."""
+        return ChatMessage(
+            role=self.role,
+            content=self.content,
+            tool_calls=self._get_tool_calls(),
+            token_usage=TokenUsage(input_tokens=self.input_tokens, output_tokens=self.output_tokens),
+        )
+
+    def render_as_markdown(self) -> str:
+        """Renders the message accumulated so far as Markdown, see `ChatMessage.render_as_markdown`."""
+        return self.to_message().render_as_markdown()
+
+
 def agglomerate_stream_deltas(
     stream_deltas: list[ChatMessageStreamDelta], role: MessageRole = MessageRole.ASSISTANT
 ) -> ChatMessage:
     """
     Agglomerate a list of stream deltas into a single stream delta.
     """
-    accumulated_tool_calls: dict[int, ChatMessageToolCallStreamDelta] = {}
-    accumulated_content = ""
-    total_input_tokens = 0
-    total_output_tokens = 0
+    accumulator = StreamAccumulator(role=role)
     for stream_delta in stream_deltas:
-        if stream_delta.token_usage:
-            total_input_tokens += stream_delta.token_usage.input_tokens
-            total_output_tokens += stream_delta.token_usage.output_tokens
-        if stream_delta.content:
-            accumulated_content += stream_delta.content
-        if stream_delta.tool_calls:
-            for tool_call_delta in stream_delta.tool_calls:  # ?ormally there should be only one call at a time
-                # Extend accumulated_tool_calls list to accommodate the new tool call if needed
-                if tool_call_delta.index is not None:
-                    if tool_call_delta.index not in accumulated_tool_calls:
-                        accumulated_tool_calls[tool_call_delta.index] = ChatMessageToolCallStreamDelta(
-                            id=tool_call_delta.id,
-                            type=tool_call_delta.type,
-                            function=ChatMessageToolCallFunction(name="", arguments=""),
-                        )
-                    # Update the tool call at the specific index
-                    tool_call = accumulated_tool_calls[tool_call_delta.index]
-                    if tool_call_delta.id:
-                        tool_call.id = tool_call_delta.id
-                    if tool_call_delta.type:
-                        tool_call.type = tool_call_delta.type
-                    if tool_call_delta.function:
-                        if tool_call_delta.function.name and len(tool_call_delta.function.name) > 0:
-                            tool_call.function.name = tool_call_delta.function.name
-                        if tool_call_delta.function.arguments:
-                            tool_call.function.arguments += tool_call_delta.function.arguments
-                else:
-                    raise ValueError(f"Tool call index is not provided in tool delta: {tool_call_delta}")
-
-    return ChatMessage(
-        role=role,
-        content=accumulated_content,
-        tool_calls=[
-            ChatMessageToolCall(
-                function=ChatMessageToolCallFunction(
-                    name=tool_call_stream_delta.function.name,
-                    arguments=tool_call_stream_delta.function.arguments,
-                ),
-                id=tool_call_stream_delta.id or "",
-                type="function",
-            )
-            for tool_call_stream_delta in accumulated_tool_calls.values()
-            if tool_call_stream_delta.function
-        ],
-        token_usage=TokenUsage(
-            input_tokens=total_input_tokens,
-            output_tokens=total_output_tokens,
-        ),
-    )
+        accumulator.add(stream_delta)
+    return accumulator.to_message()
 
 
 tool_role_conversions = {
@@ -241,6 +299,21 @@ tool_role_conversions = {
 
 
 def get_tool_json_schema(tool: Tool) -> dict:
+    """
+    Returns the JSON schema of a tool, in the format of OpenAI function calling.
+
+    The schema is cached on the tool, or on the managed agent called as a tool, so that it always gives the same object
+    until its `name`, `description` or `inputs` attribute is assigned: the returned schema must not be modified.
+    """
+    if not hasattr(tool, "__dict__"):
+        return build_tool_json_schema(tool)
+    json_schema = tool.__dict__.get("_json_schema")
+    if json_schema is None:
+        json_schema = tool.__dict__["_json_schema"] = build_tool_json_schema(tool)
+    return json_schema
+
+
+def build_tool_json_schema(tool: Tool) -> dict:
     properties = deepcopy(tool.inputs)
     required = []
     for key, value in properties.items():
@@ -285,58 +358,75 @@ def get_clean_message_list(
         convert_images_to_image_urls (`bool`, default `False`): Whether to convert images to image URLs.
         flatten_messages_as_text (`bool`, default `False`): Whether to flatten messages as text.
     """
+    # The input messages are never modified: new message dicts and content lists are built, which share the text
+    # elements of the input, and merged or encoded elements are replaced by new dicts instead of being updated.
     output_message_list: list[dict[str, Any]] = []
-    message_list = deepcopy(message_list)  # Avoid modifying the original list
     for message in message_list:
         if isinstance(message, dict):
-            message = ChatMessage.from_dict(message)
-        role = message.role
+            role, content = message["role"], message.get("content")
+        else:
+            role, content = message.role, message.content
         if role not in MessageRole.roles():
             raise ValueError(f"Incorrect role {role}, only {MessageRole.roles()} are supported for now.")
 
-        if role in role_conversions:
-            message.role = role_conversions[role]  # type: ignore
+        role = role_conversions.get(role, role)  # type: ignore
         # encode images if needed
-        if isinstance(message.content, list):
-            for element in message.content:
-                assert isinstance(element, dict), "Error: this element should be a dict:" + str(element)
-                if element["type"] == "image":
-                    assert not flatten_messages_as_text, f"Cannot use images with {flatten_messages_as_text=}"
-                    if convert_images_to_image_urls:
-                        element.update(
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": make_image_url(encode_image_base64(element.pop("image")))},
-                            }
-                        )
-                    else:
-                        element["image"] = encode_image_base64(element["image"])
+        if isinstance(content, list):
+            content = [
+                clean_content_element(element, convert_images_to_image_urls, flatten_messages_as_text)
+                for element in content
+            ]
 
-        if len(output_message_list) > 0 and message.role == output_message_list[-1]["role"]:
-            assert isinstance(message.content, list), "Error: wrong content:" + str(message.content)
+        if len(output_message_list) > 0 and role == output_message_list[-1]["role"]:
+            assert isinstance(content, list), "Error: wrong content:" + str(content)
             if flatten_messages_as_text:
-                output_message_list[-1]["content"] += "\n" + message.content[0]["text"]
+                output_message_list[-1]["content"] += "\n" + content[0]["text"]
             else:
-                for el in message.content:
-                    if el["type"] == "text" and output_message_list[-1]["content"][-1]["type"] == "text":
+                output_content = output_message_list[-1]["content"]
+                for el in content:
+                    if el["type"] == "text" and output_content[-1]["type"] == "text":
                         # Merge consecutive text messages rather than creating new ones
-                        output_message_list[-1]["content"][-1]["text"] += "\n" + el["text"]
+                        output_content[-1] = {
+                            **output_content[-1],
+                            "text": output_content[-1]["text"] + "\n" + el["text"],
+                        }
                     else:
-                        output_message_list[-1]["content"].append(el)
+                        output_content.append(el)
         else:
             if flatten_messages_as_text:
-                content = message.content[0]["text"]
-            else:
-                content = message.content
+                content = content[0]["text"]
             output_message_list.append(
                 {
-                    "role": message.role,
+                    "role": role,
                     "content": content,
                 }
             )
     return output_message_list
 
 
+def clean_content_element(
+    element: dict[str, Any], convert_images_to_image_urls: bool, flatten_messages_as_text: bool
+) -> dict[str, Any]:
+    """
+    Returns a content element ready to be sent to the model: image elements are replaced by new elements holding
+    the base64-encoded image, other elements are returned as is.
+    """
+    assert isinstance(element, dict), "Error: this element should be a dict:" + str(element)
+    if element["type"] != "image":
+        return element
+    assert not flatten_messages_as_text, f"Cannot use images with {flatten_messages_as_text=}"
+    if convert_images_to_image_urls:
+        cleaned_element = {key: value for key, value in element.items() if key != "image"}
+        cleaned_element.update(
+            {
+                "type": "image_url",
+                "image_url": {"url": make_image_url(encode_image_base64(element["image"]))},
+            }
+        )
+        return cleaned_element
+    return {**element, "image": encode_image_base64(element["image"])}
+
+
 def get_tool_call_from_text(text: str, tool_name_key: str, tool_arguments_key: str) -> ChatMessageToolCall:
     tool_call_dictionary, _ = parse_json_blob(text)
     try:
@@ -355,6 +445,11 @@ def get_tool_call_from_text(text: str, tool_name_key: str, tool_arguments_key: s
     )
 
 
+# o3, o4-mini, and the gpt-5 series (including versioned variants, o3-2025-04-16) don't support stop parameter
+NO_STOP_PARAMETER_PATTERN = re.compile(r"^(o3[-\d]*|o4-mini[-\d]*|gpt-5(-mini|-nano)?[-\d]*)$")
+
+
+@lru_cache(maxsize=256)
 def supports_stop_parameter(model_id: str) -> bool:
     """
     Check if the model supports the `stop` parameter.
@@ -368,9 +463,7 @@ def supports_stop_parameter(model_id: str) -> bool:
         bool: True if the model supports the stop parameter, False otherwise
     """
     model_name = model_id.split("/")[-1]
-    # o3, o4-mini, and the gpt-5 series (including versioned variants, o3-2025-04-16) don't support stop parameter
-    pattern = r"^(o3[-\d]*|o4-mini[-\d]*|gpt-5(-mini|-nano)?[-\d]*)$"
-    return not re.match(pattern, model_name)
+    return not NO_STOP_PARAMETER_PATTERN.match(model_name)
 
 
 class Model:
@@ -387,6 +480,18 @@ class Model:
         self.tool_arguments_key = tool_arguments_key
         self.kwargs = kwargs
         self.model_id: str | None = model_id
+        # Tool schemas of the last toolset, reused as long as the same tools are called with unchanged schemas
+        self._tool_schemas_cache: tuple[tuple[dict, ...], list[dict]] | None = None
+
+    def _get_tool_schemas(self, tools: list[Tool]) -> list[dict]:
+        """Returns the JSON schemas of a list of tools, as the same list object for identical toolsets."""
+        tool_schemas = tuple(get_tool_json_schema(tool) for tool in tools)
+        cache = getattr(self, "_tool_schemas_cache", None)
+        if cache is not None and len(cache[0]) == len(tool_schemas):
+            if all(cached is schema for cached, schema in zip(cache[0], tool_schemas)):
+                return cache[1]
+        self._tool_schemas_cache = (tool_schemas, list(tool_schemas))
+        return self._tool_schemas_cache[1]
 
     def _prepare_completion_kwargs(
         self,
@@ -432,7 +537,7 @@ class Model:
         # Handle tools parameter
         if tools_to_call_from:
             tools_config = {
-                "tools": [get_tool_json_schema(tool) for tool in tools_to_call_from],
+                "tools": self._get_tool_schemas(tools_to_call_from),
             }
             if tool_choice is not None:
                 tools_config["tool_choice"] = tool_choice
@@ -470,6 +575,24 @@ class Model:
         """
         raise NotImplementedError("This method must be implemented in child classes")
 
+    async def agenerate(self, *args, **kwargs) -> ChatMessage:
+        """Asynchronous counterpart of `generate`, taking the same arguments. It is used by agents run with `arun`.
+
+        The default implementation runs `generate` in a worker thread. Models backed by a client with an asynchronous
+        API override it to await the request in the event loop.
+        """
+        return await asyncio.to_thread(self.generate, *args, **kwargs)
+
+    async def agenerate_stream(self, *args, **kwargs) -> AsyncGenerator[ChatMessageStreamDelta]:
+        """Asynchronous counterpart of `generate_stream`, taking the same arguments. It is used by agents run with
+        `arun`.
+
+        The default implementation produces the deltas of `generate_stream` in a worker thread. Models backed by a
+        client with an asynchronous API override it to iterate over the stream in the event loop.
+        """
+        async for event in iterate_in_thread(self.generate_stream(*args, **kwargs)):
+            yield event
+
     def __call__(self, *args, **kwargs):
         return self.generate(*args, **kwargs)
 
@@ -791,7 +914,6 @@ class TransformersModel(Model):
                 AutoModelForImageTextToText,
                 AutoProcessor,
                 AutoTokenizer,
-                TextIteratorStreamer,
             )
         except ModuleNotFoundError:
             raise ModuleNotFoundError(
@@ -830,7 +952,6 @@ class TransformersModel(Model):
             )
             self.processor = AutoProcessor.from_pretrained(model_id, trust_remote_code=trust_remote_code)
             self._is_vlm = True
-            self.streamer = TextIteratorStreamer(self.processor.tokenizer, skip_prompt=True, skip_special_tokens=True)  # type: ignore
 
         except ValueError as e:
             if "Unrecognized configuration class" in str(e):
@@ -842,7 +963,6 @@ class TransformersModel(Model):
                     **self.model_kwargs,
                 )
                 self.tokenizer = AutoTokenizer.from_pretrained(model_id, trust_remote_code=trust_remote_code)
-                self.streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)  # type: ignore
             else:
                 raise e
         except Exception as e:
@@ -980,30 +1100,193 @@ class TransformersModel(Model):
         # Get prompt token count once
         count_prompt_tokens = generation_kwargs["inputs"].shape[1]  # type: ignore
 
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        class StopOnCancel(StoppingCriteria):
+            def __init__(self, cancelled: Event):
+                self.cancelled = cancelled
+
+            def __call__(self, input_ids, scores, **kwargs):
+                return self.cancelled.is_set()
+
+        # Each call gets its own streamer, and stops its generation when the stream is closed before its end
+        cancelled = Event()
+        generation_kwargs["stopping_criteria"] = StoppingCriteriaList(
+            [*(generation_kwargs["stopping_criteria"] or []), StopOnCancel(cancelled)]
+        )
+        model_tokenizer = self.processor.tokenizer if hasattr(self, "processor") else self.tokenizer
+        streamer = TextIteratorStreamer(model_tokenizer, skip_prompt=True, skip_special_tokens=True)  # type: ignore
+
         # Start generation in a separate thread
-        thread = Thread(target=self.model.generate, kwargs={"streamer": self.streamer, **generation_kwargs})
+        thread = Thread(target=self.model.generate, kwargs={"streamer": streamer, **generation_kwargs})
         thread.start()
 
         # Process streaming output
         is_first_token = True
         count_generated_tokens = 0
-        for new_text in self.streamer:
-            count_generated_tokens += 1
-            # Only include input tokens in the first yielded token
-            input_tokens = count_prompt_tokens if is_first_token else 0
-            is_first_token = False
-            yield ChatMessageStreamDelta(
-                content=new_text,
-                tool_calls=None,
-                token_usage=TokenUsage(input_tokens=input_tokens, output_tokens=1),
-            )
-            count_prompt_tokens = 0
-        thread.join()
+        try:
+            for new_text in streamer:
+                count_generated_tokens += 1
+                # Only include input tokens in the first yielded token
+                input_tokens = count_prompt_tokens if is_first_token else 0
+                is_first_token = False
+                yield ChatMessageStreamDelta(
+                    content=new_text,
+                    tool_calls=None,
+                    token_usage=TokenUsage(input_tokens=input_tokens, output_tokens=1),
+                )
+                count_prompt_tokens = 0
+        finally:
+            cancelled.set()
+            thread.join()
 
         # Update final output token count
         self._last_output_token_count = count_generated_tokens
 
 
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504, 529)
+
+# Authentication failures are never retried, whatever their status code: for instance, litellm reports missing
+# credentials of some providers as an `InternalServerError`
+AUTHENTICATION_ERROR_NAMES = ("AuthenticationError", "PermissionDenied", "Unauthorized")
+AUTHENTICATION_ERROR_MESSAGES = (
+    "api key",
+    "api_key",
+    "credentials",
+    "unauthorized",
+    "authentication",
+)
+
+# Number of retries spent by the model calls of the current agent run, see `reset_retry_budget`
+_run_retries: ContextVar[list[int] | None] = ContextVar("run_retries", default=None)
+
+
+def reset_retry_budget() -> Token:
+    """
+    Starts a new retry budget for the model calls made from the current context: agents call it at the start of each
+    run, so that `RetryPolicy.max_retries_per_run` bounds the retries of a whole run.
+
+    Returns the token to pass to `restore_retry_budget` at the end of the run, so that the run of a managed agent does
+    not replace the budget of the run of its manager.
+    """
+    return _run_retries.set([0])
+
+
+def restore_retry_budget(token: Token):
+    """Restores the retry budget that was active before the call to `reset_retry_budget` which returned `token`."""
+    try:
+        _run_retries.reset(token)
+    except ValueError:
+        # A streamed run closed from another context, e.g. when garbage collected, has no budget to restore there
+        pass
+
+
+def get_error_status_code(error: Exception) -> int | None:
+    """Returns the HTTP status code of an error raised by an API client, if any."""
+    status_code = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status_code is None and response is not None:
+        if isinstance(response, dict):
+            # botocore errors hold the parsed response
+            status_code = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        else:
+            status_code = getattr(response, "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_authentication_error(error: Exception) -> bool:
+    """Returns whether an error raised by an API client is due to missing, invalid or insufficient credentials."""
+    if get_error_status_code(error) in (401, 403):
+        return True
+    if any(name in type(error).__name__ for name in AUTHENTICATION_ERROR_NAMES):
+        return True
+    error_message = str(error).lower()
+    return any(message in error_message for message in AUTHENTICATION_ERROR_MESSAGES)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses the value of a `Retry-After` header, either a number of seconds or an HTTP date, into seconds from now."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max((retry_date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """Returns the delay requested by the `retry-after-ms` or `Retry-After` header of an API error, in seconds."""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders")
+    else:
+        headers = getattr(response, "headers", None)
+    if not isinstance(headers, Mapping):
+        return None
+    headers = {str(key).lower(): value for key, value in headers.items()}
+    retry_after_ms = parse_retry_after(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return parse_retry_after(headers.get("retry-after"))
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Policy for retrying the API calls of an `ApiModel` that fail with a transient error: a rate limit or server error,
+    a timeout or a connection error. Authentication errors, such as missing credentials, are never retried.
+
+    Retries are spaced out with exponential backoff and full jitter, unless the provider gives the delay to wait in a
+    `Retry-After` header. After a 429 error, the delay is applied to the rate limiter of the model, so that all the
+    requests sharing it slow down. Streamed generations are only retried if the error happens before the first event.
+
+    Parameters:
+        max_attempts (`int`, default `4`):
+            Maximum number of attempts per call, including the first one. Use `1` to disable retries.
+        initial_delay (`float`, default `1.0`):
+            Maximum delay before the first retry, in seconds.
+        max_delay (`float`, default `60.0`):
+            Maximum delay between two attempts, in seconds, including delays requested by the provider.
+        exponential_base (`float`, default `2.0`):
+            Factor applied to the maximum delay at each new retry.
+        max_retries_per_run (`int`, *optional*, default `20`):
+            Maximum number of retries over an agent run, across all its model calls. Use `None` for no limit.
+        retry_status_codes (`tuple[int, ...]`):
+            HTTP status codes of the errors to retry.
+    """
+
+    max_attempts: int = 4
+    initial_delay: float = 1.0
+    max_delay: float = 60.0
+    exponential_base: float = 2.0
+    max_retries_per_run: int | None = 20
+    retry_status_codes: tuple[int, ...] = RETRYABLE_STATUS_CODES
+
+    def is_retryable(self, error: Exception) -> bool:
+        if is_authentication_error(error):
+            return False
+        status_code = get_error_status_code(error)
+        if status_code is not None:
+            return status_code in self.retry_status_codes
+        error_name = type(error).__name__
+        return (
+            isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in error_name or "Connection" in error_name
+        )
+
+    def get_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Returns the delay before the next attempt after `attempt` failed attempts, in seconds."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.initial_delay * self.exponential_base ** (attempt - 1)))
+
+
 class ApiModel(Model):
     """
     Base class for API-based language models.
@@ -1021,6 +1304,16 @@ class ApiModel(Model):
             Pre-configured API client instance. If not provided, a default client will be created. Defaults to None.
         requests_per_minute (`float`, **optional**):
             Rate limit in requests per minute.
+        rate_limiter (`RateLimiter | str`, **optional**):
+            Rate limiter to use instead of a private one built from `requests_per_minute`, to share a request quota and
+            a limit of concurrent requests with other models and tools. If a string is given, the limiter shared under
+            this name is used, see `RateLimiter.shared`.
+        retry_policy (`RetryPolicy`, **optional**):
+            Policy for retrying calls that fail with a transient error, such as a rate limit or server error. Defaults
+            to `RetryPolicy()`: pass `RetryPolicy(max_attempts=1)` to disable retries.
+        async_client (`Any`, **optional**):
+            Pre-configured asynchronous API client instance, used by `agenerate` and `agenerate_stream`. If not
+            provided, a default client will be created on first use. Defaults to None.
         **kwargs: Additional keyword arguments to pass to the parent class.
     """
 
@@ -1030,20 +1323,149 @@ class ApiModel(Model):
         custom_role_conversions: dict[str, str] | None = None,
         client: Any | None = None,
         requests_per_minute: float | None = None,
+        async_client: Any | None = None,
+        rate_limiter: RateLimiter | str | None = None,
+        retry_policy: RetryPolicy | None = None,
         **kwargs,
     ):
         super().__init__(model_id=model_id, **kwargs)
         self.custom_role_conversions = custom_role_conversions or {}
         self.client = client or self.create_client()
-        self.rate_limiter = RateLimiter(requests_per_minute)
+        self._async_client = async_client
+        self.rate_limiter = RateLimiter.resolve(rate_limiter, requests_per_minute)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
 
     def create_client(self):
         """Create the API client for the specific service."""
         raise NotImplementedError("Subclasses must implement this method to create a client")
 
-    def _apply_rate_limit(self):
-        """Apply rate limiting before making API calls."""
-        self.rate_limiter.throttle()
+    def create_async_client(self):
+        """Create the asynchronous API client for the specific service."""
+        raise NotImplementedError("Subclasses must implement this method to create an asynchronous client")
+
+    @property
+    def async_client(self):
+        """Asynchronous API client, created on first use so that synchronous-only usage does not pay for it."""
+        if self._async_client is None:
+            self._async_client = self.create_async_client()
+        return self._async_client
+
+    def _get_retry_delay(self, error: Exception, attempt: int) -> float | None:
+        """Returns the delay before retrying a call after `attempt` failed attempts, or None if it must not be retried."""
+        policy = self.retry_policy
+        if attempt >= policy.max_attempts or not policy.is_retryable(error):
+            return None
+        run_retries = _run_retries.get()
+        if run_retries is not None and policy.max_retries_per_run is not None:
+            if run_retries[0] >= policy.max_retries_per_run:
+                return None
+            run_retries[0] += 1
+        delay = policy.get_delay(attempt, get_retry_after(error))
+        logger.warning(
+            f"{type(self).__name__} call failed with {type(error).__name__} (attempt {attempt}/{policy.max_attempts}), "
+            f"retrying in {delay:.1f}s: {error}"
+        )
+        if get_error_status_code(error) == 429:
+            # Hold back all the requests sharing the rate limiter: the retry itself waits in the limiter
+            self.rate_limiter.backoff(delay)
+            return 0.0
+        return delay
+
+    def _request(self, send: Callable, **kwargs) -> Any:
+        """Sends an API request within the rate limit, retrying transient errors according to `retry_policy`."""
+        attempt = 1
+        while True:
+            try:
+                with self.rate_limiter.limit():
+                    return send(**kwargs)
+            except Exception as e:
+                delay = self._get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def _stream_request(self, send: Callable, **kwargs) -> Generator:
+        """Streams the events of an API request like `_request`, retrying only errors raised before the first event."""
+        attempt = 1
+        while True:
+            started = False
+            try:
+                with self.rate_limiter.limit():
+                    for event in send(**kwargs):
+                        started = True
+                        yield event
+                return
+            except Exception as e:
+                delay = None if started else self._get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def _arequest(self, send: Callable, **kwargs) -> Any:
+        """Asynchronous version of `_request`, for a coroutine function `send`."""
+        attempt = 1
+        while True:
+            try:
+                async with self.rate_limiter.alimit():
+                    return await send(**kwargs)
+            except Exception as e:
+                delay = self._get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _astream_request(self, send: Callable, **kwargs) -> AsyncGenerator:
+        """Asynchronous version of `_stream_request`, for a coroutine function `send` returning an async iterator."""
+        attempt = 1
+        while True:
+            started = False
+            try:
+                async with self.rate_limiter.alimit():
+                    async for event in await send(**kwargs):
+                        started = True
+                        yield event
+                return
+            except Exception as e:
+                delay = None if started else self._get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def get_stream_deltas(event) -> Generator[ChatMessageStreamDelta]:
+    """Converts an event of an OpenAI-compatible chat completion stream to stream deltas."""
+    if getattr(event, "usage", None):
+        yield ChatMessageStreamDelta(
+            content="",
+            token_usage=TokenUsage(
+                input_tokens=event.usage.prompt_tokens,
+                output_tokens=event.usage.completion_tokens,
+            ),
+        )
+    if event.choices:
+        choice = event.choices[0]
+        if choice.delta:
+            yield ChatMessageStreamDelta(
+                content=choice.delta.content,
+                tool_calls=[
+                    ChatMessageToolCallStreamDelta(
+                        index=delta.index,
+                        id=delta.id,
+                        type=delta.type,
+                        function=delta.function,
+                    )
+                    for delta in choice.delta.tool_calls
+                ]
+                if choice.delta.tool_calls
+                else None,
+            )
+        else:
+            if not getattr(choice, "finish_reason", None):
+                raise ValueError(f"No content or tool calls in event: {event}")
 
 
 class LiteLLMModel(ApiModel):
@@ -1107,6 +1529,10 @@ class LiteLLMModel(ApiModel):
 
         return litellm
 
+    def create_async_client(self):
+        """The LiteLLM module also exposes the asynchronous `acompletion` function."""
+        return self.client
+
     def generate(
         self,
         messages: list[ChatMessage | dict],
@@ -1127,8 +1553,7 @@ class LiteLLMModel(ApiModel):
             custom_role_conversions=self.custom_role_conversions,
             **kwargs,
         )
-        self._apply_rate_limit()
-        response = self.client.completion(**completion_kwargs)
+        response = self._request(self.client.completion, **completion_kwargs)
         return ChatMessage.from_dict(
             response.choices[0].message.model_dump(include={"role", "content", "tool_calls"}),
             raw=response,
@@ -1158,36 +1583,66 @@ class LiteLLMModel(ApiModel):
             convert_images_to_image_urls=True,
             **kwargs,
         )
-        self._apply_rate_limit()
-        for event in self.client.completion(**completion_kwargs, stream=True, stream_options={"include_usage": True}):
-            if getattr(event, "usage", None):
-                yield ChatMessageStreamDelta(
-                    content="",
-                    token_usage=TokenUsage(
-                        input_tokens=event.usage.prompt_tokens,
-                        output_tokens=event.usage.completion_tokens,
-                    ),
-                )
-            if event.choices:
-                choice = event.choices[0]
-                if choice.delta:
-                    yield ChatMessageStreamDelta(
-                        content=choice.delta.content,
-                        tool_calls=[
-                            ChatMessageToolCallStreamDelta(
-                                index=delta.index,
-                                id=delta.id,
-                                type=delta.type,
-                                function=delta.function,
-                            )
-                            for delta in choice.delta.tool_calls
-                        ]
-                        if choice.delta.tool_calls
-                        else None,
-                    )
-                else:
-                    if not getattr(choice, "finish_reason", None):
-                        raise ValueError(f"No content or tool calls in event: {event}")
+        for event in self._stream_request(
+            self.client.completion, **completion_kwargs, stream=True, stream_options={"include_usage": True}
+        ):
+            yield from get_stream_deltas(event)
+
+    async def agenerate(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> ChatMessage:
+        completion_kwargs = self._prepare_completion_kwargs(
+            messages=messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            model=self.model_id,
+            api_base=self.api_base,
+            api_key=self.api_key,
+            convert_images_to_image_urls=True,
+            custom_role_conversions=self.custom_role_conversions,
+            **kwargs,
+        )
+        response = await self._arequest(self.async_client.acompletion, **completion_kwargs)
+        return ChatMessage.from_dict(
+            response.choices[0].message.model_dump(include={"role", "content", "tool_calls"}),
+            raw=response,
+            token_usage=TokenUsage(
+                input_tokens=response.usage.prompt_tokens,
+                output_tokens=response.usage.completion_tokens,
+            ),
+        )
+
+    async def agenerate_stream(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> AsyncGenerator[ChatMessageStreamDelta]:
+        completion_kwargs = self._prepare_completion_kwargs(
+            messages=messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            model=self.model_id,
+            api_base=self.api_base,
+            api_key=self.api_key,
+            custom_role_conversions=self.custom_role_conversions,
+            convert_images_to_image_urls=True,
+            **kwargs,
+        )
+        async for event in self._astream_request(
+            self.async_client.acompletion, **completion_kwargs, stream=True, stream_options={"include_usage": True}
+        ):
+            for delta in get_stream_deltas(event):
+                yield delta
 
 
 class LiteLLMRouterModel(LiteLLMModel):
@@ -1380,6 +1835,12 @@ class InferenceClientModel(ApiModel):
 
         return InferenceClient(**self.client_kwargs)
 
+    def create_async_client(self):
+        """Create the asynchronous Hugging Face client."""
+        from huggingface_hub import AsyncInferenceClient
+
+        return AsyncInferenceClient(**self.client_kwargs)
+
     def generate(
         self,
         messages: list[ChatMessage | dict],
@@ -1402,8 +1863,7 @@ class InferenceClientModel(ApiModel):
             custom_role_conversions=self.custom_role_conversions,
             **kwargs,
         )
-        self._apply_rate_limit()
-        response = self.client.chat_completion(**completion_kwargs)
+        response = self._request(self.client.chat_completion, **completion_kwargs)
         return ChatMessage.from_dict(
             asdict(response.choices[0].message),
             raw=response,
@@ -1431,38 +1891,72 @@ class InferenceClientModel(ApiModel):
             convert_images_to_image_urls=True,
             **kwargs,
         )
-        self._apply_rate_limit()
-        for event in self.client.chat.completions.create(
-            **completion_kwargs, stream=True, stream_options={"include_usage": True}
+        for event in self._stream_request(
+            self.client.chat.completions.create,
+            **completion_kwargs,
+            stream=True,
+            stream_options={"include_usage": True},
         ):
-            if getattr(event, "usage", None):
-                yield ChatMessageStreamDelta(
-                    content="",
-                    token_usage=TokenUsage(
-                        input_tokens=event.usage.prompt_tokens,
-                        output_tokens=event.usage.completion_tokens,
-                    ),
-                )
-            if event.choices:
-                choice = event.choices[0]
-                if choice.delta:
-                    yield ChatMessageStreamDelta(
-                        content=choice.delta.content,
-                        tool_calls=[
-                            ChatMessageToolCallStreamDelta(
-                                index=delta.index,
-                                id=delta.id,
-                                type=delta.type,
-                                function=delta.function,
-                            )
-                            for delta in choice.delta.tool_calls
-                        ]
-                        if choice.delta.tool_calls
-                        else None,
-                    )
-                else:
-                    if not getattr(choice, "finish_reason", None):
-                        raise ValueError(f"No content or tool calls in event: {event}")
+            yield from get_stream_deltas(event)
+
+    async def agenerate(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> ChatMessage:
+        if response_format is not None and self.client_kwargs["provider"] not in STRUCTURED_GENERATION_PROVIDERS:
+            raise ValueError(
+                "InferenceClientModel only supports structured outputs with these providers:"
+                + ", ".join(STRUCTURED_GENERATION_PROVIDERS)
+            )
+        completion_kwargs = self._prepare_completion_kwargs(
+            messages=messages,
+            stop_sequences=stop_sequences,
+            tools_to_call_from=tools_to_call_from,
+            # response_format=response_format,
+            convert_images_to_image_urls=True,
+            custom_role_conversions=self.custom_role_conversions,
+            **kwargs,
+        )
+        response = await self._arequest(self.async_client.chat_completion, **completion_kwargs)
+        return ChatMessage.from_dict(
+            asdict(response.choices[0].message),
+            raw=response,
+            token_usage=TokenUsage(
+                input_tokens=response.usage.prompt_tokens,
+                output_tokens=response.usage.completion_tokens,
+            ),
+        )
+
+    async def agenerate_stream(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> AsyncGenerator[ChatMessageStreamDelta]:
+        completion_kwargs = self._prepare_completion_kwargs(
+            messages=messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            model=self.model_id,
+            custom_role_conversions=self.custom_role_conversions,
+            convert_images_to_image_urls=True,
+            **kwargs,
+        )
+        async for event in self._astream_request(
+            self.async_client.chat.completions.create,
+            **completion_kwargs,
+            stream=True,
+            stream_options={"include_usage": True},
+        ):
+            for delta in get_stream_deltas(event):
+                yield delta
 
 
 class OpenAIServerModel(ApiModel):
@@ -1481,6 +1975,8 @@ class OpenAIServerModel(ApiModel):
             The project to use for the API request.
         client_kwargs (`dict[str, Any]`, *optional*):
             Additional keyword arguments to pass to the OpenAI client (like organization, project, max_retries etc.).
+            The client's own retries are disabled by default (`max_retries=0`), as calls are retried according to
+            `retry_policy`: setting `max_retries` makes each attempt of the policy retry again in the client.
         custom_role_conversions (`dict[str, str]`, *optional*):
             Custom role conversion mapping to convert message roles in others.
             Useful for specific models that do not support specific message roles like "system".
@@ -1503,6 +1999,8 @@ class OpenAIServerModel(ApiModel):
         **kwargs,
     ):
         self.client_kwargs = {
+            # Calls are retried by `retry_policy`: retries of the client would multiply its attempts
+            "max_retries": 0,
             **(client_kwargs or {}),
             "api_key": api_key,
             "base_url": api_base,
@@ -1526,6 +2024,16 @@ class OpenAIServerModel(ApiModel):
 
         return openai.OpenAI(**self.client_kwargs)
 
+    def create_async_client(self):
+        try:
+            import openai
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                "Please install 'openai' extra to use OpenAIServerModel: `pip install 'smolagents[openai]'`"
+            ) from e
+
+        return openai.AsyncOpenAI(**self.client_kwargs)
+
     def generate_stream(
         self,
         messages: list[ChatMessage | dict],
@@ -1544,38 +2052,13 @@ class OpenAIServerModel(ApiModel):
             convert_images_to_image_urls=True,
             **kwargs,
         )
-        self._apply_rate_limit()
-        for event in self.client.chat.completions.create(
-            **completion_kwargs, stream=True, stream_options={"include_usage": True}
+        for event in self._stream_request(
+            self.client.chat.completions.create,
+            **completion_kwargs,
+            stream=True,
+            stream_options={"include_usage": True},
         ):
-            if event.usage:
-                yield ChatMessageStreamDelta(
-                    content="",
-                    token_usage=TokenUsage(
-                        input_tokens=event.usage.prompt_tokens,
-                        output_tokens=event.usage.completion_tokens,
-                    ),
-                )
-            if event.choices:
-                choice = event.choices[0]
-                if choice.delta:
-                    yield ChatMessageStreamDelta(
-                        content=choice.delta.content,
-                        tool_calls=[
-                            ChatMessageToolCallStreamDelta(
-                                index=delta.index,
-                                id=delta.id,
-                                type=delta.type,
-                                function=delta.function,
-                            )
-                            for delta in choice.delta.tool_calls
-                        ]
-                        if choice.delta.tool_calls
-                        else None,
-                    )
-                else:
-                    if not getattr(choice, "finish_reason", None):
-                        raise ValueError(f"No content or tool calls in event: {event}")
+            yield from get_stream_deltas(event)
 
     def generate(
         self,
@@ -1595,8 +2078,62 @@ class OpenAIServerModel(ApiModel):
             convert_images_to_image_urls=True,
             **kwargs,
         )
-        self._apply_rate_limit()
-        response = self.client.chat.completions.create(**completion_kwargs)
+        response = self._request(self.client.chat.completions.create, **completion_kwargs)
+        return ChatMessage.from_dict(
+            response.choices[0].message.model_dump(include={"role", "content", "tool_calls"}),
+            raw=response,
+            token_usage=TokenUsage(
+                input_tokens=response.usage.prompt_tokens,
+                output_tokens=response.usage.completion_tokens,
+            ),
+        )
+
+    async def agenerate_stream(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> AsyncGenerator[ChatMessageStreamDelta]:
+        completion_kwargs = self._prepare_completion_kwargs(
+            messages=messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            model=self.model_id,
+            custom_role_conversions=self.custom_role_conversions,
+            convert_images_to_image_urls=True,
+            **kwargs,
+        )
+        async for event in self._astream_request(
+            self.async_client.chat.completions.create,
+            **completion_kwargs,
+            stream=True,
+            stream_options={"include_usage": True},
+        ):
+            for delta in get_stream_deltas(event):
+                yield delta
+
+    async def agenerate(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> ChatMessage:
+        completion_kwargs = self._prepare_completion_kwargs(
+            messages=messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            model=self.model_id,
+            custom_role_conversions=self.custom_role_conversions,
+            convert_images_to_image_urls=True,
+            **kwargs,
+        )
+        response = await self._arequest(self.async_client.chat.completions.create, **completion_kwargs)
         return ChatMessage.from_dict(
             response.choices[0].message.model_dump(include={"role", "content", "tool_calls"}),
             raw=response,
@@ -1624,6 +2161,8 @@ class AzureOpenAIServerModel(OpenAIServerModel):
             The API version to use. If not provided, it will be inferred from the `OPENAI_API_VERSION` environment variable.
         client_kwargs (`dict[str, Any]`, *optional*):
             Additional keyword arguments to pass to the AzureOpenAI client (like organization, project, max_retries etc.).
+            The client's own retries are disabled by default (`max_retries=0`), as calls are retried according to
+            `retry_policy`.
         custom_role_conversions (`dict[str, str]`, *optional*):
             Custom role conversion mapping to convert message roles in others.
             Useful for specific models that do not support specific message roles like "system".
@@ -1666,6 +2205,16 @@ class AzureOpenAIServerModel(OpenAIServerModel):
 
         return openai.AzureOpenAI(**self.client_kwargs)
 
+    def create_async_client(self):
+        try:
+            import openai
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                "Please install 'openai' extra to use AzureOpenAIServerModel: `pip install 'smolagents[openai]'`"
+            ) from e
+
+        return openai.AsyncAzureOpenAI(**self.client_kwargs)
+
 
 AzureOpenAIModel = AzureOpenAIServerModel
 
@@ -1690,6 +2239,9 @@ class AmazonBedrockServerModel(ApiModel):
     > API key support requires `boto3 >= 1.39.0`.
     > For users not relying on API key authentication, the minimum supported version is `boto3 >= 1.36.18`.
 
+    > [!TIP]
+    > boto3 has no asyncio client: `agenerate` runs the blocking `converse` request in a worker thread.
+
     Parameters:
         model_id (`str`):
             The model identifier to use on Bedrock (e.g. "us.amazon.nova-pro-v1:0").
@@ -1811,10 +2363,12 @@ class AmazonBedrockServerModel(ApiModel):
 
         # The Bedrock API does not support the `type` key in requests.
         # This block of code modifies the object to meet Bedrock's requirements.
+        # The content elements may be shared with the input messages, so they are replaced rather than modified.
         for message in completion_kwargs.get("messages", []):
-            for content in message.get("content", []):
-                if "type" in content:
-                    del content["type"]
+            if isinstance(message.get("content"), list):
+                message["content"] = [
+                    {key: value for key, value in content.items() if key != "type"} for content in message["content"]
+                ]
 
         return {
             "modelId": self.model_id,
@@ -1848,9 +2402,8 @@ class AmazonBedrockServerModel(ApiModel):
             convert_images_to_image_urls=True,
             **kwargs,
         )
-        self._apply_rate_limit()
         # self.client is created in ApiModel class
-        response = self.client.converse(**completion_kwargs)
+        response = self._request(self.client.converse, **completion_kwargs)
 
         # Get last message content block in case thinking mode is enabled: discard thinking
         last_message_content_block = response["output"]["message"]["content"][-1]
@@ -1872,6 +2425,695 @@ class AmazonBedrockServerModel(ApiModel):
 
 AmazonBedrockModel = AmazonBedrockServerModel
 
+
+def get_stream_deltas_from_message(message: ChatMessage) -> list[ChatMessageStreamDelta]:
+    """Converts a complete message to stream deltas, that `StreamAccumulator` folds back into the same message."""
+    tool_calls = [
+        ChatMessageToolCallStreamDelta(
+            index=index,
+            id=tool_call.id,
+            type=tool_call.type,
+            function=ChatMessageToolCallFunction(
+                name=tool_call.function.name,
+                arguments=tool_call.function.arguments
+                if isinstance(tool_call.function.arguments, str)
+                else json.dumps(tool_call.function.arguments),
+            ),
+        )
+        for index, tool_call in enumerate(message.tool_calls or [])
+    ]
+    return [
+        ChatMessageStreamDelta(
+            content=message.content if isinstance(message.content, str) else None,
+            tool_calls=tool_calls or None,
+            token_usage=message.token_usage,
+        )
+    ]
+
+
+class ModelCache:
+    """
+    Base class of the storage backends of `CachedModel`: a key-value store of JSON-serializable model responses.
+
+    Subclasses implement `get`, `set` and `clear`, and are responsible for evicting their entries.
+    """
+
+    def get(self, key: str) -> dict | None:
+        """Returns the response stored under `key`, or None if there is none or it expired."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def set(self, key: str, value: dict):
+        """Stores a response under `key`, evicting other entries if needed."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def clear(self):
+        """Removes all stored responses."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+
+class InMemoryModelCache(ModelCache):
+    """
+    Model cache kept in memory, for the lifetime of the process.
+
+    Args:
+        max_entries (`int`, *optional*): Maximum number of responses to keep: the least recently used ones are evicted.
+        ttl (`float`, *optional*): Time to live of the responses, in seconds.
+    """
+
+    def __init__(self, max_entries: int | None = None, ttl: float | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Responses are stored as JSON, so that callers never share mutable objects with the cache
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        serialized_value = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (time.time(), serialized_value)
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteModelCache(ModelCache):
+    """
+    Model cache stored in a SQLite database, so that responses are reused across processes and runs.
+
+    Args:
+        path (`str | Path`): Path of the database file, created if it does not exist.
+        max_entries (`int`, *optional*): Maximum number of responses to keep: the least recently used ones are evicted.
+        ttl (`float`, *optional*): Time to live of the responses, in seconds.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int | None = None, ttl: float | None = None):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        serialized_value = json.dumps(value)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, serialized_value, now, now),
+            )
+            if self.ttl is not None:
+                self._connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self):
+        """Closes the connection to the database."""
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+@dataclass
+class CacheStats:
+    """Counts of the requests of a `CachedModel` answered from its cache (hits) or by the wrapped model (misses)."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def dict(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+class CachedModel(Model):
+    """
+    Wraps a model to reuse its responses to identical requests, e.g. for evaluation reruns, tests and development.
+
+    A request is identified by a hash of its cleaned messages, stop sequences, response format, tool JSON schemas and
+    generation kwargs, along with the class and ID of the wrapped model. Responses are only worth caching for
+    deterministic generation, e.g. with a temperature of 0.
+
+    `generate` and `generate_stream` share their cache entries: a cached response is replayed as stream deltas, and a
+    streamed response is cached once its stream is complete. Cached responses are returned with a token usage of 0,
+    since no tokens were spent on them. `generate_stream` is only available if the wrapped model implements it.
+
+    Parameters:
+        model (`Model`):
+            The model whose responses to cache.
+        cache (`ModelCache | str | Path`, *optional*):
+            Storage backend of the responses. If a path is given, responses are stored in a `SQLiteModelCache` at this
+            path. Defaults to an `InMemoryModelCache`.
+
+    Example:
+    ```python
+    >>> model = CachedModel(LiteLLMModel(model_id="gpt-4o", temperature=0), cache="~/.cache/smolagents/responses.db")
+    >>> agent = CodeAgent(tools=[], model=model)
+    >>> agent.run("What is the 10th Fibonacci number?")
+    >>> model.stats
+    CacheStats(hits=0, misses=3)
+    ```
+    """
+
+    def __init__(self, model: Model, cache: ModelCache | str | Path | None = None):
+        super().__init__(
+            flatten_messages_as_text=model.flatten_messages_as_text,
+            tool_name_key=model.tool_name_key,
+            tool_arguments_key=model.tool_arguments_key,
+            model_id=model.model_id,
+        )
+        self.model = model
+        if isinstance(cache, (str, Path)):
+            cache = SQLiteModelCache(Path(cache).expanduser())
+        self.cache = cache if cache is not None else InMemoryModelCache()
+        self.stats = CacheStats()
+        self._stats_lock = Lock()
+
+    def get_cache_key(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> str:
+        """Returns the key identifying a request in the cache."""
+        request = {
+            "model": [type(self.model).__name__, self.model.model_id],
+            "messages": get_clean_message_list(
+                messages, role_conversions=tool_role_conversions, convert_images_to_image_urls=True
+            ),
+            "stop_sequences": stop_sequences,
+            "response_format": response_format,
+            "tools": [get_tool_json_schema(tool) for tool in tools_to_call_from or []],
+            "kwargs": {**getattr(self.model, "kwargs", {}), **kwargs},
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _prepare_request(self, messages, stop_sequences, response_format, tools_to_call_from, kwargs):
+        """Returns the cache key of a request, and the arguments to forward to the wrapped model."""
+        key = self.get_cache_key(messages, stop_sequences, response_format, tools_to_call_from, **kwargs)
+        generation_kwargs = {
+            name: value
+            for name, value in [
+                ("stop_sequences", stop_sequences),
+                ("response_format", response_format),
+                ("tools_to_call_from", tools_to_call_from),
+            ]
+            if value is not None
+        }
+        return key, {**generation_kwargs, **kwargs}
+
+    def _load(self, key: str) -> ChatMessage | None:
+        value = self.cache.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        if value is None:
+            return None
+        return ChatMessage.from_dict(value, token_usage=TokenUsage(input_tokens=0, output_tokens=0))
+
+    def _store(self, key: str, message: ChatMessage):
+        self.cache.set(key, get_dict_from_nested_dataclasses(message, ignore_key="raw"))
+
+    def generate(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> ChatMessage:
+        key, generation_kwargs = self._prepare_request(
+            messages, stop_sequences, response_format, tools_to_call_from, kwargs
+        )
+        chat_message = self._load(key)
+        if chat_message is None:
+            chat_message = self.model.generate(messages, **generation_kwargs)
+            self._store(key, chat_message)
+        return chat_message
+
+    @property
+    def generate_stream(self) -> Callable[..., Generator[ChatMessageStreamDelta]]:
+        # Only exposed if the wrapped model streams, since agents check for this method to decide whether to stream
+        if not hasattr(self.model, "generate_stream"):
+            raise AttributeError(f"The wrapped {type(self.model).__name__} has no `generate_stream` method.")
+        return self._generate_stream
+
+    def _generate_stream(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> Generator[ChatMessageStreamDelta]:
+        key, generation_kwargs = self._prepare_request(
+            messages, stop_sequences, response_format, tools_to_call_from, kwargs
+        )
+        chat_message = self._load(key)
+        if chat_message is not None:
+            yield from get_stream_deltas_from_message(chat_message)
+            return
+        accumulator = StreamAccumulator()
+        stream = self.model.generate_stream(messages, **generation_kwargs)
+        try:
+            for event in stream:
+                accumulator.add(event)
+                yield event
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+        # Only reached if the stream was consumed entirely, so that interrupted responses are never cached
+        self._store(key, accumulator.to_message())
+
+    async def agenerate(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> ChatMessage:
+        key, generation_kwargs = self._prepare_request(
+            messages, stop_sequences, response_format, tools_to_call_from, kwargs
+        )
+        chat_message = self._load(key)
+        if chat_message is None:
+            chat_message = await self.model.agenerate(messages, **generation_kwargs)
+            self._store(key, chat_message)
+        return chat_message
+
+    async def agenerate_stream(
+        self,
+        messages: list[ChatMessage | dict],
+        stop_sequences: list[str] | None = None,
+        response_format: dict[str, str] | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> AsyncGenerator[ChatMessageStreamDelta]:
+        key, generation_kwargs = self._prepare_request(
+            messages, stop_sequences, response_format, tools_to_call_from, kwargs
+        )
+        chat_message = self._load(key)
+        if chat_message is not None:
+            for event in get_stream_deltas_from_message(chat_message):
+                yield event
+            return
+        accumulator = StreamAccumulator()
+        stream = self.model.agenerate_stream(messages, **generation_kwargs)
+        try:
+            async for event in stream:
+                accumulator.add(event)
+                yield event
+        finally:
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+        self._store(key, accumulator.to_message())
+
+    def to_dict(self) -> dict:
+        return {
+            "model": {"class": type(self.model).__name__, "data": self.model.to_dict()},
+            "cache": str(self.cache.path) if isinstance(self.cache, SQLiteModelCache) else None,
+        }
+
+    @classmethod
+    def from_dict(cls, model_dictionary: dict[str, Any]) -> "CachedModel":
+        model_info = model_dictionary["model"]
+        model = globals()[model_info["class"]].from_dict(model_info["data"])
+        return cls(model, cache=model_dictionary.get("cache"))
+
+
+class FallbackModel(Model):
+    """
+    Composite of several models, e.g. deployments of the same model on different backends: requests are sent to the
+    first model, and fall back to the next one each time a model raises an error.
+
+    Streamed generations only fall back if the error happens before the first event, since the deltas already received
+    cannot be taken back. `generate_stream` is only available if all the models implement it.
+
+    Parameters:
+        models (`list[Model]`):
+            The models to use, in order of preference.
+
+    Example:
+    ```python
+    >>> model = FallbackModel(
+    ...     [
+    ...         OpenAIServerModel(model_id="Qwen/Qwen2.5-Coder-32B-Instruct", api_base="http://localhost:8000/v1"),
+    ...         InferenceClientModel(model_id="Qwen/Qwen2.5-Coder-32B-Instruct"),
+    ...     ]
+    ... )
+    ```
+    """
+
+    def __init__(self, models: list[Model]):
+        if not models:
+            raise ValueError("At least one model is required.")
+        super().__init__(
+            flatten_messages_as_text=models[0].flatten_messages_as_text,
+            tool_name_key=models[0].tool_name_key,
+            tool_arguments_key=models[0].tool_arguments_key,
+            model_id=models[0].model_id,
+        )
+        self.models = models
+
+    def _log_failure(self, model: Model, error: Exception):
+        logger.warning(f"{type(model).__name__} {model.model_id} failed with {type(error).__name__}: {error}")
+
+    def generate(self, messages: list[ChatMessage | dict], **kwargs) -> ChatMessage:
+        for model in self.models[:-1]:
+            try:
+                return model.generate(messages, **kwargs)
+            except Exception as e:
+                self._log_failure(model, e)
+        return self.models[-1].generate(messages, **kwargs)
+
+    @property
+    def generate_stream(self) -> Callable[..., Generator[ChatMessageStreamDelta]]:
+        # Only exposed if all the models stream, since agents check for this method to decide whether to stream
+        if not all(hasattr(model, "generate_stream") for model in self.models):
+            raise AttributeError("Not all the models have a `generate_stream` method.")
+        return self._generate_stream
+
+    def _generate_stream(self, messages: list[ChatMessage | dict], **kwargs) -> Generator[ChatMessageStreamDelta]:
+        for index, model in enumerate(self.models):
+            stream = model.generate_stream(messages, **kwargs)
+            try:
+                first_event = next(stream, None)
+            except Exception as e:
+                if index == len(self.models) - 1:
+                    raise
+                self._log_failure(model, e)
+                continue
+            try:
+                if first_event is not None:
+                    yield first_event
+                    yield from stream
+            finally:
+                stream.close()
+            return
+
+    async def agenerate(self, messages: list[ChatMessage | dict], **kwargs) -> ChatMessage:
+        for model in self.models[:-1]:
+            try:
+                return await model.agenerate(messages, **kwargs)
+            except Exception as e:
+                self._log_failure(model, e)
+        return await self.models[-1].agenerate(messages, **kwargs)
+
+    async def agenerate_stream(
+        self, messages: list[ChatMessage | dict], **kwargs
+    ) -> AsyncGenerator[ChatMessageStreamDelta]:
+        for index, model in enumerate(self.models):
+            stream = model.agenerate_stream(messages, **kwargs)
+            try:
+                first_event = await anext(stream, None)
+            except Exception as e:
+                if index == len(self.models) - 1:
+                    raise
+                self._log_failure(model, e)
+                continue
+            try:
+                if first_event is not None:
+                    yield first_event
+                    async for event in stream:
+                        yield event
+            finally:
+                await stream.aclose()
+            return
+
+    def to_dict(self) -> dict:
+        return {"models": [{"class": type(model).__name__, "data": model.to_dict()} for model in self.models]}
+
+    @classmethod
+    def from_dict(cls, model_dictionary: dict[str, Any]) -> "FallbackModel":
+        model_dictionary = dict(model_dictionary)
+        models = [
+            globals()[model_info["class"]].from_dict(model_info["data"])
+            for model_info in model_dictionary.pop("models")
+        ]
+        return cls(models, **model_dictionary)
+
+
+class HedgedModel(FallbackModel):
+    """
+    Composite of several models that hedges requests to cut tail latency: if the first model has not answered within
+    the hedge delay, the same request is also sent to the next model, and so on, and the first successful response is
+    used. Errors fall back to the next model immediately, as in `FallbackModel`.
+
+    The hedge delay is a percentile of the latencies of recent successful requests, e.g. their p95, so that only the
+    slowest requests are duplicated. Latencies are tracked separately for complete responses and for the first event
+    of streams: streamed generations are hedged on the time to their first event, then only the winning stream is read.
+
+    Requests that lose the race are cancelled where possible: asynchronous requests are cancelled, while synchronous
+    requests cannot be interrupted, so they complete in a background thread and their response is discarded.
+
+    Parameters:
+        models (`list[Model]`):
+            The models to use, in order of preference.
+        latency_percentile (`float`, default `95.0`):
+            Percentile of the recent latencies to use as hedge delay.
+        initial_hedge_delay (`float`, default `5.0`):
+            Hedge delay used until `min_latency_samples` latencies have been measured, in seconds.
+        min_latency_samples (`int`, default `20`):
+            Number of latencies to measure before using their percentile as hedge delay.
+        latency_window (`int`, default `200`):
+            Number of recent latencies the percentile is computed on.
+        max_workers (`int`, *optional*):
+            Maximum number of threads running synchronous requests. Defaults to `ThreadPoolExecutor`'s default.
+    """
+
+    def __init__(
+        self,
+        models: list[Model],
+        latency_percentile: float = 95.0,
+        initial_hedge_delay: float = 5.0,
+        min_latency_samples: int = 20,
+        latency_window: int = 200,
+        max_workers: int | None = None,
+    ):
+        super().__init__(models)
+        self.latency_percentile = latency_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_latency_samples = min_latency_samples
+        self.latency_window = latency_window
+        self.max_workers = max_workers
+        self._latencies = {"response": deque(maxlen=latency_window), "first_event": deque(maxlen=latency_window)}
+        self._latencies_lock = Lock()
+        self.thread_pool = ThreadPoolExecutor(max_workers, thread_name_prefix="smolagents_hedged_request")
+
+    def get_hedge_delay(self, kind: str = "response") -> float:
+        """Returns the delay before hedging a request, for complete responses or for the first event of streams."""
+        with self._latencies_lock:
+            latencies = sorted(self._latencies[kind])
+        if len(latencies) < self.min_latency_samples:
+            return self.initial_hedge_delay
+        index = min(len(latencies) - 1, int(len(latencies) * self.latency_percentile / 100))
+        return latencies[index]
+
+    def _record_latency(self, kind: str, start_time: float):
+        with self._latencies_lock:
+            self._latencies[kind].append(time.monotonic() - start_time)
+
+    def _timed_call(self, call: Callable[[Model], Any], model: Model, kind: str) -> Any:
+        start_time = time.monotonic()
+        result = call(model)
+        self._record_latency(kind, start_time)
+        return result
+
+    def _hedge(self, call: Callable[[Model], Any], kind: str, discard: Callable[[Any], None] | None = None) -> Any:
+        """
+        Runs `call` on the first model, then on the next ones each time the hedge delay elapses or a call fails, and
+        returns the first successful result. The results of the other calls are passed to `discard` when they complete.
+        """
+        pending: dict[Future, Model] = {}
+        remaining_models = list(self.models)
+        error = None
+
+        def launch():
+            model = remaining_models.pop(0)
+            pending[self.thread_pool.submit(self._timed_call, call, model, kind)] = model
+
+        def discard_result(future: Future):
+            if discard is not None and not future.cancelled() and future.exception() is None:
+                discard(future.result())
+
+        launch()
+        while pending:
+            timeout = self.get_hedge_delay(kind) if remaining_models else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"No response after {timeout:.2f}s, hedging the request to {remaining_models[0].model_id}")
+                launch()
+                continue
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._log_failure(model, e)
+                    error = e
+                    continue
+                for other_future in pending:
+                    other_future.cancel()
+                    other_future.add_done_callback(discard_result)
+                return result
+            if not pending and remaining_models:
+                launch()
+        raise error
+
+    async def _ahedge(
+        self, call: Callable[[Model], Awaitable], kind: str, discard: Callable[[Any], Awaitable] | None = None
+    ) -> Any:
+        """Asynchronous version of `_hedge`: the calls that lose the race are cancelled."""
+        pending: dict[asyncio.Task, Model] = {}
+        remaining_models = list(self.models)
+        error = None
+
+        async def timed_call(model: Model) -> Any:
+            start_time = time.monotonic()
+            result = await call(model)
+            self._record_latency(kind, start_time)
+            return result
+
+        def launch():
+            model = remaining_models.pop(0)
+            pending[asyncio.ensure_future(timed_call(model))] = model
+
+        launch()
+        try:
+            while pending:
+                timeout = self.get_hedge_delay(kind) if remaining_models else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(
+                        f"No response after {timeout:.2f}s, hedging the request to {remaining_models[0].model_id}"
+                    )
+                    launch()
+                    continue
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        self._log_failure(model, e)
+                        error = e
+                if not pending and remaining_models:
+                    launch()
+            raise error
+        finally:
+            for task in pending:
+                if discard is not None and task.done() and not task.cancelled() and task.exception() is None:
+                    await discard(task.result())
+                else:
+                    task.cancel()
+
+    def generate(self, messages: list[ChatMessage | dict], **kwargs) -> ChatMessage:
+        return self._hedge(lambda model: model.generate(messages, **kwargs), kind="response")
+
+    def _generate_stream(self, messages: list[ChatMessage | dict], **kwargs) -> Generator[ChatMessageStreamDelta]:
+        def start_stream(model: Model) -> tuple[Generator, ChatMessageStreamDelta | None]:
+            stream = model.generate_stream(messages, **kwargs)
+            return stream, next(stream, None)
+
+        stream, first_event = self._hedge(start_stream, kind="first_event", discard=lambda started: started[0].close())
+        try:
+            if first_event is not None:
+                yield first_event
+                yield from stream
+        finally:
+            stream.close()
+
+    async def agenerate(self, messages: list[ChatMessage | dict], **kwargs) -> ChatMessage:
+        return await self._ahedge(lambda model: model.agenerate(messages, **kwargs), kind="response")
+
+    async def agenerate_stream(
+        self, messages: list[ChatMessage | dict], **kwargs
+    ) -> AsyncGenerator[ChatMessageStreamDelta]:
+        async def start_stream(model: Model) -> tuple[AsyncGenerator, ChatMessageStreamDelta | None]:
+            stream = model.agenerate_stream(messages, **kwargs)
+            try:
+                return stream, await anext(stream, None)
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        stream, first_event = await self._ahedge(
+            start_stream, kind="first_event", discard=lambda started: started[0].aclose()
+        )
+        try:
+            if first_event is not None:
+                yield first_event
+                async for event in stream:
+                    yield event
+        finally:
+            await stream.aclose()
+
+    def to_dict(self) -> dict:
+        return {
+            **super().to_dict(),
+            "latency_percentile": self.latency_percentile,
+            "initial_hedge_delay": self.initial_hedge_delay,
+            "min_latency_samples": self.min_latency_samples,
+            "latency_window": self.latency_window,
+            "max_workers": self.max_workers,
+        }
+
+
 __all__ = [
     "MessageRole",
     "tool_role_conversions",
@@ -1891,4 +3133,12 @@ __all__ = [
     "AmazonBedrockServerModel",
     "AmazonBedrockModel",
     "ChatMessage",
+    "StreamAccumulator",
+    "RetryPolicy",
+    "CachedModel",
+    "ModelCache",
+    "InMemoryModelCache",
+    "SQLiteModelCache",
+    "FallbackModel",
+    "HedgedModel",
 ]
@@ -15,11 +15,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
+import time
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from enum import IntEnum
 
 from rich import box
 from rich.console import Console, Group
+from rich.live import Live
+from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.rule import Rule
 from rich.syntax import Syntax
@@ -30,7 +34,7 @@ from rich.tree import Tree
 from smolagents.utils import escape_code_brackets
 
 
-__all__ = ["AgentLogger", "LogLevel", "Monitor", "TokenUsage", "Timing"]
+__all__ = ["AgentLogger", "LogLevel", "Monitor", "TokenUsage", "Timing", "ToolCallTiming"]
 
 
 @dataclass
@@ -78,6 +82,29 @@ class Timing:
         return f"Timing(start_time={self.start_time}, end_time={self.end_time}, duration={self.duration})"
 
 
+@dataclass
+class ToolCallTiming(Timing):
+    """
+    Contains the timing information for a tool call: in addition to the time spent running the tool, the time spent
+    waiting for a free thread of the tool call executor, from `queued_time` to `start_time`.
+    """
+
+    queued_time: float | None = None
+
+    @property
+    def queue_duration(self):
+        return None if self.queued_time is None else self.start_time - self.queued_time
+
+    def dict(self):
+        return super().dict() | {"queued_time": self.queued_time, "queue_duration": self.queue_duration}
+
+    def __repr__(self) -> str:
+        return (
+            f"ToolCallTiming(queued_time={self.queued_time}, start_time={self.start_time}, end_time={self.end_time}, "
+            f"queue_duration={self.queue_duration}, duration={self.duration})"
+        )
+
+
 class Monitor:
     def __init__(self, tracked_model, logger):
         self.step_durations = []
@@ -117,6 +144,46 @@ class Monitor:
         self.logger.log(Text(console_outputs, style="dim"), level=1)
 
 
+class LiveMarkdown:
+    """
+    Live display of the Markdown text streamed by a model.
+
+    Parsing and rendering Markdown takes time proportional to the length of the text, so doing it for each streamed
+    token would cost quadratic time in the length of the output. Instead, the text is rendered at most
+    `refresh_per_second` times per second, and a last time when the display is closed so that it shows the full text.
+
+    Args:
+        console (`Console`): Console to display the text in.
+        refresh_per_second (`float`, default `4`): Maximum number of renderings per second.
+    """
+
+    def __init__(self, console: Console, refresh_per_second: float = 4):
+        self.live = Live("", console=console, vertical_overflow="visible", auto_refresh=False)
+        self.min_refresh_interval = 1 / refresh_per_second
+        self._last_refresh_time = float("-inf")
+        self._pending_render = None
+
+    def __enter__(self):
+        self.live.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._pending_render is not None:
+            self._refresh()
+        self.live.__exit__(exc_type, exc_value, traceback)
+
+    def update(self, render: Callable[[], str]):
+        """Updates the displayed text, given as a function returning it so that it is only computed when rendered."""
+        self._pending_render = render
+        if time.monotonic() - self._last_refresh_time >= self.min_refresh_interval:
+            self._refresh()
+
+    def _refresh(self):
+        self.live.update(Markdown(self._pending_render()), refresh=True)
+        self._pending_render = None
+        self._last_refresh_time = time.monotonic()
+
+
 class LogLevel(IntEnum):
     OFF = -1  # No output
     ERROR = 0  # Only errors
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import multiprocessing
+import os
+import pickle
+import threading
+import weakref
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from .local_python_executor import (
+    CodeOutput,
+    ExecutionBudgetError,
+    InterpreterError,
+    LocalPythonExecutor,
+    PythonExecutor,
+)
+from .tools import Tool
+
+
+__all__ = ["ProcessPoolPythonExecutor", "WorkerPool"]
+
+
+# Time left to a worker to interrupt an execution by itself before it is killed, in seconds
+KILL_GRACE_PERIOD = 1.0
+
+
+def dump_tools(tools: dict[str, Tool]) -> dict[str, tuple[str, Any]]:
+    """
+    Serializes tools to send them to a worker process.
+
+    Tools are pickled whenever possible. Tools that cannot be pickled, such as the ones created with the `@tool`
+    decorator, are sent as the source code of their class, as done for remote executors.
+    """
+    dumped_tools = {}
+    for name, tool in tools.items():
+        try:
+            dumped_tools[name] = ("pickle", pickle.dumps(tool))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            dumped_tools[name] = ("source", (tool.__class__.__name__, tool.to_dict()["code"]))
+    return dumped_tools
+
+
+def load_tools(dumped_tools: dict[str, tuple[str, Any]]) -> dict[str, Tool]:
+    """
+    Deserializes tools serialized with `dump_tools`.
+    """
+    tools = {}
+    for name, (serialization, payload) in dumped_tools.items():
+        if serialization == "pickle":
+            tools[name] = pickle.loads(payload)
+        else:
+            class_name, tool_code = payload
+            namespace = {}
+            exec(tool_code, namespace)
+            tools[name] = namespace[class_name]()
+    return tools
+
+
+def get_address_space_size() -> int:
+    """Returns the current size of the address space of the process in bytes, or 0 if it cannot be measured."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def set_memory_limit(max_memory_mb: float):
+    """
+    Limits the growth of the address space of the current process with `resource.setrlimit`: allocations of more than
+    `max_memory_mb` megabytes beyond the memory already mapped, e.g. by the interpreter and the imported modules,
+    raise a `MemoryError`.
+    """
+    try:
+        import resource
+    except ImportError:
+        raise InterpreterError("Memory limits of worker processes are not supported on this platform.")
+    max_memory = get_address_space_size() + int(max_memory_mb * 2**20)
+    resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+
+
+def run_worker(connection):
+    """
+    Main loop of a worker process: runs the requests received on the connection in a `LocalPythonExecutor`, until the
+    connection is closed.
+
+    Each request is a `(method, argument)` tuple, answered with either `("result", value)` or
+    `("error", exception, logs)`.
+    """
+    executor = None
+    while True:
+        try:
+            method, argument = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        try:
+            if method == "initialize":
+                max_memory_mb = argument.pop("max_memory_mb", None)
+                if max_memory_mb is not None:
+                    set_memory_limit(max_memory_mb)
+                executor = LocalPythonExecutor(**argument)
+                result = None
+            elif method == "send_tools":
+                result = executor.send_tools(load_tools(argument))
+            elif method == "send_variables":
+                result = executor.send_variables(argument)
+            elif method == "run":
+                result = executor(argument)
+            else:
+                raise ValueError(f"Unknown worker request: {method}")
+            response = ("result", result)
+        except Exception as e:
+            logs = str(executor.state.get("_print_outputs", "")) if executor is not None else ""
+            response = ("error", e, logs)
+        try:
+            connection.send(response)
+        except Exception as e:
+            connection.send(
+                (
+                    "error",
+                    InterpreterError(
+                        f"Could not send the result back from the worker process: {type(e).__name__}: {e}"
+                    ),
+                    "",
+                )
+            )
+
+
+class Worker:
+    """
+    Handle to a worker process of a `WorkerPool`.
+    """
+
+    def __init__(self, context):
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(target=run_worker, args=(worker_connection,), daemon=True)
+        self.process.start()
+        worker_connection.close()
+
+    def request(self, method: str, argument: Any = None, timeout: float | None = None) -> Any:
+        """
+        Sends a request to the worker process and returns its result.
+
+        Raises:
+            TimeoutError: If the worker does not answer within `timeout` seconds.
+            EOFError: If the worker process died before answering.
+        """
+        self.connection.send((method, argument))
+        if not self.connection.poll(timeout):
+            raise TimeoutError
+        response = self.connection.recv()
+        if response[0] == "error":
+            _, error, logs = response
+            if logs:
+                error_message = f"{logs}\nExecuting code yielded an error:\n{error}"
+                try:
+                    error = type(error)(error_message)
+                except Exception:
+                    error = InterpreterError(error_message)
+            raise error
+        return response[1]
+
+    def kill(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+
+
+class WorkerPool:
+    """
+    Pool of warm worker processes, started in advance so that executors get a ready interpreter process immediately.
+
+    Each worker is leased to a single executor, which keeps its state in it. A worker is never reused once released:
+    it is killed, and the pool starts a fresh one in a background thread to stay at `size` idle workers.
+
+    Args:
+        size (`int`, defaults to `2`): Number of idle workers to keep warm.
+        start_method (`str`, *optional*): Start method of the worker processes, see `multiprocessing.get_context`.
+            Defaults to "forkserver" where it is available, and to "spawn" otherwise. "fork" is not used by default:
+            the agent process runs threads (tool calls, event loops, watchdogs), and forking while one of them holds
+            a lock can deadlock the worker.
+
+    With "forkserver", each worker imports the executor when it starts. To import it once in the fork server instead,
+    add this module to the preload list of the application before the first worker is started, e.g. with
+    `multiprocessing.set_forkserver_preload(["smolagents.process_pool_executor"])`: the pool does not set it, since the
+    preload list is shared by all the users of the fork server of the process.
+    """
+
+    def __init__(self, size: int = 2, start_method: str | None = None):
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.size = size
+        self.context = multiprocessing.get_context(start_method)
+        self._idle_workers = deque()
+        self._starting_workers = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._refill()
+
+    def _refill(self):
+        """Starts workers in a background thread until `size` workers are idle or starting."""
+        with self._lock:
+            missing_workers = self.size - len(self._idle_workers) - self._starting_workers
+            if self._closed or missing_workers <= 0:
+                return
+            self._starting_workers += missing_workers
+        for _ in range(missing_workers):
+            threading.Thread(target=self._start_idle_worker, name="WorkerPoolRefill", daemon=True).start()
+
+    def _start_idle_worker(self):
+        try:
+            worker = Worker(self.context)
+        finally:
+            with self._lock:
+                self._starting_workers -= 1
+        with self._lock:
+            if not self._closed:
+                self._idle_workers.append(worker)
+                return
+        worker.kill()
+
+    def acquire(self) -> Worker:
+        """Leases an idle worker, starting a new one if none is available."""
+        with self._lock:
+            worker = self._idle_workers.popleft() if self._idle_workers else None
+        if worker is None or not worker.process.is_alive():
+            worker = Worker(self.context)
+        self._refill()
+        return worker
+
+    def release(self, worker: Worker):
+        """Kills a leased worker, discarding its state."""
+        worker.kill()
+
+    def shutdown(self):
+        """Kills all idle workers, and stops starting new ones."""
+        with self._lock:
+            self._closed = True
+            idle_workers, self._idle_workers = self._idle_workers, deque()
+        for worker in idle_workers:
+            worker.kill()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> WorkerPool:
+    """Returns the worker pool shared by all executors created without an explicit pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+        return _default_pool
+
+
+def release_worker(pool: WorkerPool, leased_worker: dict[str, Worker | None]):
+    worker = leased_worker.pop("worker", None)
+    if worker is not None:
+        pool.release(worker)
+
+
+class ProcessPoolPythonExecutor(PythonExecutor):
+    """
+    Executor of Python code in a worker process, leased from a pool of pre-started processes.
+
+    The code is evaluated by a `LocalPythonExecutor` living in the worker process, so it gets the same restrictions on
+    imports and built-in functions, and its state persists between executions. Running outside of the agent process
+    lets several agents execute code in parallel without contending for the GIL, and lets the executor enforce hard
+    limits: the worker is killed if an execution exceeds its time budget, and its memory is capped with
+    `resource.setrlimit`.
+
+    Tools and variables are sent to the worker with pickle. Tools that cannot be pickled are sent as source code.
+
+    Args:
+        additional_authorized_imports (`list[str]`):
+            Additional authorized imports for the executor.
+        max_print_outputs_length (`int`, *optional*):
+            Maximum length of the print outputs.
+        additional_functions (`dict[str, Callable]`, *optional*):
+            Additional Python functions to be added to the executor. They must be picklable.
+        timeout_seconds (`float`, *optional*):
+            Wall-clock time budget of each execution, in seconds. The worker first tries to interrupt the execution
+            by itself. If it does not succeed within `KILL_GRACE_PERIOD` seconds, the worker is killed and replaced,
+            losing the variables defined by previous executions. Both cases raise an `ExecutionBudgetError`.
+        max_memory_mb (`float`, *optional*):
+            Limit of the growth of the address space of the worker process, in megabytes, on top of the memory it had
+            mapped when it started. Allocations beyond it raise a `MemoryError` in the executed code.
+        pool (`WorkerPool`, *optional*):
+            Pool to lease the worker process from. Defaults to a pool shared by all executors.
+        **kwargs:
+            Additional arguments to pass to the `LocalPythonExecutor` of the worker, e.g. `compiled=True`.
+    """
+
+    def __init__(
+        self,
+        additional_authorized_imports: list[str],
+        max_print_outputs_length: int | None = None,
+        additional_functions: dict[str, Callable] | None = None,
+        timeout_seconds: float | None = None,
+        max_memory_mb: float | None = None,
+        pool: WorkerPool | None = None,
+        **kwargs,
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.pool = pool if pool is not None else get_default_pool()
+        self.worker_kwargs = {
+            "additional_authorized_imports": additional_authorized_imports,
+            "max_print_outputs_length": max_print_outputs_length,
+            "additional_functions": additional_functions,
+            "timeout_seconds": timeout_seconds,
+            "max_memory_mb": max_memory_mb,
+            **kwargs,
+        }
+        self.dumped_tools = None
+        self.variables = {}
+        self._leased_worker = {}
+        self._finalizer = weakref.finalize(self, release_worker, self.pool, self._leased_worker)
+        self._start_worker()
+
+    def _start_worker(self):
+        self._leased_worker["worker"] = self.pool.acquire()
+        self._request("initialize", self.worker_kwargs.copy())
+        if self.dumped_tools is not None:
+            self._request("send_tools", self.dumped_tools)
+        if self.variables:
+            self._request("send_variables", self.variables)
+
+    def _request(self, method: str, argument: Any = None, timeout: float | None = None) -> Any:
+        worker = self._leased_worker.get("worker")
+        if worker is None:
+            raise InterpreterError("The executor has been cleaned up.")
+        try:
+            return worker.request(method, argument, timeout=timeout)
+        except TimeoutError:
+            self._restart_worker()
+            raise ExecutionBudgetError(
+                f"Execution exceeded its time budget of {self.timeout_seconds} seconds: the worker process was "
+                "killed, so all variables defined in previous code executions are lost."
+            )
+        except (EOFError, OSError):
+            exit_code = worker.process.exitcode
+            self._restart_worker()
+            raise InterpreterError(
+                f"The worker process died with exit code {exit_code}: all variables defined in previous code "
+                "executions are lost."
+            )
+
+    def _restart_worker(self):
+        release_worker(self.pool, self._leased_worker)
+        self._start_worker()
+
+    def __call__(self, code_action: str) -> CodeOutput:
+        timeout = self.timeout_seconds + KILL_GRACE_PERIOD if self.timeout_seconds is not None else None
+        return self._request("run", code_action, timeout=timeout)
+
+    def send_variables(self, variables: dict):
+        self._request("send_variables", variables)
+        self.variables.update(variables)
+
+    def send_tools(self, tools: dict[str, Tool]):
+        self.dumped_tools = dump_tools(tools)
+        self._request("send_tools", self.dumped_tools)
+
+    def cleanup(self):
+        """Kills the worker process, discarding its state."""
+        self._finalizer()
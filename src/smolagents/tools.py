@@ -17,6 +17,7 @@
 from __future__ import annotations
 
 import ast
+import asyncio
 import inspect
 import json
 import logging
@@ -24,10 +25,13 @@ import os
 import sys
 import tempfile
 import textwrap
+import threading
 import types
 import warnings
+import weakref
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from functools import wraps
 from pathlib import Path
@@ -103,6 +107,21 @@ class BaseTool(ABC):
         pass
 
 
+def run_coroutine_sync(coroutine: Coroutine) -> Any:
+    """
+    Runs a coroutine to completion from synchronous code.
+
+    If an event loop is already running in the current thread, e.g. when a tool is called from an async framework
+    through a synchronous API, the coroutine runs on a new event loop in a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="smolagents_coroutine") as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 class Tool(BaseTool):
     """
     A base class for the functions used by the agent. Subclass this and implement the `forward` method as well as the
@@ -137,6 +156,12 @@ class Tool(BaseTool):
         super().__init_subclass__(**kwargs)
         validate_after_init(cls)
 
+    def __setattr__(self, name: str, value: Any):
+        # The JSON schema of the tool, cached by `models.get_tool_json_schema`, is built from these attributes
+        if name in ("name", "description", "inputs"):
+            self.__dict__.pop("_json_schema", None)
+        super().__setattr__(name, value)
+
     def validate_arguments(self):
         required_attributes = {
             "description": str,
@@ -218,10 +243,7 @@ class Tool(BaseTool):
     def forward(self, *args, **kwargs):
         raise NotImplementedError("Write this method in your subclass of `Tool`.")
 
-    def __call__(self, *args, sanitize_inputs_outputs: bool = False, **kwargs):
-        if not self.is_initialized:
-            self.setup()
-
+    def _prepare_arguments(self, args: tuple, kwargs: dict, sanitize_inputs_outputs: bool) -> tuple[tuple, dict]:
         # Handle the arguments might be passed as a single dictionary
         if len(args) == 1 and len(kwargs) == 0 and isinstance(args[0], dict):
             potential_kwargs = args[0]
@@ -233,7 +255,35 @@ class Tool(BaseTool):
 
         if sanitize_inputs_outputs:
             args, kwargs = handle_agent_input_types(*args, **kwargs)
+        return args, kwargs
+
+    def __call__(self, *args, sanitize_inputs_outputs: bool = False, **kwargs):
+        if not self.is_initialized:
+            self.setup()
+
+        args, kwargs = self._prepare_arguments(args, kwargs, sanitize_inputs_outputs)
         outputs = self.forward(*args, **kwargs)
+        if inspect.iscoroutine(outputs):
+            # Tools with an asynchronous `forward` method can also be called from synchronous code
+            outputs = run_coroutine_sync(outputs)
+        if sanitize_inputs_outputs:
+            outputs = handle_agent_output_types(outputs, self.output_type)
+        return outputs
+
+    async def acall(self, *args, sanitize_inputs_outputs: bool = False, **kwargs):
+        """
+        Asynchronous counterpart of `__call__`, used by agents run with `arun`.
+
+        If the `forward` method of the tool is a coroutine function, it is awaited in the running event loop.
+        Otherwise, the tool is run in a worker thread so that it does not block the event loop.
+        """
+        if not inspect.iscoroutinefunction(self.forward):
+            return await asyncio.to_thread(self, *args, sanitize_inputs_outputs=sanitize_inputs_outputs, **kwargs)
+        if not self.is_initialized:
+            await asyncio.to_thread(self.setup)
+
+        args, kwargs = self._prepare_arguments(args, kwargs, sanitize_inputs_outputs)
+        outputs = await self.forward(*args, **kwargs)
         if sanitize_inputs_outputs:
             outputs = handle_agent_output_types(outputs, self.output_type)
         return outputs
@@ -1011,9 +1061,17 @@ def tool(tool_function: Callable) -> Tool:
     SimpleTool.inputs = tool_json_schema["parameters"]["properties"]
     SimpleTool.output_type = tool_json_schema["return"]["type"]
 
-    @wraps(tool_function)
-    def wrapped_function(*args, **kwargs):
-        return tool_function(*args, **kwargs)
+    if inspect.iscoroutinefunction(tool_function):
+
+        @wraps(tool_function)
+        async def wrapped_function(*args, **kwargs):
+            return await tool_function(*args, **kwargs)
+
+    else:
+
+        @wraps(tool_function)
+        def wrapped_function(*args, **kwargs):
+            return tool_function(*args, **kwargs)
 
     # Bind the copied function to the forward method
     SimpleTool.forward = staticmethod(wrapped_function)
@@ -1034,7 +1092,9 @@ def tool(tool_function: Callable) -> Tool:
     lines = tool_source.splitlines()
     tree = ast.parse(tool_source)
     #   - Find function definition
-    func_node = next((node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)), None)
+    func_node = next(
+        (node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))), None
+    )
     if not func_node:
         raise ValueError(
             "No function definition found in the provided source of {tool_function.__name__}. "
@@ -1060,7 +1120,8 @@ def tool(tool_function: Callable) -> Tool:
     body_start = func_node.body[0].lineno - 1  # AST lineno starts at 1
     tool_source_body = "\n".join(lines[body_start:])
     # - Create the forward method source, including def line and indentation
-    forward_method_source = f"def forward{new_sig}:\n{tool_source_body}"
+    function_keyword = "async def" if isinstance(func_node, ast.AsyncFunctionDef) else "def"
+    forward_method_source = f"{function_keyword} forward{new_sig}:\n{tool_source_body}"
     # - Create the class source
     indent = " " * 4  # for class method
     class_source = (
@@ -1330,6 +1391,67 @@ def validate_tool_arguments(tool: Tool, arguments: Any) -> None:
             raise TypeError(f"Argument has type '{type(arguments).__name__}' but should be '{expected_type}'")
 
 
+class ToolCallExecutor:
+    """
+    Long-lived executor of tool calls, used by [`ToolCallingAgent`] to run parallel tool calls.
+
+    Synchronous tools run in a thread pool whose threads are reused across steps and runs, instead of being started for
+    every step. Coroutines, such as the calls of tools with an asynchronous `forward` method, run on an event loop
+    living in a background thread: resources bound to an event loop, such as HTTP client sessions, can thus be reused
+    across calls.
+
+    An executor can be shared by several agents through their `tool_executor` argument: it is then shut down by its
+    owner, with `shutdown()` or by exiting its context manager.
+
+    Args:
+        max_workers (`int`, *optional*): Maximum number of threads. Defaults to `ThreadPoolExecutor`'s default.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.thread_pool = ThreadPoolExecutor(max_workers, thread_name_prefix="smolagents_tool_call")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, function: Callable, /, *args, **kwargs) -> Future:
+        """Schedules `function(*args, **kwargs)` to run in the thread pool."""
+        return self.thread_pool.submit(function, *args, **kwargs)
+
+    def run_coroutine(self, coroutine: Coroutine) -> Any:
+        """Runs a coroutine on the event loop of the executor, and waits for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="smolagents_tool_call_loop", daemon=True
+                )
+                self._loop_thread.start()
+                # Stop the loop if the executor is garbage collected without being shut down
+                self._finalizer = weakref.finalize(self, self._loop.call_soon_threadsafe, self._loop.stop)
+            return self._loop
+
+    def shutdown(self, wait: bool = True):
+        """Shuts down the thread pool and the event loop. If `wait` is True, waits for pending calls to complete."""
+        self.thread_pool.shutdown(wait=wait)
+        with self._lock:
+            if self._loop is not None:
+                self._finalizer.detach()
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                if wait:
+                    self._loop_thread.join()
+                    self._loop.close()
+                self._loop, self._loop_thread = None, None
+
+
 __all__ = [
     "AUTHORIZED_TYPES",
     "Tool",
@@ -1337,4 +1459,5 @@ __all__ = [
     "load_tool",
     "launch_gradio_demo",
     "ToolCollection",
+    "ToolCallExecutor",
 ]
@@ -15,14 +15,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import ast
+import asyncio
 import base64
+import hashlib
 import importlib.util
 import inspect
 import json
 import keyword
 import os
 import re
+import threading
 import time
+import warnings
+from collections import OrderedDict, deque
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
 from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
@@ -178,6 +185,44 @@ def extract_code_from_text(text: str, code_block_tags: tuple[str, str]) -> str |
     return None
 
 
+class CodeBlockEndDetector:
+    """
+    Detects the end of the first code block in a text streamed chunk by chunk, as delimited by `code_block_tags`.
+
+    Each chunk is searched together with the last `lookback` characters before it, so that tags split across chunks
+    are found without searching the whole text again: tags must match at most `lookback` characters.
+
+    Args:
+        code_block_tags (`tuple[str, str]`): Opening and closing tags of code blocks, as regex strings.
+        lookback (`int`, default `64`): Number of previous characters searched along with each chunk.
+    """
+
+    def __init__(self, code_block_tags: tuple[str, str], lookback: int = 64):
+        self.opening_pattern = re.compile(code_block_tags[0])
+        self.closing_pattern = re.compile(code_block_tags[1])
+        self.lookback = lookback
+        self._tail = ""
+        # Offset of the tail in the whole text
+        self._tail_offset = 0
+        # Offset of the code in the whole text, once the opening tag is found
+        self._code_offset = None
+
+    def feed(self, chunk: str) -> bool:
+        """Adds a chunk of the streamed text, and returns whether the first code block is complete."""
+        window = self._tail + chunk
+        if self._code_offset is None:
+            opening_match = self.opening_pattern.search(window)
+            if opening_match is not None:
+                self._code_offset = self._tail_offset + opening_match.end()
+        if self._code_offset is not None:
+            closing_match = self.closing_pattern.search(window, max(self._code_offset - self._tail_offset, 0))
+            if closing_match is not None:
+                return True
+        self._tail = window[-self.lookback :]
+        self._tail_offset += len(window) - len(self._tail)
+        return False
+
+
 def parse_code_blobs(text: str, code_block_tags: tuple[str, str]) -> str:
     """Extract code blocs from the LLM's output.
 
@@ -410,10 +455,38 @@ def get_source(obj) -> str:
         raise e from inspect_error
 
 
+# Maximum number of base64-encoded images kept in cache by `encode_image_base64`
+MAX_ENCODED_IMAGES = 64
+
+_encoded_images: OrderedDict[bytes, str] = OrderedDict()
+_encoded_images_lock = threading.Lock()
+
+
 def encode_image_base64(image):
+    """
+    Encodes an image as a base64 PNG string.
+
+    Images are sent to the model again at every step, so the encodings of the last `MAX_ENCODED_IMAGES` images are
+    cached. They are keyed by a hash of the image content: an image modified in place is encoded again.
+    """
+    image_hash = hashlib.blake2b(digest_size=16)
+    image_hash.update(f"{image.mode}{image.size}".encode())
+    if image.mode == "P":
+        image_hash.update(bytes(image.getpalette() or []))
+    image_hash.update(image.tobytes())
+    key = image_hash.digest()
+    with _encoded_images_lock:
+        if key in _encoded_images:
+            _encoded_images.move_to_end(key)
+            return _encoded_images[key]
     buffered = BytesIO()
     image.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+    encoded_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    with _encoded_images_lock:
+        _encoded_images[key] = encoded_image
+        if len(_encoded_images) > MAX_ENCODED_IMAGES:
+            _encoded_images.popitem(last=False)
+    return encoded_image
 
 
 def make_image_url(base64_image):
@@ -431,6 +504,23 @@ def is_valid_name(name: str) -> bool:
     return name.isidentifier() and not keyword.iskeyword(name) if isinstance(name, str) else False
 
 
+async def iterate_in_thread(iterator: Iterator) -> AsyncGenerator:
+    """
+    Iterates over a blocking iterator from asynchronous code: each item is produced in a worker thread, so that the
+    event loop keeps running other tasks while waiting for it. Generators are closed when the iteration stops early.
+    """
+    exhausted = object()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, exhausted)
+            if item is exhausted:
+                return
+            yield item
+    finally:
+        if hasattr(iterator, "close"):
+            iterator.close()
+
+
 AGENT_GRADIO_APP_TEMPLATE = """import yaml
 import os
 from smolagents import GradioUI, {{ class_name }}, {{ agent_dict['model']['class'] }}
@@ -478,31 +568,201 @@ def create_agent_gradio_app_template():
 
 
 class RateLimiter:
-    """Simple rate limiter that enforces a minimum delay between consecutive requests.
+    """Thread-safe token-bucket rate limiter, optionally bounding the number of requests in flight.
+
+    The bucket holds up to `burst` tokens and refills at `requests_per_minute / 60` tokens per second. Each call to
+    `throttle()` takes a token, waiting for one to be refilled if the bucket is empty: up to `burst` requests can thus be
+    sent at once, while the average rate stays under `requests_per_minute`. With the default `burst=1`, consecutive
+    requests are simply spaced out by `60 / requests_per_minute` seconds.
 
-    This class is useful for limiting the rate of operations such as API requests,
-    by ensuring that calls to `throttle()` are spaced out by at least a given interval
-    based on the desired requests per minute.
+    Tokens are reserved under a lock before waiting, so that concurrent threads and tasks sharing the limiter are
+    spaced out as well. If no rate is specified (i.e., `requests_per_minute` is None), requests are not rate-limited.
 
-    If no rate is specified (i.e., `requests_per_minute` is None), rate limiting
-    is disabled and `throttle()` becomes a no-op.
+    The `limit()` and `alimit()` context managers additionally hold one of `max_concurrent_requests` slots while the
+    request is in flight, e.g. while a completion is being streamed. When the provider asks to slow down, `backoff()`
+    holds back all the requests sharing the limiter, even if no rate is specified.
+
+    To share a limiter between several models and tools, either pass them the same instance, or get a named one with
+    `RateLimiter.shared(name, ...)`.
 
     Args:
         requests_per_minute (`float | None`): Maximum number of allowed requests per minute.
             Use `None` to disable rate limiting.
+        burst (`int`, default `1`): Maximum number of requests that can be sent at once after an idle period.
+        max_concurrent_requests (`int | None`): Maximum number of requests in flight within `limit()` and `alimit()`.
+            Use `None` to disable the concurrency limit.
+
+    Example:
+    ```py
+    >>> limiter = RateLimiter.shared("openai", requests_per_minute=500, burst=20, max_concurrent_requests=8)
+    >>> model = OpenAIModel(model_id="gpt-4o", rate_limiter=limiter)
+    >>> with limiter.limit():
+    ...     response = requests.get(url)
+    ```
     """
 
-    def __init__(self, requests_per_minute: float | None = None):
+    _shared_limiters: dict[str, "RateLimiter"] = {}
+    _shared_limiters_lock = threading.Lock()
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        burst: int = 1,
+        max_concurrent_requests: int | None = None,
+    ):
+        if requests_per_minute is not None and requests_per_minute <= 0:
+            raise ValueError(f"requests_per_minute must be positive, got {requests_per_minute}.")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}.")
+        if max_concurrent_requests is not None and max_concurrent_requests < 1:
+            raise ValueError(f"max_concurrent_requests must be at least 1, got {max_concurrent_requests}.")
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_concurrent_requests = max_concurrent_requests
         self._enabled = requests_per_minute is not None
-        self._interval = 60.0 / requests_per_minute if self._enabled else 0.0
-        self._last_call = 0.0
+        self._refill_rate = requests_per_minute / 60.0 if self._enabled else 0.0
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        # Concurrency slots are shared by threads and event loops: waiters are woken up in order by `_release_slot`
+        self._free_slots = max_concurrent_requests
+        self._slot_waiters: deque[Callable[[], None]] = deque()
+
+    @classmethod
+    def shared(
+        cls,
+        name: str,
+        requests_per_minute: float | None = None,
+        burst: int | None = None,
+        max_concurrent_requests: int | None = None,
+    ) -> "RateLimiter":
+        """Returns the limiter registered under `name`, creating it with the given settings on first use.
+
+        Later calls with the same name return the same limiter, so that all models and tools using a provider draw
+        from a single bucket: a warning is emitted if they specify settings that differ from the ones of that limiter.
+        """
+        settings = {
+            "requests_per_minute": requests_per_minute,
+            "burst": burst,
+            "max_concurrent_requests": max_concurrent_requests,
+        }
+        with cls._shared_limiters_lock:
+            if name not in cls._shared_limiters:
+                cls._shared_limiters[name] = cls(requests_per_minute, burst or 1, max_concurrent_requests)
+                return cls._shared_limiters[name]
+            limiter = cls._shared_limiters[name]
+        conflicts = {
+            key: value for key, value in settings.items() if value is not None and value != getattr(limiter, key)
+        }
+        if conflicts:
+            kept_settings = {key: getattr(limiter, key) for key in conflicts}
+            warnings.warn(
+                f"The shared rate limiter {name!r} already exists with different settings: ignoring {conflicts} and "
+                f"keeping {kept_settings}."
+            )
+        return limiter
+
+    @classmethod
+    def resolve(cls, rate_limiter: "RateLimiter | str | None", requests_per_minute: float | None) -> "RateLimiter":
+        """Returns the given limiter, the shared limiter with the given name, or a new limiter of `requests_per_minute`."""
+        if isinstance(rate_limiter, str):
+            return cls.shared(rate_limiter, requests_per_minute)
+        return rate_limiter if rate_limiter is not None else cls(requests_per_minute)
+
+    def _reserve(self) -> float:
+        """Takes a token from the bucket and returns how long to wait before it is actually available."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._blocked_until - now, 0.0)
+            if self._enabled:
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self._refill_rate)
+                self._last_refill = now
+                self._tokens -= 1
+                # A negative balance holds the tokens already promised to waiting callers
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens / self._refill_rate)
+            return delay
+
+    def backoff(self, delay: float):
+        """Holds back all requests going through this limiter for the next `delay` seconds, e.g. after a 429 error."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
 
     def throttle(self):
-        """Pause execution to respect the rate limit, if enabled."""
-        if not self._enabled:
-            return
-        now = time.time()
-        elapsed = now - self._last_call
-        if elapsed < self._interval:
-            time.sleep(self._interval - elapsed)
-        self._last_call = time.time()
+        """Pause execution to respect the rate limit and backoff, if any."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def athrottle(self):
+        """Wait without blocking the event loop to respect the rate limit and backoff, if any."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _acquire_slot(self):
+        with self._lock:
+            if self._free_slots > 0:
+                self._free_slots -= 1
+                return
+            slot_granted = threading.Event()
+            self._slot_waiters.append(slot_granted.set)
+        slot_granted.wait()
+
+    async def _aacquire_slot(self):
+        loop = asyncio.get_running_loop()
+        slot_granted = loop.create_future()
+
+        def wake_up():
+            loop.call_soon_threadsafe(lambda: slot_granted.done() or slot_granted.set_result(None))
+
+        with self._lock:
+            if self._free_slots > 0:
+                self._free_slots -= 1
+                return
+            self._slot_waiters.append(wake_up)
+        try:
+            await slot_granted
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = wake_up not in self._slot_waiters
+                if not granted:
+                    self._slot_waiters.remove(wake_up)
+            if granted:
+                # The slot was handed over while the task was being cancelled
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._lock:
+            if not self._slot_waiters:
+                self._free_slots += 1
+                return
+            # The slot is handed over to the first waiter, so that it cannot be taken by a newcomer
+            wake_up = self._slot_waiters.popleft()
+        wake_up()
+
+    @contextmanager
+    def limit(self):
+        """Context manager holding a concurrency slot during the block, after waiting for the rate limit."""
+        if self.max_concurrent_requests is not None:
+            self._acquire_slot()
+        try:
+            self.throttle()
+            yield
+        finally:
+            if self.max_concurrent_requests is not None:
+                self._release_slot()
+
+    @asynccontextmanager
+    async def alimit(self):
+        """Asynchronous version of `limit()`, waiting for a concurrency slot without blocking the event loop."""
+        if self.max_concurrent_requests is not None:
+            await self._aacquire_slot()
+        try:
+            await self.athrottle()
+            yield
+        finally:
+            if self.max_concurrent_requests is not None:
+                self._release_slot()
@@ -12,11 +12,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import io
 import json
 import os
 import re
 import tempfile
+import threading
 import uuid
 from collections.abc import Generator
 from contextlib import nullcontext as does_not_raise
@@ -41,6 +43,7 @@ from smolagents.agents import (
     AgentMaxStepsError,
     AgentToolCallError,
     CodeAgent,
+    DelegateTasksTool,
     MultiStepAgent,
     ToolCall,
     ToolCallingAgent,
@@ -53,21 +56,27 @@ from smolagents.memory import (
     CallbackRegistry,
     FinalAnswerStep,
     MemoryStep,
+    MessagesSnapshot,
     PlanningStep,
     SystemPromptStep,
     TaskStep,
 )
 from smolagents.models import (
     ChatMessage,
+    ChatMessageStreamDelta,
     ChatMessageToolCall,
     ChatMessageToolCallFunction,
     InferenceClientModel,
     MessageRole,
     Model,
     TransformersModel,
+    _run_retries,
+    reset_retry_budget,
+    restore_retry_budget,
 )
 from smolagents.monitoring import AgentLogger, LogLevel, Timing, TokenUsage
-from smolagents.tools import Tool, tool
+from smolagents.process_pool_executor import ProcessPoolPythonExecutor
+from smolagents.tools import Tool, ToolCallExecutor, tool
 from smolagents.utils import (
     BASE_BUILTIN_MODULES,
     AgentExecutionError,
@@ -472,6 +481,64 @@ class TestAgent:
             ToolCall(name="python_interpreter", arguments="final_answer(7.2904)", id="call_2")
         ]
 
+    def test_fake_toolcalling_agent_arun(self):
+        agent = ToolCallingAgent(tools=[PythonInterpreterTool()], model=FakeToolCallModel())
+        output = asyncio.run(agent.arun("What is 2 multiplied by 3.6452?"))
+        assert "7.2904" in output
+        assert "7.2904" in agent.memory.steps[1].observations
+        assert agent.memory.steps[2].model_output == "I will return the final answer."
+
+    def test_fake_code_agent_arun(self):
+        agent = CodeAgent(tools=[PythonInterpreterTool()], model=FakeCodeModel(), verbosity_level=10)
+        output = asyncio.run(agent.arun("What is 2 multiplied by 3.6452?"))
+        assert output == 7.2904
+        assert agent.memory.steps[2].tool_calls == [
+            ToolCall(name="python_interpreter", arguments="final_answer(7.2904)", id="call_2")
+        ]
+
+    def test_arun_stream(self):
+        async def collect_steps():
+            agent = CodeAgent(tools=[], model=FakeCodeModel())
+            return [step async for step in await agent.arun("What is 2 multiplied by 3.6452?", stream=True)]
+
+        steps = asyncio.run(collect_steps())
+        assert isinstance(steps[-1], FinalAnswerStep)
+        assert steps[-1].output == 7.2904
+        assert [step.step_number for step in steps if isinstance(step, ActionStep)] == [1, 2]
+
+    def test_arun_awaits_model_and_async_tools_concurrently(self):
+        class AsyncToolCallModel(Model):
+            async def agenerate(self, messages, tools_to_call_from=None, stop_sequences=None):
+                await asyncio.sleep(0)
+                if len(messages) < 3:
+                    tool_call = ChatMessageToolCall(
+                        id="call_0", type="function", function=ChatMessageToolCallFunction(name="wait", arguments={})
+                    )
+                else:
+                    tool_call = ChatMessageToolCall(
+                        id="call_1",
+                        type="function",
+                        function=ChatMessageToolCallFunction(name="final_answer", arguments={"answer": "done"}),
+                    )
+                return ChatMessage(role=MessageRole.ASSISTANT, content="", tool_calls=[tool_call])
+
+        barrier = None
+
+        @tool
+        async def wait() -> str:
+            """Waits for all the other runs to call this tool."""
+            await asyncio.wait_for(barrier.wait(), timeout=5)
+            return "waited"
+
+        async def run_agents():
+            nonlocal barrier
+            # The barrier is only crossed if the 10 runs are waiting for it at the same time in the event loop
+            barrier = asyncio.Barrier(10)
+            agents = [ToolCallingAgent(tools=[wait], model=AsyncToolCallModel()) for _ in range(10)]
+            return await asyncio.gather(*(agent.arun("Wait") for agent in agents))
+
+        assert asyncio.run(run_agents()) == ["done"] * 10
+
     def test_additional_args_added_to_task(self):
         agent = CodeAgent(tools=[], model=FakeCodeModel())
         agent.run(
@@ -1418,8 +1485,200 @@ class TestMultiStepAgent:
         assert recreated_managed_agent.description == "A managed agent for testing"
         assert recreated_managed_agent.max_steps == 5
 
+    def test_run_batch(self, tmp_path):
+        class FakeCodeModelFailing(FakeCodeModel):
+            def generate(self, messages, stop_sequences=None):
+                if "Fail" in str(messages):
+                    raise ValueError("Model is down")
+                return super().generate(messages, stop_sequences=stop_sequences)
+
+        model = FakeCodeModelFailing()
+        managed_agent = CodeAgent(tools=[], model=model, name="helper", description="Helps.")
+        agent = CodeAgent(tools=[], model=model, managed_agents=[managed_agent], instructions="Be precise.")
+        output = tmp_path / "results.jsonl"
+        tasks = ["Compute", {"task": "Compute again", "id": 1, "true_answer": 7.2904}, "Fail"]
+
+        results = agent.run_batch(tasks, concurrency=2, output=output)
+
+        assert [result["id"] for result in results] == ["Compute", 1, "Fail"]
+        assert results[0]["output"] == 7.2904
+        assert results[0]["state"] == "success"
+        assert results[0]["token_usage"] is None
+        assert results[1]["true_answer"] == 7.2904
+        assert results[2]["state"] == "error"
+        assert "Model is down" in results[2]["error"]
+        # Runs happen in clones of the agent, which share its model
+        assert agent.memory.steps == []
+        lines = output.read_text().splitlines()
+        assert sorted(str(json.loads(line)["id"]) for line in lines) == ["1", "Compute", "Fail"]
+
+    def test_run_batch_resumes_from_output(self, tmp_path):
+        output = tmp_path / "results.jsonl"
+        previous_results = [
+            {"id": "Done", "task": "Done", "output": "previous", "state": "success"},
+            {"id": "Errored", "task": "Errored", "output": None, "state": "error"},
+        ]
+        output.write_text("".join(json.dumps(result) + "\n" for result in previous_results) + '{"id": "trunc')
+        agent = CodeAgent(tools=[], model=FakeCodeModel())
+
+        results = agent.run_batch(["Done", "Errored", "New"], output=output)
+
+        assert results[0] == previous_results[0]
+        assert [result["state"] for result in results] == ["success", "success", "success"]
+        assert results[1]["output"] == 7.2904
+        # Only the errored and new tasks were run again
+        assert len(output.read_text().splitlines()) == 5
+
+    def test_run_batch_clones_agents_without_serializing_tools(self):
+        class PrefixTool(Tool):
+            name = "prefix"
+            description = "Adds a prefix to a text."
+            inputs = {"text": {"type": "string", "description": "The text."}}
+            output_type = "string"
+
+            def __init__(self, prefix: str):
+                # A required init argument makes the tool unserializable
+                self.prefix = prefix
+                super().__init__()
+
+            def forward(self, text: str) -> str:
+                return self.prefix + text
+
+        steps = []
+        agent = CodeAgent(tools=[PrefixTool("> ")], model=FakeCodeModel(), step_callbacks=[steps.append])
+        with pytest.raises(ValueError):
+            agent.to_dict()
+
+        results = agent.run_batch(["Compute", "Compute again"])
+
+        assert [result["state"] for result in results] == ["success", "success"]
+        # Step callbacks are forwarded to the clones
+        assert len(steps) == 4
+
+    def test_run_restores_retry_budget_of_caller(self):
+        token = reset_retry_budget()
+        try:
+            manager_budget = _run_retries.get()
+            agent = CodeAgent(tools=[], model=FakeCodeModel())
+            agent.run("Compute")
+            assert _run_retries.get() is manager_budget
+            list(agent.run("Compute", stream=True))
+            assert _run_retries.get() is manager_budget
+        finally:
+            restore_retry_budget(token)
+
+    def test_run_batch_rejects_duplicate_ids(self):
+        agent = CodeAgent(tools=[], model=FakeCodeModel())
+        with pytest.raises(ValueError, match="unique ids"):
+            agent.run_batch(["Compute", {"task": "Compute twice", "id": "Compute"}])
+
 
 class TestToolCallingAgent:
+    def test_process_tool_calls_uses_persistent_tool_executor(self):
+        @tool
+        async def async_lookup(key: str) -> str:
+            """
+            Looks up a key.
+
+            Args:
+                key: The key to look up.
+            """
+            import asyncio
+
+            return f"{key} on loop {id(asyncio.get_running_loop())}"
+
+        @tool
+        def sync_lookup(key: str) -> str:
+            """
+            Looks up a key.
+
+            Args:
+                key: The key to look up.
+            """
+            return key
+
+        chat_message = ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content="",
+            tool_calls=[
+                ChatMessageToolCall(
+                    id=f"call_{i}",
+                    type="function",
+                    function=ChatMessageToolCallFunction(name=name, arguments={"key": "k"}),
+                )
+                for i, name in enumerate(["async_lookup", "sync_lookup", "async_lookup"])
+            ],
+        )
+        with ToolCallingAgent(tools=[async_lookup, sync_lookup], model=MagicMock()) as agent:
+            outputs = []
+            for step_number in [1, 2]:
+                memory_step = ActionStep(step_number=step_number, timing=Timing(start_time=0.0))
+                outputs += [
+                    output
+                    for output in agent.process_tool_calls(chat_message, memory_step)
+                    if isinstance(output, ToolOutput)
+                ]
+                if step_number == 1:
+                    tool_executor = agent.tool_executor
+            # The executor and its event loop are reused across steps
+            assert agent.tool_executor is tool_executor
+            assert len({output.output for output in outputs if output.tool_call.name == "async_lookup"}) == 1
+        for output in outputs:
+            assert output.timing.queue_duration >= 0
+            assert output.timing.duration >= 0
+        # The executor owned by the agent is shut down when exiting its context manager
+        assert agent._tool_executor is None
+        with pytest.raises(RuntimeError):
+            tool_executor.submit(print)
+
+    def test_aprocess_tool_calls_is_bounded_by_max_tool_threads(self):
+        running_calls, max_running_calls = 0, 0
+
+        @tool
+        async def wait(key: str) -> str:
+            """
+            Waits a bit.
+
+            Args:
+                key: A key.
+            """
+            import asyncio
+
+            nonlocal running_calls, max_running_calls
+            running_calls += 1
+            max_running_calls = max(max_running_calls, running_calls)
+            await asyncio.sleep(0.01)
+            running_calls -= 1
+            return key
+
+        chat_message = ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content="",
+            tool_calls=[
+                ChatMessageToolCall(
+                    id=f"call_{i}",
+                    type="function",
+                    function=ChatMessageToolCallFunction(name="wait", arguments={"key": "k"}),
+                )
+                for i in range(6)
+            ],
+        )
+
+        async def process_tool_calls():
+            memory_step = ActionStep(step_number=1, timing=Timing(start_time=0.0))
+            return [output async for output in agent.aprocess_tool_calls(chat_message, memory_step)]
+
+        agent = ToolCallingAgent(tools=[wait], model=MagicMock(), max_tool_threads=2)
+        outputs = asyncio.run(process_tool_calls())
+        assert len([output for output in outputs if isinstance(output, ToolOutput)]) == 6
+        assert max_running_calls == 2
+
+    def test_shared_tool_executor_is_not_shut_down_by_agents(self):
+        with ToolCallExecutor(max_workers=2) as tool_executor:
+            with ToolCallingAgent(tools=[], model=MagicMock(), tool_executor=tool_executor) as agent:
+                assert agent.tool_executor is tool_executor
+            assert tool_executor.submit(lambda: 1).result() == 1
+
     def test_toolcalling_agent_instructions(self):
         agent = ToolCallingAgent(tools=[], model=MagicMock(), instructions="Test instructions")
         assert agent.instructions == "Test instructions"
@@ -1897,6 +2156,34 @@ class TestCodeAgent:
             )
         assert result == expected_summary
 
+    @pytest.mark.parametrize("stop_streaming_at_code_end", [False, True])
+    def test_stop_streaming_at_code_end(self, stop_streaming_at_code_end):
+        class FakeStreamingCodeModel(Model):
+            def __init__(self):
+                super().__init__()
+                self.generated_tokens = []
+
+            def generate_stream(self, messages, stop_sequences=None):
+                tokens = ["Thought: done\n", "<code>\nfinal_answer(", "2)\n</co", "de>", "\nObservation:", " wasted"]
+                for token in tokens:
+                    self.generated_tokens.append(token)
+                    yield ChatMessageStreamDelta(content=token)
+
+        model = FakeStreamingCodeModel()
+        agent = CodeAgent(
+            tools=[],
+            model=model,
+            stream_outputs=True,
+            stop_streaming_at_code_end=stop_streaming_at_code_end,
+            verbosity_level=0,
+        )
+        assert agent.run("Return 2") == 2
+        if stop_streaming_at_code_end:
+            assert model.generated_tokens[-1] == "de>"
+            assert agent.memory.steps[1].model_output.endswith("</code>")
+        else:
+            assert model.generated_tokens[-1] == " wasted"
+
     def test_code_agent_image_output(self):
         from PIL import Image
 
@@ -2022,6 +2309,49 @@ print("Ok, calculation done!")""")
         agent.run("Test run")
         assert "open" in agent.python_executor.static_tools
 
+    def test_process_pool_executor(self):
+        model = MagicMock()
+        model.generate.return_value = ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content="<code>\nfinal_answer(y * 2)\n</code>",
+            tool_calls=None,
+            raw="",
+            token_usage=None,
+        )
+        with CodeAgent(tools=[], model=model, executor_type="process") as agent:
+            assert isinstance(agent.python_executor, ProcessPoolPythonExecutor)
+            assert agent.run("Test run", additional_args={"y": 21}) == 42
+
+    def test_model_input_messages_are_shared_between_steps(self):
+        model = MagicMock()
+        model.generate.side_effect = [
+            ChatMessage(role=MessageRole.ASSISTANT, content=f"<code>\nx = {i}\n</code>", tool_calls=None, raw="")
+            for i in range(3)
+        ] + [ChatMessage(role=MessageRole.ASSISTANT, content="<code>\nfinal_answer(x)\n</code>", raw="")]
+        agent = CodeAgent(tools=[], model=model)
+        assert agent.run("Test run") == 2
+        action_steps = agent.memory.steps[1:]
+        for previous_step, step in zip(action_steps, action_steps[1:]):
+            assert isinstance(step.model_input_messages, MessagesSnapshot)
+            assert step.model_input_messages._parent is previous_step.model_input_messages
+            assert step.model_input_messages == model.generate.call_args_list[step.step_number - 1].args[0]
+
+    def test_profiled_code_execution(self):
+        model = MagicMock()
+        model.generate.return_value = ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content="<code>\nx = sum(range(10))\nfinal_answer(x)\n</code>",
+            tool_calls=None,
+            raw="",
+            token_usage=None,
+        )
+        agent = CodeAgent(tools=[], model=model, executor_kwargs={"profile": True})
+        assert agent.run("Test run") == 45
+        profile = agent.memory.steps[-1].profile
+        assert profile.functions["sum"].count == 1
+        assert profile.lines[1].count == 1
+        assert agent.memory.steps[-1].dict()["profile"] == profile.dict()
+
     @pytest.mark.parametrize("agent_dict_version", ["v1.9", "v1.10", "v1.20"])
     def test_from_folder(self, agent_dict_version, get_agent_dict):
         agent_dict = get_agent_dict(agent_dict_version)
@@ -2147,6 +2477,49 @@ print("Ok, calculation done!")""")
 
 
 class TestMultiAgents:
+    def test_delegate_tasks_tool_runs_agents_concurrently(self):
+        barrier = threading.Barrier(2, timeout=10)
+
+        class FakeCodeModelWaitingForOthers(FakeCodeModel):
+            def generate(self, messages, stop_sequences=None):
+                if "special_marker" not in str(messages):
+                    # Both tasks must be running at the same time to get past the barrier
+                    barrier.wait()
+                return super().generate(messages, stop_sequences=stop_sequences)
+
+        worker = CodeAgent(tools=[], model=FakeCodeModelWaitingForOthers(), name="worker", description="Works.")
+        delegate_tasks = DelegateTasksTool([worker])
+        reports = delegate_tasks(tasks=[{"agent": "worker", "task": "Task 1"}, {"agent": "worker", "task": "Task 2"}])
+
+        assert len(reports) == 2
+        assert all("worker" in report and "7.2904" in report for report in reports)
+        # Each task ran in a clone of the agent
+        assert worker.memory.steps == []
+
+    def test_delegate_tasks_tool_reports_failures(self):
+        worker = CodeAgent(tools=[], model=FakeCodeModelError(), name="worker", description="Works.", max_steps=1)
+        delegate_tasks = DelegateTasksTool([worker])
+        with pytest.raises(ValueError, match="Unknown team member 'unknown'"):
+            delegate_tasks(tasks=[{"agent": "unknown", "task": "Task"}])
+        with pytest.raises(ValueError, match="must be a list of dictionaries"):
+            delegate_tasks(tasks=["Task 1", "Task 2"])
+        with pytest.raises(ValueError, match="needs a key 'task'"):
+            delegate_tasks(tasks=[{"agent": "worker"}])
+        with patch.object(CodeAgent, "run", side_effect=RuntimeError("Agent crashed")):
+            reports = delegate_tasks(tasks=[{"agent": "worker", "task": "Task"}])
+        assert reports == ["Team member 'worker' failed: RuntimeError: Agent crashed"]
+
+    def test_delegate_tasks_tool_is_not_serialized(self, tmp_path):
+        worker = CodeAgent(tools=[], model=FakeCodeModel(), name="worker", description="Works.")
+        manager = CodeAgent(tools=[DelegateTasksTool([worker])], model=FakeCodeModel())
+        agent_dict = manager.to_dict()
+        assert [tool_dict["name"] for tool_dict in agent_dict["tools"]] == ["final_answer"]
+        manager.save(tmp_path)
+        assert json.loads((tmp_path / "agent.json").read_text())["tools"] == ["final_answer"]
+        assert not (tmp_path / "tools" / "delegate_tasks.py").exists()
+        # Batches run in clones of the manager, which keep the tool
+        assert manager.run_batch(["Compute"])[0]["state"] == "success"
+
     def test_multiagents_save(self, tmp_path):
         model = InferenceClientModel(model_id="Qwen/Qwen2.5-Coder-32B-Instruct", max_tokens=2096, temperature=0.5)
 
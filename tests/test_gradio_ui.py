@@ -175,6 +175,15 @@ class TestStreamToGradio:
         # Verify that the content was accumulated and yielded
         assert result == ["Hello", "Hello world"]
 
+    def test_stream_to_gradio_throttles_deltas(self):
+        """Test that deltas received within the update interval are yielded together"""
+        mock_agent = Mock()
+        mock_agent.run = Mock(return_value=[ChatMessageStreamDelta(content=token) for token in ["a", "b", "c"]])
+        mock_agent.model = Mock()
+        result = list(stream_to_gradio(mock_agent, "test task", update_interval=1000))
+        # The first text is yielded immediately, and the last one at the end of the stream
+        assert result == ["a", "abc"]
+
     @pytest.mark.parametrize(
         "task,task_images,reset_memory,additional_args",
         [
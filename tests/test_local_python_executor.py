@@ -14,6 +14,8 @@
 # limitations under the License.
 
 import ast
+import threading
+import time
 import types
 from contextlib import nullcontext as does_not_raise
 from textwrap import dedent
@@ -27,17 +29,31 @@ from smolagents.default_tools import BASE_PYTHON_TOOLS, FinalAnswerTool
 from smolagents.local_python_executor import (
     DANGEROUS_FUNCTIONS,
     DANGEROUS_MODULES,
+    NODE_COMPILERS,
+    NODE_EVALUATORS,
+    AuthorizedImports,
+    CodeCache,
+    ExecutionBudgetError,
+    ExecutionProfile,
+    Frame,
     InterpreterError,
     LocalPythonExecutor,
     PrintContainer,
+    StaticTools,
     check_import_authorized,
+    compile_node,
+    evaluate_ast,
     evaluate_boolop,
     evaluate_condition,
     evaluate_delete,
     evaluate_python_code,
     evaluate_subscript,
     fix_final_answer_code,
+    get_memory_usage,
     get_safe_module,
+    has_safe_result,
+    register_node_evaluator,
+    set_value,
 )
 
 
@@ -418,6 +434,25 @@ recur_fibo(6)"""
         evaluate_python_code(code, {"range": range}, state=state)
         assert state["_operations_count"]["counter"] == 5
 
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_register_node_evaluator(self, compiled):
+        code = "if (n := 3) > 2:\n    y = n * 2"
+        with pytest.raises(InterpreterError, match="NamedExpr is not supported"):
+            evaluate_python_code(code, {}, state={}, compiled=compiled)
+
+        with patch.dict(NODE_EVALUATORS), patch.dict(NODE_COMPILERS):
+
+            @register_node_evaluator(ast.NamedExpr)
+            def evaluate_named_expr(named_expr, state, static_tools, custom_tools, authorized_imports):
+                value = evaluate_ast(named_expr.value, state, static_tools, custom_tools, authorized_imports)
+                set_value(named_expr.target, value, state, static_tools, custom_tools, authorized_imports)
+                return value
+
+            state = {}
+            evaluate_python_code(code, {}, state=state, compiled=compiled)
+            assert state["n"] == 3 and state["y"] == 6
+        assert ast.NamedExpr not in NODE_EVALUATORS
+
     def test_evaluate_string_methods(self):
         code = "'hello'.replace('h', 'o').split('e')"
         result, _ = evaluate_python_code(code, {}, state={})
@@ -517,6 +552,39 @@ print(check_digits)
         result, _ = evaluate_python_code(code, {}, state={})
         assert result == {10, 19, 20}
 
+    @pytest.mark.parametrize(
+        "code, expected_result",
+        [
+            ("{x * y for x in [1, 2] for y in [10, 100]}", {10, 100, 20, 200}),
+            ("{(x, y): x * y for x in [1, 2] for y in [x, 3]}", {(1, 1): 1, (1, 3): 3, (2, 2): 4, (2, 3): 6}),
+            ("list(x + y for x in 'ab' if x != 'b' for y in 'cd')", ["ac", "ad"]),
+        ],
+    )
+    def test_comprehensions_with_nested_generators(self, code, expected_result):
+        result, _ = evaluate_python_code(code, BASE_PYTHON_TOOLS, state={})
+        assert result == expected_result
+
+    def test_comprehension_variables_do_not_leak(self):
+        state = {"x": -1}
+        evaluate_python_code(
+            "values = [x for x in range(3)]\ntotal = sum(y for y in values)", BASE_PYTHON_TOOLS, state=state
+        )
+        assert state["x"] == -1 and state["total"] == 3 and "y" not in state
+
+    def test_generatorexp_is_lazy(self):
+        code = dedent(
+            """\
+            import itertools
+            consumed = []
+            squares = (consumed.append(x) or x * x for x in itertools.count())
+            first = [next(squares) for _ in range(3)]
+            """
+        )
+        state = {}
+        evaluate_python_code(code, BASE_PYTHON_TOOLS, state=state)
+        assert state["first"] == [0, 1, 4]
+        assert state["consumed"] == [0, 1, 2]
+
     def test_generatorexp(self):
         code = "x = (i for i in range(3))"
         result, _ = evaluate_python_code(code, {"range": range}, state={})
@@ -1025,6 +1093,44 @@ n = f(1, n=667)
         assert res == 1000
         assert not is_final_answer
 
+    def test_default_arg_not_shadowed_by_enclosing_variable(self):
+        code = """
+def f(a, b=2):
+    return a + b
+b = 10
+f(1)
+"""
+        res, _ = evaluate_python_code(code, {}, {})
+        assert res == 3
+
+    def test_function_scope_does_not_leak(self):
+        code = """
+x = 1
+values = [1, 2]
+def f(y):
+    x = y
+    values.append(x)
+    return [x + v for v in values]
+result = f(5)
+add = lambda x: x + 1
+"""
+        state = {}
+        evaluate_python_code(code, {}, state=state)
+        assert state["x"] == 1
+        assert state["values"] == [1, 2, 5]
+        assert state["result"] == [6, 7, 10]
+        assert "y" not in state
+
+    def test_delete_enclosing_variable_in_function(self):
+        code = """
+x = 1
+def f():
+    del x
+f()
+"""
+        with pytest.raises(InterpreterError, match="Cannot delete name 'x': it is not a local variable"):
+            evaluate_python_code(code, {}, state={})
+
     def test_set(self):
         code = """
 S1 = {'a', 'b', 'c'}
@@ -1834,6 +1940,19 @@ class TestEvaluateSubscript:
             assert result == expectation
 
 
+def test_evaluate_ast_accepts_plain_operations_count():
+    tree = ast.parse("x = [i * 2 for i in range(3)]\ny = x[-1]")
+    state = {"_operations_count": {"counter": 0}}
+    for node in tree.body:
+        evaluate_ast(node, state, {"range": range}, {}, [])
+    assert state["y"] == 4
+    assert state["_operations_count"]["counter"] > 0
+    state = {"_operations_count": {"counter": 0}}
+    for node in tree.body:
+        compile_node(node)(state, {"range": range}, {}, [])
+    assert state["y"] == 4
+
+
 def test_get_safe_module_handle_lazy_imports():
     class FakeModule(types.ModuleType):
         def __init__(self, name):
@@ -1938,6 +2057,36 @@ Got:      {result}
 )
 def test_check_import_authorized(module: str, authorized_imports: list[str], expected: bool):
     assert check_import_authorized(module, authorized_imports) == expected
+    memoized_authorized_imports = AuthorizedImports(authorized_imports)
+    for _ in range(2):
+        assert check_import_authorized(module, memoized_authorized_imports) == expected
+
+
+class TestAuthorizedImports:
+    def test_behaves_like_list_of_imports(self):
+        authorized_imports = AuthorizedImports(["math", "numpy.*"])
+        assert list(authorized_imports) == ["math", "numpy.*"]
+        assert "math" in authorized_imports
+        assert str(authorized_imports) == "['math', 'numpy.*']"
+        with pytest.raises(TypeError):
+            authorized_imports.import_tree["os"] = {}
+
+    def test_memoizes_verdicts(self):
+        authorized_imports = AuthorizedImports(["math"])
+        with patch("smolagents.local_python_executor.is_import_in_tree", return_value=True) as mock_is_import_in_tree:
+            for _ in range(3):
+                assert authorized_imports.is_authorized("math")
+        assert mock_is_import_in_tree.call_count == 1
+        assert authorized_imports.is_dangerous_function("builtins", "eval")
+        assert not authorized_imports.is_dangerous_function("math", "sqrt")
+
+    def test_executor_error_message_lists_imports(self):
+        executor = LocalPythonExecutor(["numpy"])
+        with pytest.raises(InterpreterError, match=r"Authorized imports are: \[.*'numpy'.*\]"):
+            executor("import os")
+        executor.send_tools({"evaluate": eval})
+        with pytest.raises(InterpreterError, match="Forbidden access to function: eval"):
+            executor("f = evaluate")
 
 
 class TestLocalPythonExecutor:
@@ -2046,6 +2195,271 @@ class TestLocalPythonExecutor:
         assert result is expected_result
 
 
+class TestCompiledEvaluation:
+    @staticmethod
+    def run_code(code, compiled, static_tools=None):
+        state = {}
+        try:
+            result = evaluate_python_code(
+                code,
+                static_tools if static_tools is not None else dict(BASE_PYTHON_TOOLS),
+                state=state,
+                compiled=compiled,
+            )
+        except InterpreterError as e:
+            result = e
+        print_outputs = str(state.pop("_print_outputs", ""))
+        return result, state, print_outputs
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "x = 3\ny = x * 2 + 1 - -x",
+            "x = [i for i in range(5)]\ny = x[1:4:2]\nz = {'a': x, 'b': (1, 2)}\nz['a'][-1]",
+            "total = 0\nfor i in range(20):\n    if i % 2 == 0:\n        continue\n    total += i\n    if total > 30:\n        break\ntotal",
+            "i = 0\nwhile i < 10:\n    i += 1\n    if i == 7:\n        break\ni",
+            "a, b = 1, 2\nc = a < b <= 2 and not a == b or None\nc",
+            "s = 'hello'\nf'{s.upper()} {3.14159:.2f} {len(s)}'",
+            "x = {1, 2}\nx |= {3}\ny = [1]\ny += [2]\nprint(x, y)\ny",
+            "def f(a, b=2, *args, **kwargs):\n    return a + b + sum(args) + len(kwargs)\nf(1, *[3, 4], **{'c': 5})",
+            "x = 1 if 2 > 3 else 'no'\nx",
+            "d = {'a': 1}\nd['b'] = d.get('a', 0) + 1\nd",
+            "x = [1]\nx += 2",
+            "y = missing_name + 1",
+            "z = {'apple': 1}['aple']",
+            "len = 3",
+            "import os",
+            "x = ().__class__",
+            "x = 1\nx = x.__class__\nx()",
+            "type(1)(3)",
+            "[x * y for x in range(3) if x for y in range(x)]",
+            "{k: v for k, v in zip('abc', range(3)) if v != 1}",
+            "s = {c.upper() for c in 'hello'}\nsorted(s)",
+            "sum(x for x in range(100) if x % 7 == 0)",
+            "[len for len in range(3)]",
+        ],
+    )
+    def test_compiled_matches_interpreted(self, code):
+        expected_result, expected_state, expected_print_outputs = self.run_code(code, compiled=False)
+        result, state, print_outputs = self.run_code(code, compiled=True)
+        if isinstance(expected_result, Exception):
+            assert type(result) is type(expected_result)
+            assert str(result) == str(expected_result)
+        else:
+            assert result == expected_result
+        assert state == expected_state
+        assert print_outputs == expected_print_outputs
+
+    def test_compiled_max_operations(self):
+        code = "while True:\n    x = 1"
+        with patch("smolagents.local_python_executor.MAX_OPERATIONS", 100):
+            with pytest.raises(InterpreterError, match="Reached the max number of operations"):
+                evaluate_python_code(code, {}, state={}, compiled=True)
+
+    def test_compiled_executor(self):
+        executor = LocalPythonExecutor([], compiled=True)
+        executor.send_tools({"final_answer": FinalAnswerTool()})
+        executor("values = [x * x for x in range(4)]")
+        result = executor("final_answer(sum(values))")
+        assert result.output == 14
+        assert result.is_final_answer is True
+
+
+class TestCodeCache:
+    def test_parse_hits_and_misses(self):
+        cache = CodeCache(max_size=2)
+        first = cache.parse("x = 1")
+        assert cache.parse("x = 1") is first
+        cache.parse("y = 2")
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_eviction_of_least_recently_used(self):
+        cache = CodeCache(max_size=2)
+        cache.parse("a = 1")
+        cache.parse("b = 1")
+        cache.parse("a = 1")
+        cache.parse("c = 1")
+        assert len(cache) == 2
+        cache.parse("a = 1")
+        cache.parse("b = 1")
+        assert (cache.hits, cache.misses) == (2, 4)
+
+    def test_syntax_errors_are_not_cached(self):
+        cache = CodeCache()
+        for _ in range(2):
+            with pytest.raises(InterpreterError, match="Code parsing failed"):
+                cache.parse("x = (")
+        assert len(cache) == 0
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_executor_reuses_parsed_code(self, compiled):
+        executor = LocalPythonExecutor([], compiled=compiled)
+        executor.send_tools({})
+        executor("counter = 0")
+        outputs = [executor("counter += 1\ncounter").output for _ in range(3)]
+        assert outputs == [1, 2, 3]
+        assert (executor.code_cache.hits, executor.code_cache.misses) == (2, 2)
+
+    def test_executor_errors_report_cached_source(self):
+        executor = LocalPythonExecutor([], code_cache_size=1)
+        for _ in range(2):
+            with pytest.raises(InterpreterError, match="Code execution failed at line 'y = undefined_name'"):
+                executor("x = 1\ny = undefined_name")
+        assert executor.code_cache.hits == 1
+
+
+class TestFrame:
+    def test_lookup_and_assignment(self):
+        state = {"x": 1, "y": 2}
+        frame = Frame({"x": 10}, state)
+        assert frame["x"] == 10 and frame["y"] == 2 and frame.get("z", 3) == 3
+        assert "y" in frame and "z" not in frame
+        frame["y"] = 20
+        assert state == {"x": 1, "y": 2}
+        with pytest.raises(KeyError):
+            frame["z"]
+
+    def test_nested_frames_are_flattened(self):
+        state = {"x": 1}
+        inner_frame = Frame({"z": 3}, Frame({"y": 2}, state))
+        assert len(inner_frame.maps) == 3
+        copied_frame = inner_frame.copy()
+        copied_frame["z"] = 4
+        assert inner_frame["z"] == 3 and copied_frame["x"] == 1
+
+
+class TestStaticTools:
+    def test_safer_tools_are_reused(self):
+        static_tools = StaticTools({"sum": sum, "len": len}, authorized_imports=["math"])
+        assert static_tools.get_safer_tool("sum") is static_tools.get_safer_tool("sum")
+        assert static_tools.get_safer_tool("sum") is not sum
+        # Builtins which always return safe values are not wrapped
+        assert static_tools.get_safer_tool("len") is len
+
+    def test_copy_keeps_wrappers_until_tool_is_replaced(self):
+        static_tools = StaticTools({"sum": sum, "max": max})
+        copied_static_tools = static_tools.copy()
+        assert isinstance(copied_static_tools, StaticTools)
+        assert copied_static_tools.get_safer_tool("sum") is static_tools.get_safer_tool("sum")
+        copied_static_tools["max"] = min
+        assert copied_static_tools.get_safer_tool("max").__name__ == "min"
+        assert static_tools.get_safer_tool("max").__name__ == "max"
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_executor_evaluates_tool_names_to_same_wrapper(self, compiled):
+        executor = LocalPythonExecutor([], compiled=compiled)
+        executor.send_tools({})
+        executor("f = sum")
+        assert executor("g = sum\nf is g").output is True
+        assert executor("sum([1, 2]) + len([3])").output == 4
+
+    def test_safe_result_builtins(self):
+        assert has_safe_result(len)
+        assert not has_safe_result(max)
+        assert not has_safe_result(lambda: None)
+
+
+class TestExecutionBudget:
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_timeout_interrupts_execution(self, compiled):
+        executor = LocalPythonExecutor([], compiled=compiled, timeout_seconds=0.2)
+        executor.send_tools({})
+        start_time = time.monotonic()
+        with pytest.raises(ExecutionBudgetError, match="time budget of 0.2 seconds"):
+            executor("x = 0\nwhile True:\n    x += 1")
+        assert time.monotonic() - start_time < 5
+        # The executor remains usable after the interruption
+        assert executor("x").output > 0
+
+    def test_budget_error_cannot_be_caught_by_the_code(self):
+        executor = LocalPythonExecutor([], timeout_seconds=0.2)
+        executor.send_tools({})
+        code = dedent("""
+            try:
+                while True:
+                    pass
+            except Exception:
+                pass
+            escaped = True
+        """)
+        with pytest.raises(ExecutionBudgetError):
+            executor(code)
+        assert "escaped" not in executor.state
+
+    @pytest.mark.skipif(get_memory_usage() is None, reason="Memory usage cannot be measured on this platform")
+    def test_memory_budget_interrupts_execution(self):
+        executor = LocalPythonExecutor([], max_memory_mb=50, timeout_seconds=30)
+        executor.send_tools({})
+        code = dedent("""
+            import time
+            chunks = []
+            while True:
+                chunks.append(b"x" * 1_000_000)
+                time.sleep(0.001)
+        """)
+        with pytest.raises(ExecutionBudgetError, match="memory budget of 50 MB"):
+            executor(code)
+
+    def test_execution_within_budget(self):
+        executor = LocalPythonExecutor([], timeout_seconds=10, max_memory_mb=500)
+        executor.send_tools({})
+        thread_count = threading.active_count()
+        assert executor("sum([i * i for i in range(10)])").output == 285
+        assert threading.active_count() == thread_count
+        # Operations are still counted as usual
+        assert executor.state["_operations_count"] == {"counter": 35}
+
+
+class TestExecutionProfile:
+    code = dedent("""
+        import math
+        total = 0
+        for i in range(100):
+            total += math.sqrt(i)
+        values = sorted([i % 7 for i in range(50)])
+    """)
+
+    def test_profile_records_lines_node_types_and_functions(self):
+        profile = ExecutionProfile(code=self.code)
+        state = {}
+        evaluate_python_code(self.code, BASE_PYTHON_TOOLS, state=state, authorized_imports=["math"], profile=profile)
+        assert profile.lines[5].count == 100
+        assert profile.lines[4].count == 1
+        assert profile.lines[4].total_time >= profile.lines[5].total_time
+        assert profile.node_types["AugAssign"].count == 100
+        assert profile.functions["math.sqrt"].count == 100
+        assert profile.functions["sorted"].count == 1
+        # Self times of nodes and function calls add up to the total time
+        self_time = sum(stats.self_time for stats in [*profile.node_types.values(), *profile.functions.values()])
+        assert self_time == pytest.approx(profile.total_time)
+        assert sum(stats.self_time for stats in profile.lines.values()) == pytest.approx(profile.total_time)
+        lineno, source_line, _ = profile.hot_lines(1)[0]
+        assert source_line == self.code.splitlines()[lineno - 1].strip()
+        assert set(profile.dict()) == {"total_time", "lines", "node_types", "functions"}
+        # Profiling does not change the operations count
+        unprofiled_state = {}
+        evaluate_python_code(self.code, BASE_PYTHON_TOOLS, state=unprofiled_state, authorized_imports=["math"])
+        assert state["_operations_count"] == unprofiled_state["_operations_count"]
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_executor_profile(self, compiled):
+        executor = LocalPythonExecutor(["math"], compiled=compiled, profile=True)
+        executor.send_tools({})
+        code_output = executor(self.code)
+        assert code_output.profile is executor.last_profile
+        assert code_output.profile.node_types["For"].count == 1
+        with pytest.raises(InterpreterError):
+            executor("x = 1\ny = 1 / 0")
+        assert executor.last_profile.code == "x = 1\ny = 1 / 0"
+        assert executor.last_profile.lines[1].count == 1
+
+    def test_executor_without_profile(self):
+        executor = LocalPythonExecutor([])
+        executor.send_tools({})
+        assert executor("1 + 1").profile is None
+        assert executor.last_profile is None
+
+
 class TestLocalPythonExecutorSecurity:
     @pytest.mark.parametrize(
         "additional_authorized_imports, expected_error",
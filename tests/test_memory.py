@@ -1,3 +1,6 @@
+import copy
+from unittest.mock import patch
+
 import pytest
 from PIL import Image
 
@@ -8,6 +11,7 @@ from smolagents.memory import (
     ChatMessage,
     MemoryStep,
     MessageRole,
+    MessagesSnapshot,
     PlanningStep,
     SystemPromptStep,
     TaskStep,
@@ -31,6 +35,85 @@ class TestAgentMemory:
         ]  # type: ignore
         assert memory.return_full_code() == "print('Hello')\n\nprint('World')"
 
+    def test_to_messages_renders_each_step_once(self):
+        memory = AgentMemory(system_prompt="This is a system prompt.")
+        memory.steps = [
+            TaskStep(task="Task"),
+            ActionStep(step_number=1, timing=Timing(start_time=0.0, end_time=1.0), model_output="Hi"),
+        ]
+        messages = memory.to_messages()
+        assert [message.role for message in messages] == [
+            MessageRole.SYSTEM,
+            MessageRole.USER,
+            MessageRole.ASSISTANT,
+        ]
+        memory.steps.append(
+            ActionStep(step_number=2, timing=Timing(start_time=0.0, end_time=1.0), observations="Observation")
+        )
+        with patch.object(ActionStep, "to_messages", autospec=True, side_effect=ActionStep.to_messages) as to_messages:
+            new_messages = memory.to_messages()
+        # Only the new step is rendered, the messages of previous steps are reused
+        assert to_messages.call_count == 1
+        assert new_messages[:3] == messages and new_messages[2] is messages[2]
+        assert len(new_messages) == 4
+        assert memory.to_messages(summary_mode=True)[0].role == MessageRole.USER
+
+    def test_to_messages_after_step_modification(self):
+        memory = AgentMemory(system_prompt="This is a system prompt.")
+        step = ActionStep(step_number=1, timing=Timing(start_time=0.0, end_time=1.0), observations="Observation")
+        memory.steps = [step]
+        assert "Observation" in memory.to_messages()[1].content[0]["text"]
+        step.observations = "Modified observation"
+        memory.system_prompt.system_prompt = "Modified system prompt."
+        messages = memory.to_messages()
+        assert messages[0].content[0]["text"] == "Modified system prompt."
+        assert "Modified observation" in messages[1].content[0]["text"]
+
+    def test_snapshot_messages_shares_common_prefix(self):
+        memory = AgentMemory(system_prompt="This is a system prompt.")
+        memory.steps = [TaskStep(task="Task")]
+        first_messages = memory.to_messages()
+        first_snapshot = memory.snapshot_messages(first_messages)
+        memory.steps.append(ActionStep(step_number=1, timing=Timing(start_time=0.0, end_time=1.0), model_output="Hi"))
+        second_messages = memory.to_messages()
+        second_snapshot = memory.snapshot_messages(second_messages)
+        assert second_snapshot == second_messages
+        assert second_snapshot._parent is first_snapshot
+        assert second_snapshot._messages == second_messages[2:]
+        # Modifying a step stops the sharing at its messages
+        memory.steps[0].task = "Modified task"
+        third_snapshot = memory.snapshot_messages(memory.to_messages())
+        assert third_snapshot._prefix_length == 1
+        assert third_snapshot[1].content[0]["text"] == "New task:\nModified task"
+        # Previous snapshots are unchanged
+        assert first_snapshot == first_messages
+        assert first_snapshot[1].content[0]["text"] == "New task:\nTask"
+
+
+class TestMessagesSnapshot:
+    def test_sequence_behaviour(self):
+        messages = [ChatMessage(role=MessageRole.USER, content=str(i)) for i in range(4)]
+        parent = MessagesSnapshot(messages[:3])
+        snapshot = MessagesSnapshot(messages[2:], parent=parent, prefix_length=2)
+        assert len(snapshot) == 4
+        assert snapshot == messages
+        assert list(snapshot) == messages
+        assert snapshot[-1] is messages[-1]
+        assert snapshot[1:3] == messages[1:3]
+        assert copy.deepcopy(snapshot) == messages
+        assert copy.deepcopy(snapshot)._parent is None
+
+    def test_indexing_walks_the_chain(self):
+        messages = [ChatMessage(role=MessageRole.USER, content=str(i)) for i in range(6)]
+        first = MessagesSnapshot(messages[:3])
+        second = MessagesSnapshot(messages[3:4], parent=first, prefix_length=3)
+        snapshot = MessagesSnapshot(messages[2:], parent=second, prefix_length=2)
+        with patch.object(MessagesSnapshot, "to_list", side_effect=AssertionError("list rebuilt")):
+            assert [snapshot[i] for i in range(6)] == messages
+            assert snapshot[-6] is messages[0]
+            with pytest.raises(IndexError):
+                snapshot[6]
+
 
 class TestMemoryStep:
     def test_initialization(self):
@@ -111,6 +194,9 @@ def test_action_step_dict():
     assert "action_output" in action_step_dict
     assert action_step_dict["action_output"] == "Output"
 
+    assert "profile" in action_step_dict
+    assert action_step_dict["profile"] is None
+
 
 def test_action_step_to_messages():
     action_step = ActionStep(
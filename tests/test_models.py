@@ -12,41 +12,114 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import copy
 import json
 import sys
+import threading
+import time
 import unittest
 from contextlib import ExitStack
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from huggingface_hub import ChatCompletionOutputMessage
+from PIL import Image
 
+from smolagents.agents import ToolCallingAgent
 from smolagents.default_tools import FinalAnswerTool
 from smolagents.models import (
     AmazonBedrockServerModel,
     AzureOpenAIServerModel,
+    CachedModel,
     ChatMessage,
+    ChatMessageStreamDelta,
     ChatMessageToolCall,
+    ChatMessageToolCallFunction,
+    ChatMessageToolCallStreamDelta,
+    FallbackModel,
+    HedgedModel,
     InferenceClientModel,
+    InMemoryModelCache,
     LiteLLMModel,
     LiteLLMRouterModel,
     MessageRole,
     MLXModel,
     Model,
     OpenAIServerModel,
+    RetryPolicy,
+    SQLiteModelCache,
     TransformersModel,
+    agglomerate_stream_deltas,
     get_clean_message_list,
     get_tool_call_from_text,
     get_tool_json_schema,
     parse_json_if_needed,
+    parse_retry_after,
+    reset_retry_budget,
+    restore_retry_budget,
     supports_stop_parameter,
 )
+from smolagents.monitoring import TokenUsage
 from smolagents.tools import tool
+from smolagents.utils import RateLimiter
 
 from .utils.markers import require_run_all
 
 
+def make_completion_response(content: str) -> MagicMock:
+    response = MagicMock()
+    response.choices[0].message.model_dump.return_value = {"role": "assistant", "content": content}
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 5
+    return response
+
+
+def make_stream_events(contents: list[str]) -> list[MagicMock]:
+    events = []
+    for content in contents:
+        event = MagicMock(usage=None)
+        event.choices[0].delta.content = content
+        event.choices[0].delta.tool_calls = None
+        events.append(event)
+    usage_event = MagicMock(choices=[])
+    usage_event.usage.prompt_tokens = 10
+    usage_event.usage.completion_tokens = 5
+    return events + [usage_event]
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None, message: str = ""):
+        super().__init__(f"Error code: {status_code}" + (f" - {message}" if message else ""))
+        self.status_code = status_code
+        self.response = MagicMock(status_code=status_code, headers=headers or {})
+
+
+async def iterate_async(items):
+    for item in items:
+        yield item
+
+
+async def collect_stream(stream) -> list:
+    return [event async for event in stream]
+
+
 class TestModel:
+    def test_default_agenerate_runs_generate_in_thread(self):
+        class SyncModel(Model):
+            def generate(self, messages, stop_sequences=None):
+                return ChatMessage(role=MessageRole.ASSISTANT, content=f"{len(messages)} {stop_sequences}")
+
+            def generate_stream(self, messages, stop_sequences=None):
+                for content in ["a", "b"]:
+                    yield ChatMessageStreamDelta(content=content)
+
+        model = SyncModel()
+        messages = [ChatMessage(role=MessageRole.USER, content="Hello")]
+        assert asyncio.run(model.agenerate(messages, stop_sequences=["stop"])).content == "1 ['stop']"
+        events = asyncio.run(collect_stream(model.agenerate_stream(messages)))
+        assert [event.content for event in events] == ["a", "b"]
+
     def test_agglomerate_stream_deltas(self):
         from smolagents.models import (
             ChatMessageStreamDelta,
@@ -108,6 +181,39 @@ class TestModel:
         )
         assert agglomerated_stream_delta.token_usage.total_tokens == 1372
 
+    def test_stream_accumulator(self):
+        from smolagents.models import (
+            ChatMessageStreamDelta,
+            ChatMessageToolCallFunction,
+            ChatMessageToolCallStreamDelta,
+            StreamAccumulator,
+            TokenUsage,
+        )
+
+        def make_tool_call_delta(arguments, **kwargs):
+            return ChatMessageToolCallStreamDelta(
+                index=0, function=ChatMessageToolCallFunction(name="web_search", arguments=arguments), **kwargs
+            )
+
+        accumulator = StreamAccumulator()
+        accumulator.add(ChatMessageStreamDelta(content="Hi", tool_calls=[make_tool_call_delta("", id="call_0")]))
+        assert accumulator.content == "Hi"
+        accumulator.add(ChatMessageStreamDelta(content=" there", tool_calls=[make_tool_call_delta('{"query": ')]))
+        accumulator.add(
+            ChatMessageStreamDelta(
+                tool_calls=[make_tool_call_delta('"pope"}')], token_usage=TokenUsage(input_tokens=10, output_tokens=3)
+            )
+        )
+        message = accumulator.to_message()
+        assert message.content == "Hi there"
+        assert message.tool_calls[0].id == "call_0"
+        assert message.tool_calls[0].function.name == "web_search"
+        assert message.tool_calls[0].function.arguments == '{"query": "pope"}'
+        assert message.token_usage.total_tokens == 13
+        assert accumulator.render_as_markdown() == message.render_as_markdown()
+        with pytest.raises(ValueError, match="Tool call index is not provided"):
+            accumulator.add(ChatMessageStreamDelta(tool_calls=[ChatMessageToolCallStreamDelta(id="call_1")]))
+
     @pytest.mark.parametrize(
         "model_id, stop_sequences, should_contain_stop",
         [
@@ -192,6 +298,47 @@ class TestModel:
 
         assert "nullable" in get_tool_json_schema(get_weather)["function"]["parameters"]["properties"]["celsius"]
 
+    def test_get_tool_json_schema_is_cached_until_tool_is_modified(self):
+        final_answer_tool = FinalAnswerTool()
+        json_schema = get_tool_json_schema(final_answer_tool)
+        assert get_tool_json_schema(final_answer_tool) is json_schema
+        # Schemas are cached per instance
+        assert get_tool_json_schema(FinalAnswerTool()) is not json_schema
+        assert get_tool_json_schema(FinalAnswerTool()) == json_schema
+        final_answer_tool.description = "Gives the final answer."
+        new_json_schema = get_tool_json_schema(final_answer_tool)
+        assert new_json_schema["function"]["description"] == "Gives the final answer."
+        final_answer_tool.inputs = {"answer": {"type": "string", "description": "The answer"}}
+        assert get_tool_json_schema(final_answer_tool)["function"]["parameters"]["properties"]["answer"]["type"] == (
+            "string"
+        )
+
+    def test_prepare_completion_kwargs_reuses_tool_schemas(self):
+        model = Model()
+        tools = [FinalAnswerTool(), FinalAnswerTool()]
+        tools[1].name = "other_final_answer"
+        messages = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello"}])]
+        tool_schemas = model._prepare_completion_kwargs(messages, tools_to_call_from=tools)["tools"]
+        assert model._prepare_completion_kwargs(messages, tools_to_call_from=list(tools))["tools"] is tool_schemas
+        assert [schema["function"]["name"] for schema in tool_schemas] == ["final_answer", "other_final_answer"]
+        tools[1].description = "Modified tool"
+        new_tool_schemas = model._prepare_completion_kwargs(messages, tools_to_call_from=tools)["tools"]
+        assert new_tool_schemas is not tool_schemas
+        assert new_tool_schemas[1]["function"]["description"] == "Modified tool"
+        assert model._prepare_completion_kwargs(messages, tools_to_call_from=tools[:1])["tools"] == tool_schemas[:1]
+
+    def test_get_tool_schemas_reuses_managed_agent_schemas(self):
+        managed_agent = ToolCallingAgent(tools=[], model=Model(), name="search_agent", description="Searches the web.")
+        agent = ToolCallingAgent(tools=[], model=Model(), managed_agents=[managed_agent])
+        model = Model()
+        tool_schemas = model._get_tool_schemas(agent.tools_and_managed_agents)
+        assert model._get_tool_schemas(agent.tools_and_managed_agents) is tool_schemas
+        assert tool_schemas[-1]["function"]["name"] == "search_agent"
+        managed_agent.description = "Searches the web and reads pages."
+        new_tool_schemas = model._get_tool_schemas(agent.tools_and_managed_agents)
+        assert new_tool_schemas is not tool_schemas
+        assert new_tool_schemas[-1]["function"]["description"] == "Searches the web and reads pages."
+
     def test_chatmessage_has_model_dumps_json(self):
         message = ChatMessage("user", [{"type": "text", "text": "Hello!"}])
         data = json.loads(message.model_dump_json())
@@ -295,6 +442,32 @@ class TestInferenceClientModel:
             "role conversion should be applied"
         )
 
+    def test_agenerate_uses_async_client(self):
+        model = InferenceClientModel(model_id="test-model", async_client=MagicMock())
+        response = MagicMock()
+        response.choices[0].message = ChatCompletionOutputMessage(role=MessageRole.ASSISTANT, content="Hello")
+        response.usage.prompt_tokens = 10
+        response.usage.completion_tokens = 5
+        model.async_client.chat_completion = AsyncMock(return_value=response)
+        model.client = MagicMock()
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        chat_message = asyncio.run(model.agenerate(messages, stop_sequences=["stop"]))
+        assert chat_message.content == "Hello"
+        assert chat_message.token_usage.total_tokens == 15
+        assert "Test message" in str(model.async_client.chat_completion.call_args.kwargs["messages"])
+        model.client.chat_completion.assert_not_called()
+
+    def test_agenerate_stream_uses_async_client(self):
+        model = InferenceClientModel(model_id="test-model", async_client=MagicMock())
+        model.async_client.chat.completions.create = AsyncMock(
+            return_value=iterate_async(make_stream_events(["Hel", "lo"]))
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        events = asyncio.run(collect_stream(model.agenerate_stream(messages)))
+        assert agglomerate_stream_deltas(events).content == "Hello"
+        assert events[-1].token_usage.total_tokens == 15
+        assert model.async_client.chat.completions.create.call_args.kwargs["stream"] is True
+
     def test_init_model_with_tokens(self):
         model = InferenceClientModel(model_id="test-model", token="abc")
         assert model.client.token == "abc"
@@ -362,7 +535,7 @@ class TestLiteLLMModel:
             "AuthenticationError",
             "Unauthorized",
         ]
-        model = LiteLLMModel(model_id=model_id)
+        model = LiteLLMModel(model_id=model_id, retry_policy=RetryPolicy(max_attempts=1))
         messages = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Test message"}])]
         # Test generate method
         with pytest.raises(Exception) as e:
@@ -380,6 +553,25 @@ class TestLiteLLMModel:
             f"Error message '{error_message}' does not contain any expected phrases"
         )
 
+    def test_agenerate_uses_acompletion(self):
+        model = LiteLLMModel(model_id="openai/gpt-4o-mini", api_key="test_api_key", client=MagicMock())
+        model.client.acompletion = AsyncMock(return_value=make_completion_response("Hello"))
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        chat_message = asyncio.run(model.agenerate(messages))
+        assert chat_message.content == "Hello"
+        assert chat_message.token_usage.total_tokens == 15
+        assert model.client.acompletion.call_args.kwargs["model"] == "openai/gpt-4o-mini"
+        assert model.client.acompletion.call_args.kwargs["api_key"] == "test_api_key"
+        model.client.completion.assert_not_called()
+
+    def test_agenerate_stream_uses_acompletion(self):
+        model = LiteLLMModel(model_id="openai/gpt-4o-mini", api_key="test_api_key", client=MagicMock())
+        model.client.acompletion = AsyncMock(return_value=iterate_async(make_stream_events(["Hel", "lo"])))
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        events = asyncio.run(collect_stream(model.agenerate_stream(messages)))
+        assert agglomerate_stream_deltas(events).content == "Hello"
+        assert model.client.acompletion.call_args.kwargs["stream"] is True
+
     def test_passing_flatten_messages(self):
         model = LiteLLMModel(model_id="groq/llama-3.3-70b", flatten_messages_as_text=False)
         assert not model.flatten_messages_as_text
@@ -446,6 +638,50 @@ class TestOpenAIServerModel:
         )
         assert model.client == MockOpenAI.return_value
 
+    def test_async_client_is_created_on_first_use(self):
+        with patch("openai.OpenAI"), patch("openai.AsyncOpenAI") as MockAsyncOpenAI:
+            model = OpenAIServerModel(model_id="gpt-4o-mini", api_key="test_api_key")
+            MockAsyncOpenAI.assert_not_called()
+            assert model.async_client == MockAsyncOpenAI.return_value
+            assert model.async_client == MockAsyncOpenAI.return_value
+        MockAsyncOpenAI.assert_called_once_with(
+            base_url=None, api_key="test_api_key", organization=None, project=None, max_retries=0
+        )
+
+    def test_agenerate(self):
+        model = OpenAIServerModel(model_id="gpt-4o-mini", client=MagicMock(), async_client=MagicMock())
+        model.async_client.chat.completions.create = AsyncMock(return_value=make_completion_response("Hello"))
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        chat_message = asyncio.run(model.agenerate(messages, stop_sequences=["stop"]))
+        assert chat_message.content == "Hello"
+        assert chat_message.token_usage.total_tokens == 15
+        assert model.async_client.chat.completions.create.call_args.kwargs["stop"] == ["stop"]
+        model.client.chat.completions.create.assert_not_called()
+
+    def test_agenerate_stream(self):
+        model = OpenAIServerModel(model_id="gpt-4o-mini", client=MagicMock(), async_client=MagicMock())
+        model.async_client.chat.completions.create = AsyncMock(
+            return_value=iterate_async(make_stream_events(["Hel", "lo"]))
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        events = asyncio.run(collect_stream(model.agenerate_stream(messages)))
+        assert [event.content for event in events] == ["Hel", "lo", ""]
+        assert events[-1].token_usage.total_tokens == 15
+
+    def test_models_share_named_rate_limiter(self):
+        RateLimiter.shared("test-openai-quota", requests_per_minute=None, max_concurrent_requests=1)
+        model = OpenAIServerModel(model_id="gpt-4o-mini", client=MagicMock(), rate_limiter="test-openai-quota")
+        other_model = OpenAIServerModel(model_id="gpt-4o", client=MagicMock(), rate_limiter="test-openai-quota")
+        assert model.rate_limiter is other_model.rate_limiter
+        model.client.chat.completions.create.return_value = make_stream_events(["Hel", "lo"])
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        stream = model.generate_stream(messages)
+        next(stream)
+        # The only concurrency slot is held until the stream is exhausted
+        assert model.rate_limiter._free_slots == 0
+        list(stream)
+        assert model.rate_limiter._free_slots == 1
+
     @require_run_all
     def test_streaming_tool_calls(self):
         model = OpenAIServerModel(model_id="gpt-4o-mini")
@@ -471,6 +707,398 @@ class TestOpenAIServerModel:
         assert args2 == '{"answer": "blob2"}'
 
 
+class TestRetryPolicy:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, None),
+            ("2", 2.0),
+            ("0.5", 0.5),
+            ("-3", 0.0),
+            ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+            ("not a date", None),
+        ],
+    )
+    def test_parse_retry_after(self, value, expected):
+        assert parse_retry_after(value) == expected
+
+    def test_get_delay(self):
+        policy = RetryPolicy(initial_delay=1.0, max_delay=5.0)
+        for attempt in range(1, 6):
+            assert 0 <= policy.get_delay(attempt) <= min(5.0, 2 ** (attempt - 1))
+        assert policy.get_delay(1, retry_after=3.0) == 3.0
+        assert policy.get_delay(1, retry_after=100.0) == 5.0
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (FakeAPIError(503), True),
+            (TimeoutError("Request timed out"), True),
+            (FakeAPIError(401), False),
+            (type("AuthenticationError", (Exception,), {})("Invalid key"), False),
+            (type("PermissionDeniedError", (Exception,), {})("Forbidden"), False),
+            # litellm reports missing credentials of some providers as a server error
+            (FakeAPIError(500, message="Missing API Key: set the OPENAI_API_KEY environment variable"), False),
+            (FakeAPIError(500, message="Unable to locate credentials"), False),
+        ],
+    )
+    def test_is_retryable(self, error, expected):
+        assert RetryPolicy().is_retryable(error) is expected
+
+    def test_generate_retries_transient_errors(self):
+        model = OpenAIServerModel(model_id="gpt-4o-mini", client=MagicMock())
+        model.client.chat.completions.create.side_effect = [
+            FakeAPIError(503),
+            FakeAPIError(429, headers={"Retry-After": "7"}),
+            make_completion_response("Hello"),
+        ]
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        with (
+            patch("smolagents.models.time.sleep") as mock_sleep,
+            patch.object(model.rate_limiter, "backoff") as backoff,
+        ):
+            assert model.generate(messages).content == "Hello"
+        assert model.client.chat.completions.create.call_count == 3
+        # The 503 is retried after a jittered delay, the 429 after the requested delay, applied to the rate limiter
+        assert 0 <= mock_sleep.call_args_list[0].args[0] <= 1.0
+        backoff.assert_called_once_with(7.0)
+
+    def test_generate_raises_non_retryable_errors_and_exhausted_retries(self):
+        model = OpenAIServerModel(
+            model_id="gpt-4o-mini", client=MagicMock(), retry_policy=RetryPolicy(max_attempts=2, initial_delay=0)
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        model.client.chat.completions.create.side_effect = FakeAPIError(400)
+        with pytest.raises(FakeAPIError, match="400"):
+            model.generate(messages)
+        assert model.client.chat.completions.create.call_count == 1
+        model.client.chat.completions.create.reset_mock()
+        model.client.chat.completions.create.side_effect = FakeAPIError(500)
+        with pytest.raises(FakeAPIError, match="500"):
+            model.generate(messages)
+        assert model.client.chat.completions.create.call_count == 2
+
+    def test_retry_budget_per_run(self):
+        model = OpenAIServerModel(
+            model_id="gpt-4o-mini",
+            client=MagicMock(),
+            retry_policy=RetryPolicy(initial_delay=0, max_retries_per_run=2),
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        model.client.chat.completions.create.side_effect = ConnectionError("Connection reset")
+        reset_retry_budget()
+        with pytest.raises(ConnectionError):
+            model.generate(messages)
+        assert model.client.chat.completions.create.call_count == 3
+        with pytest.raises(ConnectionError):
+            model.generate(messages)
+        assert model.client.chat.completions.create.call_count == 4
+        reset_retry_budget()
+        model.client.chat.completions.create.side_effect = [ConnectionError(), make_completion_response("Hello")]
+        assert model.generate(messages).content == "Hello"
+
+    def test_retry_budget_is_restored_after_nested_budget(self):
+        model = OpenAIServerModel(
+            model_id="gpt-4o-mini",
+            client=MagicMock(),
+            retry_policy=RetryPolicy(initial_delay=0, max_retries_per_run=2),
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        model.client.chat.completions.create.side_effect = ConnectionError("Connection reset")
+        token = reset_retry_budget()
+        try:
+            with pytest.raises(ConnectionError):
+                model.generate(messages)
+            assert model.client.chat.completions.create.call_count == 3
+            # E.g. the run of a managed agent gets its own budget...
+            restore_retry_budget(reset_retry_budget())
+            # ... and the budget of its manager is still spent afterwards
+            with pytest.raises(ConnectionError):
+                model.generate(messages)
+            assert model.client.chat.completions.create.call_count == 4
+        finally:
+            restore_retry_budget(token)
+
+    def test_generate_stream_retries_only_before_first_event(self):
+        def failing_stream():
+            yield from make_stream_events(["Hel"])[:1]
+            raise FakeAPIError(503)
+
+        model = OpenAIServerModel(
+            model_id="gpt-4o-mini", client=MagicMock(), retry_policy=RetryPolicy(initial_delay=0)
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        model.client.chat.completions.create.side_effect = [FakeAPIError(503), failing_stream()]
+        stream = model.generate_stream(messages)
+        assert next(stream).content == "Hel"
+        with pytest.raises(FakeAPIError):
+            next(stream)
+        assert model.client.chat.completions.create.call_count == 2
+
+    def test_agenerate_retries_transient_errors(self):
+        model = OpenAIServerModel(
+            model_id="gpt-4o-mini",
+            client=MagicMock(),
+            async_client=MagicMock(),
+            retry_policy=RetryPolicy(initial_delay=0),
+        )
+        model.async_client.chat.completions.create = AsyncMock(
+            side_effect=[FakeAPIError(502), make_completion_response("Hello")]
+        )
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        assert asyncio.run(model.agenerate(messages)).content == "Hello"
+        assert model.async_client.chat.completions.create.call_count == 2
+
+
+class CountingModel(Model):
+    def __init__(self):
+        super().__init__(model_id="counting-model")
+        self.calls = 0
+
+    def generate(self, messages, stop_sequences=None, tools_to_call_from=None):
+        self.calls += 1
+        return ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content=f"Answer {self.calls}",
+            token_usage=TokenUsage(input_tokens=10, output_tokens=5),
+        )
+
+    def generate_stream(self, messages, stop_sequences=None, tools_to_call_from=None):
+        self.calls += 1
+        for content in ["Stream", "ed ", f"answer {self.calls}"]:
+            yield ChatMessageStreamDelta(content=content)
+        yield ChatMessageStreamDelta(
+            content="",
+            tool_calls=[
+                ChatMessageToolCallStreamDelta(
+                    index=0,
+                    id="call_0",
+                    type="function",
+                    function=ChatMessageToolCallFunction(name="search", arguments="{}"),
+                )
+            ],
+            token_usage=TokenUsage(input_tokens=10, output_tokens=5),
+        )
+
+
+class TestCachedModel:
+    messages = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello"}])]
+
+    def test_generate_stream_is_only_exposed_for_streaming_models(self):
+        class NonStreamingModel(Model):
+            def generate(self, messages, **kwargs):
+                return ChatMessage(role=MessageRole.ASSISTANT, content="Answer")
+
+        assert hasattr(CachedModel(CountingModel()), "generate_stream")
+        model = CachedModel(NonStreamingModel())
+        assert not hasattr(model, "generate_stream")
+        assert model.generate(self.messages).content == "Answer"
+
+    def test_generate_reuses_responses_to_identical_requests(self):
+        model = CachedModel(CountingModel())
+        first_message = model.generate(self.messages, stop_sequences=["stop"])
+        assert first_message.token_usage.total_tokens == 15
+        cached_message = model.generate(copy.deepcopy(self.messages), stop_sequences=["stop"])
+        assert cached_message.content == first_message.content == "Answer 1"
+        assert cached_message.token_usage.total_tokens == 0
+        # Any change in the request is a cache miss
+        assert model.generate(self.messages).content == "Answer 2"
+        assert model.generate(
+            self.messages, stop_sequences=["stop"], tools_to_call_from=[FinalAnswerTool()]
+        ).content == ("Answer 3")
+        assert model.model.calls == 3
+        assert model.stats.dict() == {"hits": 1, "misses": 3, "hit_rate": 0.25}
+
+    def test_generate_stream_replays_cached_responses(self):
+        model = CachedModel(CountingModel())
+        streamed_message = agglomerate_stream_deltas(list(model.generate_stream(self.messages)))
+        replayed_message = agglomerate_stream_deltas(list(model.generate_stream(self.messages)))
+        assert model.model.calls == 1
+        assert replayed_message.content == streamed_message.content == "Streamed answer 1"
+        assert replayed_message.tool_calls == streamed_message.tool_calls
+        assert replayed_message.tool_calls[0].function.name == "search"
+        # Responses of generate are replayed as streams and vice versa
+        assert model.generate(self.messages).content == "Streamed answer 1"
+
+    def test_interrupted_streams_are_not_cached(self):
+        model = CachedModel(CountingModel())
+        stream = model.generate_stream(self.messages)
+        next(stream)
+        stream.close()
+        assert len(model.cache) == 0
+        assert agglomerate_stream_deltas(list(model.generate_stream(self.messages))).content == "Streamed answer 2"
+
+    def test_async_generation(self):
+        model = CachedModel(CountingModel())
+
+        async def main():
+            message = await model.agenerate(self.messages)
+            events = [event async for event in model.agenerate_stream(self.messages)]
+            return message, events
+
+        message, events = asyncio.run(main())
+        assert agglomerate_stream_deltas(events).content == message.content == "Answer 1"
+        assert model.stats.hits == 1
+
+    def test_sqlite_cache_persists_responses(self, tmp_path):
+        model = CachedModel(CountingModel(), cache=tmp_path / "cache.db")
+        model.generate(self.messages)
+        model.cache.close()
+        assert model.to_dict()["cache"] == str(tmp_path / "cache.db")
+        reloaded_model = CachedModel(model.model, cache=tmp_path / "cache.db")
+        assert reloaded_model.generate(self.messages).content == "Answer 1"
+        assert model.model.calls == 1
+
+    @pytest.mark.parametrize("cache_class", [InMemoryModelCache, SQLiteModelCache])
+    def test_cache_eviction(self, cache_class, tmp_path):
+        clock = [1000.0]
+        with patch("smolagents.models.time.time", side_effect=lambda: clock[0]):
+            args = (tmp_path / "cache.db",) if cache_class is SQLiteModelCache else ()
+            cache = cache_class(*args, max_entries=2, ttl=60)
+            cache.set("a", {"content": "a"})
+            clock[0] += 1
+            cache.set("b", {"content": "b"})
+            clock[0] += 1
+            assert cache.get("a") == {"content": "a"}
+            clock[0] += 1
+            # "b" is the least recently used entry
+            cache.set("c", {"content": "c"})
+            assert cache.get("b") is None
+            assert len(cache) == 2
+            clock[0] += 60
+            assert cache.get("a") is None
+            assert cache.get("c") == {"content": "c"}
+            cache.clear()
+            assert len(cache) == 0
+
+
+class ScriptedModel(Model):
+    """Model answering with its name, after waiting for `release` if given, or raising `error` if given."""
+
+    def __init__(self, name, error=None, release=None, async_delay=0.0):
+        super().__init__(model_id=name)
+        self.error = error
+        self.release = release
+        self.async_delay = async_delay
+        self.closed_streams = 0
+        self.cancelled = False
+
+    def _answer(self):
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return ChatMessage(role=MessageRole.ASSISTANT, content=self.model_id)
+
+    def generate(self, messages, **kwargs):
+        return self._answer()
+
+    def generate_stream(self, messages, **kwargs):
+        try:
+            yield ChatMessageStreamDelta(content=self._answer().content)
+            yield ChatMessageStreamDelta(content=" done")
+        finally:
+            self.closed_streams += 1
+
+    async def agenerate(self, messages, **kwargs):
+        try:
+            await asyncio.sleep(self.async_delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return ChatMessage(role=MessageRole.ASSISTANT, content=self.model_id)
+
+
+class TestFallbackModel:
+    messages = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello"}])]
+
+    @pytest.mark.parametrize("model_class", [FallbackModel, HedgedModel])
+    def test_generate_stream_is_only_exposed_if_all_models_stream(self, model_class):
+        class NonStreamingModel(Model):
+            def generate(self, messages, **kwargs):
+                return ChatMessage(role=MessageRole.ASSISTANT, content="Answer")
+
+        assert hasattr(model_class([ScriptedModel("a"), ScriptedModel("b")]), "generate_stream")
+        assert not hasattr(model_class([ScriptedModel("a"), NonStreamingModel()]), "generate_stream")
+
+    def test_generate_falls_back_on_errors(self):
+        model = FallbackModel([ScriptedModel("a", error=ValueError("down")), ScriptedModel("b")])
+        assert model.generate(self.messages).content == "b"
+        assert asyncio.run(model.agenerate(self.messages)).content == "b"
+        model = FallbackModel(
+            [ScriptedModel("a", error=ValueError("a is down")), ScriptedModel("b", error=KeyError())]
+        )
+        with pytest.raises(KeyError):
+            model.generate(self.messages)
+
+    def test_generate_stream_falls_back_only_before_first_event(self):
+        model = FallbackModel([ScriptedModel("a", error=ValueError("down")), ScriptedModel("b")])
+        assert agglomerate_stream_deltas(list(model.generate_stream(self.messages))).content == "b done"
+
+        def failing_stream(messages, **kwargs):
+            yield ChatMessageStreamDelta(content="a")
+            raise ValueError("Connection lost")
+
+        primary = ScriptedModel("a")
+        primary.generate_stream = failing_stream
+        model = FallbackModel([primary, ScriptedModel("b")])
+        stream = model.generate_stream(self.messages)
+        assert next(stream).content == "a"
+        with pytest.raises(ValueError, match="Connection lost"):
+            next(stream)
+
+
+class TestHedgedModel:
+    messages = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello"}])]
+
+    def test_get_hedge_delay(self):
+        model = HedgedModel(
+            [ScriptedModel("a")], latency_percentile=90, initial_hedge_delay=3.0, min_latency_samples=5
+        )
+        model._latencies["response"].extend([0.1, 0.2, 0.3, 0.4])
+        assert model.get_hedge_delay() == 3.0
+        model._latencies["response"].extend([0.5 + i / 10 for i in range(6)])
+        assert model.get_hedge_delay() == pytest.approx(1.0)
+        assert model.get_hedge_delay("first_event") == 3.0
+
+    def test_slow_request_is_hedged(self):
+        release = threading.Event()
+        slow_model = ScriptedModel("slow", release=release)
+        model = HedgedModel([slow_model, ScriptedModel("fast")], initial_hedge_delay=0.05)
+        start_time = time.monotonic()
+        assert model.generate(self.messages).content == "fast"
+        assert time.monotonic() - start_time < 2
+        release.set()
+        model.thread_pool.shutdown(wait=True)
+        assert len(model._latencies["response"]) == 2
+
+    def test_errors_fall_back_without_waiting_for_the_hedge_delay(self):
+        model = HedgedModel([ScriptedModel("a", error=ValueError("down")), ScriptedModel("b")], initial_hedge_delay=10)
+        start_time = time.monotonic()
+        assert model.generate(self.messages).content == "b"
+        assert time.monotonic() - start_time < 2
+        model = HedgedModel([ScriptedModel("a", error=ValueError("down"))], initial_hedge_delay=10)
+        with pytest.raises(ValueError, match="down"):
+            model.generate(self.messages)
+
+    def test_losing_stream_is_closed(self):
+        release = threading.Event()
+        slow_model = ScriptedModel("slow", release=release)
+        model = HedgedModel([slow_model, ScriptedModel("fast")], initial_hedge_delay=0.05)
+        assert agglomerate_stream_deltas(list(model.generate_stream(self.messages))).content == "fast done"
+        release.set()
+        model.thread_pool.shutdown(wait=True)
+        assert slow_model.closed_streams == 1
+
+    def test_losing_async_request_is_cancelled(self):
+        slow_model = ScriptedModel("slow", async_delay=10)
+        model = HedgedModel([slow_model, ScriptedModel("fast")], initial_hedge_delay=0.05)
+        assert asyncio.run(model.agenerate(self.messages)).content == "fast"
+        assert slow_model.cancelled
+
+
 class TestAmazonBedrockServerModel:
     def test_client_for_bedrock(self):
         model_id = "us.amazon.nova-pro-v1:0"
@@ -482,6 +1110,14 @@ class TestAmazonBedrockServerModel:
 
         assert model.client == MockBoto3.return_value
 
+    def test_prepare_completion_kwargs_does_not_modify_messages(self):
+        with patch("boto3.client"):
+            model = AmazonBedrockServerModel(model_id="us.amazon.nova-pro-v1:0")
+        messages = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello!"}])]
+        completion_kwargs = model._prepare_completion_kwargs(messages=messages)
+        assert completion_kwargs["messages"] == [{"role": "user", "content": [{"text": "Hello!"}]}]
+        assert messages[0].content == [{"type": "text", "text": "Hello!"}]
+
 
 class TestAzureOpenAIServerModel:
     def test_client_kwargs_passed_correctly(self):
@@ -656,6 +1292,22 @@ def test_get_clean_message_list_image_encoding(convert_images_to_image_urls, exp
         assert result[0] == expected_clean_message
 
 
+def test_get_clean_message_list_does_not_modify_messages():
+    image = Image.new("RGB", (8, 8))
+    messages = [
+        ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello!"}]),
+        ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "How are you?"}]),
+        {"role": "user", "content": [{"type": "image", "image": image}]},
+    ]
+    original_messages = copy.deepcopy(messages)
+    result = get_clean_message_list(messages, convert_images_to_image_urls=True)
+    assert result[0]["content"][0]["text"] == "Hello!\nHow are you?"
+    assert result[0]["content"][1]["type"] == "image_url"
+    assert messages[:2] == original_messages[:2]
+    assert messages[2]["content"][0]["image"] is image
+    assert result[0]["content"] is not messages[0].content
+
+
 def test_get_clean_message_list_flatten_messages_as_text():
     messages = [
         ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hello!"}]),
@@ -13,10 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import unittest
 
 import PIL.Image
 import pytest
+from rich.console import Console
 
 from smolagents import (
     CodeAgent,
@@ -32,6 +34,7 @@ from smolagents.models import (
     Model,
     TokenUsage,
 )
+from smolagents.monitoring import LiveMarkdown
 
 
 class FakeLLMModel(Model):
@@ -250,3 +253,18 @@ class MonitoringTester(unittest.TestCase):
         self.assertIsNone(result.token_usage)
         self.assertIsInstance(result.messages, list)
         self.assertGreater(result.timing.duration, 0)
+
+
+def test_live_markdown_throttles_rendering():
+    chunks, renders = [], []
+
+    def render():
+        renders.append("".join(chunks))
+        return renders[-1]
+
+    with LiveMarkdown(Console(file=io.StringIO()), refresh_per_second=0.001) as live:
+        for chunk in ["a", "b", "c"]:
+            chunks.append(chunk)
+            live.update(render)
+    # The text is rendered at the first update, then only when the display is closed
+    assert renders == ["a", "abc"]
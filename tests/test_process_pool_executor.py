@@ -0,0 +1,106 @@
+import sys
+import time
+
+import pytest
+
+from smolagents.default_tools import FinalAnswerTool
+from smolagents.local_python_executor import ExecutionBudgetError, InterpreterError
+from smolagents.process_pool_executor import ProcessPoolPythonExecutor, WorkerPool, dump_tools, load_tools
+from smolagents.tools import tool
+
+
+@tool
+def double(x: int) -> int:
+    """
+    Doubles a number.
+
+    Args:
+        x: The number to double.
+    """
+    return 2 * x
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WorkerPool(size=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def executor(pool):
+    executor = ProcessPoolPythonExecutor([], pool=pool, timeout_seconds=2)
+    executor.send_tools({"double": double, "final_answer": FinalAnswerTool()})
+    yield executor
+    executor.cleanup()
+
+
+def test_worker_pool_refills_in_background():
+    pool = WorkerPool(size=1)
+    try:
+        worker = pool.acquire()
+        assert worker.process.is_alive()
+        deadline = time.monotonic() + 30
+        while not pool._idle_workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(pool._idle_workers) == 1
+        pool.release(worker)
+    finally:
+        pool.shutdown()
+    assert not pool._idle_workers
+
+
+def test_dump_tools():
+    dumped_tools = dump_tools({"double": double, "final_answer": FinalAnswerTool()})
+    assert dumped_tools["final_answer"][0] == "pickle"
+    # Tools created with @tool cannot be pickled and are sent as source code
+    assert dumped_tools["double"][0] == "source"
+    tools = load_tools(dumped_tools)
+    assert tools["double"](x=3) == 6
+    assert isinstance(tools["final_answer"], FinalAnswerTool)
+
+
+class TestProcessPoolPythonExecutor:
+    def test_state_persists_between_executions(self, executor):
+        executor.send_variables({"y": 5})
+        code_output = executor("x = double(y)\nprint('computed')")
+        assert code_output.output is None
+        assert code_output.logs == "computed\n"
+        assert executor("x + 1").output == 11
+
+    def test_final_answer(self, executor):
+        code_output = executor("final_answer(double(3))")
+        assert code_output.output == 6
+        assert code_output.is_final_answer is True
+
+    def test_errors_are_raised_with_logs(self, executor):
+        with pytest.raises(InterpreterError, match="before error(.|\n)*ZeroDivisionError"):
+            executor("print('before error')\n1 / 0")
+        with pytest.raises(InterpreterError, match="Import of os is not allowed"):
+            executor("import os")
+
+    def test_worker_is_killed_on_timeout(self, executor):
+        executor.send_variables({"y": 5})
+        executor("x = 1")
+        with pytest.raises(ExecutionBudgetError, match="worker process was killed"):
+            executor("import time\ntime.sleep(10)")
+        # The new worker has the tools and the variables sent before, but not the ones defined by the code
+        assert executor("double(y)").output == 10
+        with pytest.raises(InterpreterError, match="The variable `x` is not defined"):
+            executor("x")
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="resource.setrlimit is not available on Windows")
+    def test_memory_limit(self, pool):
+        executor = ProcessPoolPythonExecutor([], pool=pool, max_memory_mb=500)
+        with pytest.raises(InterpreterError, match="MemoryError"):
+            executor("x = 'a' * 10**9")
+        assert executor("1 + 1").output == 2
+        executor.cleanup()
+
+    def test_cleanup(self, pool):
+        executor = ProcessPoolPythonExecutor([], pool=pool)
+        process = executor._leased_worker["worker"].process
+        executor.cleanup()
+        assert not process.is_alive()
+        with pytest.raises(InterpreterError, match="cleaned up"):
+            executor("1 + 1")
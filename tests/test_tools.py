@@ -12,8 +12,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import inspect
 import os
+import threading
 import warnings
 from textwrap import dedent
 from typing import Any, Literal
@@ -25,7 +27,15 @@ import PIL.Image
 import pytest
 
 from smolagents.agent_types import _AGENT_TYPE_MAPPING
-from smolagents.tools import AUTHORIZED_TYPES, Tool, ToolCollection, launch_gradio_demo, tool, validate_tool_arguments
+from smolagents.tools import (
+    AUTHORIZED_TYPES,
+    Tool,
+    ToolCallExecutor,
+    ToolCollection,
+    launch_gradio_demo,
+    tool,
+    validate_tool_arguments,
+)
 
 from .utils.markers import require_run_all
 
@@ -657,6 +667,64 @@ class TestTool:
         assert isinstance(union_type_return_tool_function, Tool)
         assert union_type_return_tool_function.output_type == "any"
 
+    def test_async_tool(self):
+        @tool
+        async def async_tool_function(text: str) -> str:
+            """
+            Async tool.
+
+            Args:
+                text: Input text.
+            """
+            import asyncio
+
+            await asyncio.sleep(0)
+            return text.upper()
+
+        assert inspect.iscoroutinefunction(async_tool_function.forward)
+        assert "async def forward(self, text: str) -> str:" in async_tool_function.to_dict()["code"]
+        assert asyncio.run(async_tool_function.acall("hello")) == "HELLO"
+        assert asyncio.run(async_tool_function.acall({"text": "hello"})) == "HELLO"
+        # Async tools can also be called from synchronous code
+        assert async_tool_function(text="hello") == "HELLO"
+
+        async def call_from_running_loop():
+            return async_tool_function(text="hello")
+
+        # ... including synchronous code called from a running event loop
+        assert asyncio.run(call_from_running_loop()) == "HELLO"
+
+    def test_acall_runs_sync_tool_in_thread(self):
+        main_thread = threading.get_ident()
+
+        class ThreadTool(Tool):
+            name = "thread_tool"
+            description = "Returns the identifier of the thread it runs in."
+            inputs = {}
+            output_type = "integer"
+
+            def forward(self):
+                return threading.get_ident()
+
+        thread_tool = ThreadTool()
+        assert thread_tool() == main_thread
+        assert asyncio.run(thread_tool.acall()) != main_thread
+        assert thread_tool.is_initialized
+
+
+class TestToolCallExecutor:
+    def test_run_coroutine_reuses_event_loop(self):
+        async def get_loop():
+            return asyncio.get_running_loop()
+
+        with ToolCallExecutor() as executor:
+            loop = executor.run_coroutine(get_loop())
+            assert executor.run_coroutine(get_loop()) is loop
+            assert executor.submit(threading.get_ident).result() != threading.get_ident()
+        assert loop.is_closed()
+        with pytest.raises(RuntimeError):
+            executor.submit(threading.get_ident)
+
 
 class TestToolDecorator:
     def test_tool_decorator_source_extraction_with_multiple_decorators(self):
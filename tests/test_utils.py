@@ -12,18 +12,26 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import inspect
 import os
 import textwrap
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
 import pytest
 from IPython.core.interactiveshell import InteractiveShell
+from PIL import Image
 
 from smolagents import Tool
 from smolagents.tools import tool
 from smolagents.utils import (
+    CodeBlockEndDetector,
+    RateLimiter,
     create_agent_gradio_app_template,
+    encode_image_base64,
     get_source,
     instance_to_source,
     is_valid_name,
@@ -552,3 +560,150 @@ def test_agent_gradio_app_template_excludes_class_keyword():
         ast.parse(result)
     except SyntaxError as e:
         pytest.fail(f"Generated app.py contains syntax error: {e}")
+
+
+def test_encode_image_base64_is_cached_by_content():
+    image = Image.new("RGB", (8, 8), color="red")
+    encoded_image = encode_image_base64(image)
+    with patch.object(Image.Image, "save") as mock_save:
+        assert encode_image_base64(image) == encoded_image
+        assert encode_image_base64(image.copy()) == encoded_image
+        assert mock_save.call_count == 0
+    image.putpixel((0, 0), (0, 0, 255))
+    assert encode_image_base64(image) != encoded_image
+
+
+@pytest.mark.parametrize(
+    "code_block_tags, chunks",
+    [
+        (("<code>", "</code>"), ["Thought: compute\n<co", "de>\nx = 1\n</co", "de>\nObservation"]),
+        # The closing tag is contained in the opening tag
+        (("```python", "```"), ["```py", "thon\nx = 1\n``", "`"]),
+    ],
+)
+def test_code_block_end_detector(code_block_tags, chunks):
+    detector = CodeBlockEndDetector(code_block_tags)
+    assert [detector.feed(chunk) for chunk in chunks] == [False, False, True]
+
+
+def test_code_block_end_detector_searches_a_bounded_window():
+    detector = CodeBlockEndDetector(("<code>", "</code>"), lookback=8)
+    assert detector.feed("<code>\n" + "x = 1\n" * 100) is False
+    assert len(detector._tail) == 8
+    assert detector.feed("</code>") is True
+
+
+class TestRateLimiter:
+    def test_disabled(self):
+        limiter = RateLimiter()
+        with patch("smolagents.utils.time.sleep") as mock_sleep:
+            for _ in range(10):
+                limiter.throttle()
+        mock_sleep.assert_not_called()
+
+    def test_token_bucket_allows_bursts(self):
+        clock = [100.0]
+        with patch("smolagents.utils.time.monotonic", side_effect=lambda: clock[0]):
+            limiter = RateLimiter(requests_per_minute=60, burst=3)
+            with patch("smolagents.utils.time.sleep") as mock_sleep:
+                for _ in range(3):
+                    limiter.throttle()
+                mock_sleep.assert_not_called()
+                limiter.throttle()
+                mock_sleep.assert_called_once_with(pytest.approx(1.0))
+                # After an idle period the bucket is refilled, but never beyond the burst size
+                clock[0] += 60.0
+                mock_sleep.reset_mock()
+                for _ in range(3):
+                    limiter.throttle()
+                mock_sleep.assert_not_called()
+                limiter.throttle()
+                mock_sleep.assert_called_once_with(pytest.approx(1.0))
+
+    def test_concurrent_callers_reserve_distinct_slots(self):
+        delays = []
+        with (
+            patch("smolagents.utils.time.monotonic", return_value=100.0),
+            patch("smolagents.utils.time.sleep", side_effect=delays.append),
+        ):
+            limiter = RateLimiter(requests_per_minute=60)
+            threads = [threading.Thread(target=limiter.throttle) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert sorted(delays) == pytest.approx([float(i) for i in range(1, 20)])
+
+    def test_limit_bounds_requests_in_flight(self):
+        limiter = RateLimiter(max_concurrent_requests=2)
+        in_flight, max_in_flight = [0], [0]
+        lock = threading.Lock()
+
+        def request():
+            with limiter.limit():
+                with lock:
+                    in_flight[0] += 1
+                    max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+                time.sleep(0.02)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max_in_flight == [2]
+
+    def test_alimit_bounds_requests_in_flight(self):
+        limiter = RateLimiter(requests_per_minute=60_000, burst=10, max_concurrent_requests=2)
+        in_flight, max_in_flight = [0], [0]
+
+        async def request():
+            async with limiter.alimit():
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+                await asyncio.sleep(0.02)
+                in_flight[0] -= 1
+
+        async def main():
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        asyncio.run(main())
+        assert max_in_flight == [2]
+
+    def test_slots_are_shared_by_threads_and_event_loops(self):
+        limiter = RateLimiter(max_concurrent_requests=1)
+
+        async def cancelled_request():
+            task = asyncio.create_task(limiter.alimit().__aenter__())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        async def request():
+            async with limiter.alimit():
+                return "done"
+
+        with limiter.limit():
+            # A task waiting for the slot held by this thread can be cancelled without leaking it
+            asyncio.run(cancelled_request())
+            thread = threading.Thread(target=lambda: results.append(asyncio.run(request())))
+            results = []
+            thread.start()
+            time.sleep(0.05)
+            assert results == []
+        thread.join(timeout=5)
+        assert results == ["done"]
+        assert limiter._free_slots == 1 and not limiter._slot_waiters
+
+    def test_shared_limiters(self):
+        limiter = RateLimiter.shared("test-shared-limiter", requests_per_minute=30, burst=5)
+        with pytest.warns(UserWarning, match="different settings"):
+            assert RateLimiter.shared("test-shared-limiter", requests_per_minute=1000) is limiter
+        assert RateLimiter.resolve("test-shared-limiter", None) is limiter
+        assert RateLimiter.resolve("test-shared-limiter", 30) is limiter
+        assert limiter.requests_per_minute == 30 and limiter.burst == 5
+        assert RateLimiter.resolve(limiter, 10) is limiter
+        assert RateLimiter.resolve(None, 10).requests_per_minute == 10